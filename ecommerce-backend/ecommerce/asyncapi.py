@@ -0,0 +1,214 @@
+"""
+Async DRF views whose database queries overlap.
+
+DRF 3.14 only dispatches sync handlers, and Django 4.2's async ORM
+(aget(), acount(), aiterator()...) is sync_to_async(thread_sensitive=True)
+around the sync ORM: every query of a request runs in the same thread,
+one after the other, on a connection opened for that request. The helpers
+here run ORM calls on a pool of ASYNC_DB_WORKERS threads instead, so
+independent queries of one request (a page and its COUNT(*), or the
+prefetches of a product) run at the same time.
+
+Every call in the pool is treated like a request of its own: connections
+are closed or kept according to CONN_MAX_AGE, and the queries are timed
+by ecommerce.instrumentation when it is enabled. With the default
+CONN_MAX_AGE of 0 every call opens a connection; set DB_CONN_MAX_AGE to
+let the pool threads reuse theirs.
+
+AsyncAPIView dispatches ``async def`` handlers. Authentication,
+permissions and throttling run once in the pool; rendering and exception
+handling are DRF's own.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.paginator import InvalidPage
+from django.db import close_old_connections
+from django.db.models import prefetch_related_objects
+from rest_framework import generics
+from rest_framework.exceptions import NotFound
+from rest_framework.generics import get_object_or_404
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .instrumentation import instrument_queries
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'ASYNC_DB_WORKERS', 8), thread_name_prefix='async-db'
+        )
+    return _executor
+
+
+def _run(func, args, kwargs):
+    # What request_started and request_finished do for a request thread
+    close_old_connections()
+    try:
+        with instrument_queries():
+            return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_in_pool(func, *args, **kwargs):
+    """
+    Await ``func(*args, **kwargs)`` run in a database pool thread.
+    """
+    return await sync_to_async(_run, thread_sensitive=False, executor=get_executor())(func, args, kwargs)
+
+
+def split_prefetches(queryset):
+    """
+    ``queryset`` without its prefetch_related() lookups, and the lookups.
+    """
+    return queryset.prefetch_related(None), queryset._prefetch_related_lookups
+
+
+async def aprefetch(instances, lookups):
+    """
+    prefetch_related_objects() with every lookup in its own pool thread.
+    The lookups must follow different relations.
+    """
+    if not instances or not lookups:
+        return
+    for instance in instances:
+        # Created up front so concurrent lookups never race to create it
+        if not hasattr(instance, '_prefetched_objects_cache'):
+            instance._prefetched_objects_cache = {}
+    await asyncio.gather(*(
+        run_in_pool(prefetch_related_objects, instances, lookup) for lookup in lookups
+    ))
+
+
+async def apaginate_queryset(paginator, queryset, request, view=None):
+    """
+    paginator.paginate_queryset() for async views. Numbered pages run
+    their COUNT(*) and the page itself at the same time.
+    """
+    if not isinstance(paginator, PageNumberPagination):
+        return await run_in_pool(paginator.paginate_queryset, queryset, request, view)
+    page_size = paginator.get_page_size(request)
+    if not page_size:
+        return None
+    try:
+        number = int(request.query_params.get(paginator.page_query_param, 1))
+    except (TypeError, ValueError):
+        number = 0
+    if number < 1:
+        # 'last' and invalid numbers: the sequential path, errors included
+        return await run_in_pool(paginator.paginate_queryset, queryset, request, view)
+
+    offset = (number - 1) * page_size
+    count, rows = await asyncio.gather(
+        run_in_pool(queryset.count),
+        run_in_pool(list, queryset[offset:offset + page_size]),
+    )
+    django_paginator = paginator.django_paginator_class(queryset, page_size)
+    django_paginator.count = count
+    try:
+        page = django_paginator.page(number)
+    except InvalidPage as exc:
+        raise NotFound(paginator.invalid_page_message.format(page_number=number, message=str(exc)))
+    page.object_list = rows
+    paginator.page = page
+    paginator.request = request
+    if paginator.template is not None and django_paginator.num_pages > 1:
+        paginator.display_page_controls = True
+    return rows
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView for ``async def`` handlers; every handler a subclass exposes
+    through ``http_method_names`` must be async.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            # Authentication looks the user up
+            await run_in_pool(self.initial, request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def http_method_not_allowed(self, request, *args, **kwargs):
+        return super().http_method_not_allowed(request, *args, **kwargs)
+
+    async def options(self, request, *args, **kwargs):
+        # Metadata inspects serializers, which may query
+        return await run_in_pool(super().options, request, *args, **kwargs)
+
+
+class AsyncGenericAPIView(AsyncAPIView, generics.GenericAPIView):
+    """
+    Serializers run on the event loop, so querysets must load everything
+    they read, prefetches included. Views whose serializers query lazily
+    set ``serialize_in_pool``.
+    """
+    serialize_in_pool = False
+
+    async def aserialize(self, instance, **kwargs):
+        serializer = self.get_serializer(instance, **kwargs)
+        if self.serialize_in_pool:
+            return await run_in_pool(lambda: serializer.data)
+        return serializer.data
+
+
+class AsyncListModelMixin:
+    async def get(self, request, *args, **kwargs):
+        return await self.alist(request, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        # Filters may look things up, e.g. a category by slug
+        queryset = await run_in_pool(self.filter_queryset, self.get_queryset())
+        queryset, lookups = split_prefetches(queryset)
+
+        page = await apaginate_queryset(self.paginator, queryset, request, self)
+        if page is not None:
+            await aprefetch(page, lookups)
+            return self.get_paginated_response(await self.aserialize(page, many=True))
+
+        instances = await run_in_pool(list, queryset)
+        await aprefetch(instances, lookups)
+        return Response(await self.aserialize(instances, many=True))
+
+
+class AsyncRetrieveModelMixin:
+    async def get(self, request, *args, **kwargs):
+        return await self.aretrieve(request, *args, **kwargs)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        return Response(await self.aserialize(instance))
+
+    async def aget_object(self):
+        # GenericAPIView.get_object(), with the prefetches run concurrently
+        queryset = await run_in_pool(self.filter_queryset, self.get_queryset())
+        queryset, lookups = split_prefetches(queryset)
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        filter_kwargs = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        instance = await run_in_pool(get_object_or_404, queryset, **filter_kwargs)
+        self.check_object_permissions(self.request, instance)
+        await aprefetch([instance], lookups)
+        return instance
@@ -0,0 +1,174 @@
+"""
+Negotiated response compression and per-route payload sizes.
+
+CompressionMiddleware extends Django's GZipMiddleware. JSON responses go
+out as brotli when the client accepts it and the Brotli package is
+installed; everything else compressible keeps Django's gzip, including
+its BREACH padding for HTML pages that carry CSRF tokens. Responses below
+COMPRESSION_MIN_SIZE, or of types that are already compressed (images,
+gzip downloads), are sent as they are.
+
+Every response's original and sent size is added to payload_stats, which
+the staff-only /_metrics/payload endpoint reports per route.
+"""
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .instrumentation import route_name
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/json', 'application/x-ndjson', 'application/javascript',
+    'application/xml', 'image/svg+xml',
+)
+BROTLI_TYPES = ('application/json', 'application/x-ndjson')
+
+
+def accepted_encodings(header):
+    """
+    {coding: q} from an Accept-Encoding header, leaving out q=0 codings.
+    """
+    accepted = {}
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                continue
+        if coding and quality > 0:
+            accepted[coding.strip().lower()] = quality
+    return accepted
+
+
+class PayloadStats:
+    """
+    Response counts and byte totals per route, shared by every thread.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.routes = {}
+
+    def add(self, route, encoding, original, sent):
+        with self.lock:
+            stats = self.routes.setdefault(route, Counter())
+            stats['responses'] += 1
+            stats[f'encoding:{encoding}'] += 1
+            stats['original_bytes'] += original
+            stats['sent_bytes'] += sent
+
+    def reset(self):
+        with self.lock:
+            self.routes.clear()
+
+    def summary(self):
+        with self.lock:
+            snapshot = {route: Counter(stats) for route, stats in self.routes.items()}
+        summary = {}
+        for route, stats in sorted(snapshot.items()):
+            original, sent = stats['original_bytes'], stats['sent_bytes']
+            summary[route] = {
+                'responses': stats['responses'],
+                'encodings': {
+                    key.partition(':')[2]: count
+                    for key, count in sorted(stats.items()) if key.startswith('encoding:')
+                },
+                'original_bytes': original,
+                'sent_bytes': sent,
+                'saved_bytes': original - sent,
+                'average_original_bytes': original // stats['responses'],
+                'average_sent_bytes': sent // stats['responses'],
+                'ratio': round(sent / original, 3) if original else None,
+            }
+        return summary
+
+
+payload_stats = PayloadStats()
+
+
+class CompressionMiddleware(GZipMiddleware):
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+        self.brotli_quality = getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 5)
+
+    def process_response(self, request, response):
+        # Streaming bodies are compressed on the fly but their size is never known
+        original = None if response.streaming else len(response.content)
+        if self.should_compress(response, original):
+            accepted = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+            if 'br' in accepted and self.use_brotli(response):
+                response = self.compress_brotli(response)
+            else:
+                response = super().process_response(request, response)
+        if original is not None:
+            payload_stats.add(
+                route_name(request), response.get('Content-Encoding', 'identity'),
+                original, len(response.content),
+            )
+        return response
+
+    def should_compress(self, response, size):
+        if response.has_header('Content-Encoding'):
+            return False
+        if size is not None and size < self.min_size:
+            return False
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    def use_brotli(self, response):
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        return brotli is not None and not response.streaming and content_type in BROTLI_TYPES
+
+    def compress_brotli(self, response):
+        patch_vary_headers(response, ('Accept-Encoding',))
+        compressed = brotli.compress(response.content, quality=self.brotli_quality)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response.headers['Content-Length'] = str(len(compressed))
+        # Same weak ETag as GZipMiddleware, so conditional requests keep matching
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+        return response
+
+
+class PayloadMetricsView(APIView):
+    """
+    Bytes before and after compression per route; DELETE clears them.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if not request.user.is_staff:
+            return Response(
+                {'detail': 'You do not have permission to view metrics.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        return Response(payload_stats.summary())
+
+    def delete(self, request):
+        if not request.user.is_staff:
+            return Response(
+                {'detail': 'You do not have permission to reset metrics.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        payload_stats.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
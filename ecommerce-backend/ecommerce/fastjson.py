@@ -0,0 +1,76 @@
+"""
+orjson-backed drop-ins for DRF's JSONRenderer and JSONParser.
+
+Output is byte for byte what the stdlib classes produce with the default
+COMPACT_JSON/UNICODE_JSON settings, with two exceptions: floats that need
+an exponent are written as 1e-5 rather than 1e-05, and NaN/Infinity
+become null instead of an error. Anything orjson cannot reproduce
+(indented output, other JSON settings, values it refuses) goes through
+the stdlib implementation instead, as does everything when orjson is not
+installed.
+"""
+import codecs
+import io
+import re
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Datetimes go through DRF's encoder, which formats them slightly differently
+ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME) if orjson else 0
+
+# orjson reads integers beyond 64 bits as floats where the stdlib keeps them exact
+LONG_NUMBER = re.compile(rb'[0-9]{19}')
+
+# Escaped by the stdlib renderer to keep the output a JavaScript subset
+LINE_SEPARATOR = '\u2028'.encode()
+PARAGRAPH_SEPARATOR = '\u2029'.encode()
+
+
+class FastJSONRenderer(JSONRenderer):
+    # Decimal, lazy strings, dates, UUIDs... exactly as the stdlib renderer does
+    default = staticmethod(encoders.JSONEncoder().default)
+
+    def can_use_orjson(self):
+        return orjson is not None and self.compact and not self.ensure_ascii
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if not self.can_use_orjson() or self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits; let the stdlib succeed or raise as before
+            return super().render(data, accepted_media_type, renderer_context)
+        # Both separators start with 0xE2, which a one-byte scan rules out cheaply
+        if b'\xe2' in ret:
+            ret = ret.replace(LINE_SEPARATOR, b'\\u2028').replace(PARAGRAPH_SEPARATOR, b'\\u2029')
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or not self.strict or codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        if LONG_NUMBER.search(body):
+            return super().parse(io.BytesIO(body), media_type, parser_context)
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            # Reparse for the stdlib's error message
+            return super().parse(io.BytesIO(body), media_type, parser_context)
+
@@ -0,0 +1,253 @@
+"""
+Per-request query and timing instrumentation.
+
+Enabled by INSTRUMENTATION_ENABLED, which adds InstrumentationMiddleware
+to MIDDLEWARE. Every request gets a Server-Timing header and one JSON log
+line on the ``ecommerce.instrumentation`` logger; samples are kept per
+route in memory and summarised by the staff-only /_metrics endpoint.
+"""
+import json
+import logging
+import threading
+import time
+from collections import Counter, deque
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import connections
+from rest_framework import serializers, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from products.rows import RowSerializer
+
+logger = logging.getLogger('ecommerce.instrumentation')
+
+PERCENTILES = (50, 90, 95, 99)
+SAMPLE_FIELDS = ('total_ms', 'db_ms', 'queries', 'duplicate_queries', 'serialize_ms', 'bytes')
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.statements = Counter()
+        self.serializer_time = 0.0
+        self.serializing = False
+        # Async views run their queries on several threads at once
+        self.lock = threading.Lock()
+
+    def record_query(self, sql, duration):
+        with self.lock:
+            self.queries += 1
+            self.db_time += duration
+            self.statements[sql] += 1
+
+    @property
+    def duplicate_queries(self):
+        # Same SQL text (parameters aside) run again: the signature of an N+1
+        return sum(count - 1 for count in self.statements.values() if count > 1)
+
+    def most_repeated(self):
+        sql, count = self.statements.most_common(1)[0] if self.statements else ('', 0)
+        return (sql, count) if count > 1 else None
+
+
+def query_timer(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.record_query(sql, time.perf_counter() - start)
+
+
+@contextmanager
+def instrument_queries():
+    """
+    Time the queries this thread runs for the current request.
+    """
+    if _current.get() is None:
+        yield
+        return
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(query_timer))
+        yield
+
+
+@contextmanager
+def timed_serialization():
+    """
+    Count the block as serialization time of the current request.
+    """
+    metrics = _current.get()
+    # Nested serializers run inside the outermost .data, count that once
+    if metrics is None or metrics.serializing:
+        yield
+        return
+    metrics.serializing = True
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serializer_time += time.perf_counter() - start
+        metrics.serializing = False
+
+
+def _timed(method):
+    @wraps(method)
+    def timed(*args, **kwargs):
+        with timed_serialization():
+            return method(*args, **kwargs)
+
+    timed._instrumented = True
+    return timed
+
+
+def install_serializer_timing():
+    for serializer_class in (serializers.Serializer, serializers.ListSerializer):
+        prop = serializer_class.__dict__['data']
+        if not getattr(prop.fget, '_instrumented', False):
+            serializer_class.data = property(_timed(prop.fget))
+    # Row lists (products.rows) serialize without ever touching .data
+    if not getattr(RowSerializer.serialize, '_instrumented', False):
+        RowSerializer.serialize = _timed(RowSerializer.serialize)
+
+
+class RouteStats:
+    """
+    Bounded per-route samples, shared by every thread of the process.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.lock = threading.Lock()
+        self.samples = {}
+        self.counts = Counter()
+
+    def add(self, route, sample):
+        with self.lock:
+            self.samples.setdefault(route, deque(maxlen=self.size)).append(sample)
+            self.counts[route] += 1
+
+    def reset(self):
+        with self.lock:
+            self.samples.clear()
+            self.counts.clear()
+
+    def summary(self):
+        with self.lock:
+            snapshot = {route: list(samples) for route, samples in self.samples.items()}
+            counts = dict(self.counts)
+        return {
+            route: {
+                'requests': counts[route],
+                'sampled': len(samples),
+                **{
+                    field: percentiles([sample[field] for sample in samples])
+                    for field in SAMPLE_FIELDS
+                },
+            }
+            for route, samples in sorted(snapshot.items())
+        }
+
+
+def percentiles(values):
+    values = sorted(values)
+    if not values:
+        return {}
+    # Nearest rank
+    return {
+        f'p{p}': values[min(len(values) - 1, max(0, -(-p * len(values) // 100) - 1))]
+        for p in PERCENTILES
+    }
+
+
+route_stats = RouteStats(getattr(settings, 'INSTRUMENTATION_SAMPLE_SIZE', 1000))
+
+
+def route_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    return f'{request.method} /{match.route}'
+
+
+class InstrumentationMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        install_serializer_timing()
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            with instrument_queries():
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.report(request, response, metrics)
+        return response
+
+    def report(self, request, response, metrics):
+        total = time.perf_counter() - metrics.started
+        size = None if response.streaming else len(response.content)
+        sample = {
+            'total_ms': round(total * 1000, 2),
+            'db_ms': round(metrics.db_time * 1000, 2),
+            'queries': metrics.queries,
+            'duplicate_queries': metrics.duplicate_queries,
+            'serialize_ms': round(metrics.serializer_time * 1000, 2),
+            'bytes': size or 0,
+        }
+        route = route_name(request)
+        route_stats.add(route, sample)
+
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={sample["db_ms"]};desc="{metrics.queries} queries"',
+            f'serialize;dur={sample["serialize_ms"]}',
+            f'total;dur={sample["total_ms"]}',
+        ])
+        line = {
+            'route': route,
+            'path': request.path,
+            'status': response.status_code,
+            **sample,
+        }
+        repeated = metrics.most_repeated()
+        if repeated:
+            line['most_repeated_query'] = {'sql': repeated[0], 'count': repeated[1]}
+        logger.info(json.dumps(line))
+
+
+class MetricsView(APIView):
+    """
+    Per-route percentiles from this process; DELETE clears them.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if not request.user.is_staff:
+            return Response(
+                {'detail': 'You do not have permission to view metrics.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        return Response(route_stats.summary())
+
+    def delete(self, request):
+        if not request.user.is_staff:
+            return Response(
+                {'detail': 'You do not have permission to reset metrics.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        route_stats.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
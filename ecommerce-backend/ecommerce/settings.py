@@ -27,6 +27,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     'rest_framework_simplejwt.token_blacklist',
     'rest_framework',
@@ -40,6 +41,10 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # WhiteNoise, serving static files with their precompressed .br/.gz
+    # variants, without forcing ASGI requests through a thread
+    'ecommerce.staticfiles.StaticFilesMiddleware',
+    'ecommerce.compression.CompressionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -68,6 +73,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'ecommerce.wsgi.application'
+ASGI_APPLICATION = 'ecommerce.asgi.application'
 
 DATABASES = {
     'default': {
@@ -77,6 +83,8 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD', default='securepassword123'),
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default='5432'),
+        # Seconds to keep connections open; also applies to the async views' pool
+        'CONN_MAX_AGE': int(config('DB_CONN_MAX_AGE', default=0)),
     }
 }
 
@@ -94,6 +102,16 @@ SWAGGER_SETTINGS = {
 
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # orjson when installed, same output as DRF's stdlib JSON classes
+    'DEFAULT_RENDERER_CLASSES': (
+        'ecommerce.fastjson.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'ecommerce.fastjson.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
@@ -109,6 +127,77 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 20,
 }
 
+# Query/timing instrumentation (ecommerce.instrumentation): Server-Timing
+# headers, one log line per request and per-route percentiles at /_metrics
+INSTRUMENTATION_ENABLED = config('INSTRUMENTATION_ENABLED', default='False') == 'True'
+INSTRUMENTATION_SAMPLE_SIZE = int(config('INSTRUMENTATION_SAMPLE_SIZE', default=1000))
+
+if INSTRUMENTATION_ENABLED:
+    # Outermost, so the timings cover every other middleware too
+    MIDDLEWARE.insert(0, 'ecommerce.instrumentation.InstrumentationMiddleware')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'ecommerce.instrumentation': {
+            'handlers': ['console'],
+            'level': config('INSTRUMENTATION_LOG_LEVEL', default='INFO'),
+            'propagate': False,
+        },
+    },
+}
+
+# API responses below this many bytes are sent uncompressed (ecommerce.compression)
+COMPRESSION_MIN_SIZE = int(config('COMPRESSION_MIN_SIZE', default=1024))
+# Brotli 11 is meant for static assets; 4-6 keeps dynamic responses fast
+COMPRESSION_BROTLI_QUALITY = int(config('COMPRESSION_BROTLI_QUALITY', default=5))
+
+# Threads that run the queries of the async views (ecommerce.asyncapi), per
+# process; each keeps its connection for DB_CONN_MAX_AGE seconds
+ASYNC_DB_WORKERS = int(config('ASYNC_DB_WORKERS', default=8))
+
+# Local memory by default; set REDIS_URL to share the cache between workers
+REDIS_URL = config('REDIS_URL', default='')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Response cache for anonymous catalog reads (products.cache). Its namespace
+# versions must be shared by every worker: without REDIS_URL the LocMemCache
+# above is per process and only fit for a single one (runserver, tests);
+# `manage.py check --deploy` reports it as products.E001
+CATALOG_CACHE_ALIAS = 'default'
+CATALOG_CACHE_TIMEOUT = int(config('CATALOG_CACHE_TIMEOUT', default=300))
+# The category tree lives in the same cache and is dropped with CATEGORIES
+CATEGORY_TREE_CACHE_TIMEOUT = int(config('CATEGORY_TREE_CACHE_TIMEOUT', default=60 * 60))
+
+# Deepest category nesting; category responses prefetch children this many levels down
+CATEGORY_MAX_DEPTH = int(config('CATEGORY_MAX_DEPTH', default=10))
+
+# Approved reviews embedded in the product detail; the rest are paginated
+PRODUCT_DETAIL_REVIEW_LIMIT = int(config('PRODUCT_DETAIL_REVIEW_LIMIT', default=5))
+
+# Most products a single products/batch/ request may resolve
+PRODUCT_BATCH_LIMIT = int(config('PRODUCT_BATCH_LIMIT', default=50))
+
+# Text search configuration used for Product.search_vector and ?search=
+PRODUCT_SEARCH_CONFIG = config('PRODUCT_SEARCH_CONFIG', default='english')
+
 CORS_ALLOWED_ORIGINS = config(
     'CORS_ALLOWED_ORIGINS',
     default='http://localhost:3000,http://127.0.0.1:3000'
@@ -117,6 +206,16 @@ CORS_ALLOWED_ORIGINS = config(
 STATIC_URL = 'static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
+# collectstatic writes hashed names plus gzip/brotli copies for WhiteNoise
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
@@ -6,6 +6,8 @@ from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView
+from .compression import PayloadMetricsView
+from .instrumentation import MetricsView
 
 schema_view = get_schema_view(
     openapi.Info(
@@ -24,6 +26,8 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/v1/auth/', include('users.urls')),
     path('api/v1/', include('products.urls')),
+    path('_metrics', MetricsView.as_view(), name='metrics'),
+    path('_metrics/payload', PayloadMetricsView.as_view(), name='payload-metrics'),
     
     # API Documentation
     # path('swagger<format>/', schema_view.without_ui(cache_timeout=0), name='schema-json'),
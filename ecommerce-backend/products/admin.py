@@ -1,5 +1,9 @@
-from django.contrib import admin
-from .models import Category, Product, ProductImage, ProductVariant, ProductReview
+from django import forms
+from django.contrib import admin, messages
+from django.template.response import TemplateResponse
+from .models import Category, Product, ProductImage, ProductVariant, ProductReview, CatalogSnapshot, StockAlert
+from .bulk import DELTA, PERCENT, SET, bulk_update_products
+from .cache import invalidate_products
 
 class CategoryAdmin(admin.ModelAdmin):
     list_display = ('name', 'slug', 'parent', 'is_active', 'product_count')
@@ -21,7 +25,7 @@ class ProductImageInline(admin.TabularInline):
 class ProductVariantInline(admin.TabularInline):
     model = ProductVariant
     extra = 1
-    fields = ('name', 'value', 'sku', 'price_adjustment', 'quantity')
+    fields = ('name', 'value', 'sku', 'price_adjustment', 'quantity', 'low_stock_threshold')
 
 class ProductReviewInline(admin.TabularInline):
     model = ProductReview
@@ -29,8 +33,29 @@ class ProductReviewInline(admin.TabularInline):
     can_delete = False
     readonly_fields = ('user', 'rating', 'title', 'comment', 'created_at')
 
+class BulkAdjustForm(forms.Form):
+    field = forms.ChoiceField(choices=[
+        ('price', 'Price'), ('compare_at_price', 'Compare at price'), ('quantity', 'Quantity'),
+    ])
+    mode = forms.ChoiceField(choices=[
+        (SET, 'Set to'), (DELTA, 'Change by'), (PERCENT, 'Change by percent'),
+    ])
+    value = forms.DecimalField(max_digits=10, decimal_places=2)
+    dry_run = forms.BooleanField(required=False, initial=True, label='Preview only')
+
+    def clean(self):
+        cleaned_data = super().clean()
+        value = cleaned_data.get('value')
+        if cleaned_data.get('field') == 'quantity' and cleaned_data.get('mode') != PERCENT and value is not None:
+            # Quantities are whole units; only a percentage may be fractional
+            if value != value.to_integral_value():
+                self.add_error('value', 'Quantity changes must be whole numbers.')
+            else:
+                cleaned_data['value'] = int(value)
+        return cleaned_data
+
 class ProductAdmin(admin.ModelAdmin):
-    list_display = ('name', 'slug', 'category', 'price', 'quantity', 'is_active', 'is_featured', 'created_at')
+    list_display = ('name', 'slug', 'category', 'price', 'quantity', 'average_rating', 'is_active', 'is_featured', 'created_at')
     list_filter = ('is_active', 'is_featured', 'category')
     search_fields = ('name', 'description', 'sku')
     list_editable = ('price', 'quantity', 'is_active', 'is_featured')
@@ -48,7 +73,64 @@ class ProductAdmin(admin.ModelAdmin):
         ('Status', {
             'fields': ('is_active', 'is_featured')
         }),
+        ('Ratings', {
+            'fields': ('average_rating', 'rating_count', 'rating_sum')
+        }),
     )
+    readonly_fields = ('average_rating', 'rating_count', 'rating_sum')
+    actions = ['adjust_price_stock', 'activate_products', 'deactivate_products',
+               'feature_products', 'unfeature_products']
+
+    def adjust_price_stock(self, request, queryset):
+        form = BulkAdjustForm(request.POST if 'apply' in request.POST else None)
+        preview = None
+        if form.is_valid():
+            field, value = form.cleaned_data['field'], form.cleaned_data['value']
+            result = self._bulk_update(
+                request, queryset, {field: (form.cleaned_data['mode'], value)},
+                dry_run=form.cleaned_data['dry_run'],
+            )
+            if result['applied']:
+                return None
+            preview = result
+        return TemplateResponse(request, 'admin/products/product/bulk_adjust.html', {
+            **self.admin_site.each_context(request),
+            'title': 'Adjust price or stock',
+            'opts': self.model._meta,
+            'form': form,
+            'queryset': queryset,
+            'preview': preview,
+        })
+    adjust_price_stock.short_description = "Adjust price or stock of selected products"
+
+    def activate_products(self, request, queryset):
+        self._bulk_update(request, queryset, {'is_active': True})
+    activate_products.short_description = "Activate selected products"
+
+    def deactivate_products(self, request, queryset):
+        self._bulk_update(request, queryset, {'is_active': False})
+    deactivate_products.short_description = "Deactivate selected products"
+
+    def feature_products(self, request, queryset):
+        self._bulk_update(request, queryset, {'is_featured': True})
+    feature_products.short_description = "Feature selected products"
+
+    def unfeature_products(self, request, queryset):
+        self._bulk_update(request, queryset, {'is_featured': False})
+    unfeature_products.short_description = "Unfeature selected products"
+
+    def _bulk_update(self, request, queryset, changes, dry_run=False):
+        # One bulk_update instead of a save() and its signals per product
+        skus = list(queryset.values_list('sku', flat=True))
+        result = bulk_update_products([{'skus': skus, **changes}], dry_run=dry_run, max_reported=100)
+        if result['applied']:
+            self.message_user(request, f"Updated {result['changed']} of {result['matched']} products.")
+        elif result['errors']:
+            self.message_user(
+                request, f"Nothing was changed: {len(result['errors'])} products failed validation.",
+                messages.ERROR
+            )
+        return result
 
 admin.site.register(Product, ProductAdmin)
 
@@ -60,11 +142,38 @@ class ProductReviewAdmin(admin.ModelAdmin):
     actions = ['approve_reviews', 'disapprove_reviews']
 
     def approve_reviews(self, request, queryset):
-        queryset.update(is_approved=True)
+        self._set_approval(queryset, True)
     approve_reviews.short_description = "Approve selected reviews"
 
     def disapprove_reviews(self, request, queryset):
-        queryset.update(is_approved=False)
+        self._set_approval(queryset, False)
     disapprove_reviews.short_description = "Disapprove selected reviews"
 
-admin.site.register(ProductReview, ProductReviewAdmin)
\ No newline at end of file
+    def _set_approval(self, queryset, is_approved):
+        # update() skips post_save, so refresh the affected products directly
+        product_ids = set(queryset.values_list('product_id', flat=True))
+        queryset.update(is_approved=is_approved)
+        Product.refresh_rating_aggregates(product_ids)
+        invalidate_products(product_ids)
+
+admin.site.register(ProductReview, ProductReviewAdmin)
+
+class CatalogSnapshotAdmin(admin.ModelAdmin):
+    list_display = ('date', 'total_products', 'active_products', 'out_of_stock', 'low_stock', 'new_products', 'average_rating')
+    readonly_fields = [field.name for field in CatalogSnapshot._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+admin.site.register(CatalogSnapshot, CatalogSnapshotAdmin)
+
+class StockAlertAdmin(admin.ModelAdmin):
+    list_display = ('sku', 'previous_level', 'level', 'quantity', 'threshold', 'created_at')
+    list_filter = ('level',)
+    search_fields = ('sku',)
+    readonly_fields = [field.name for field in StockAlert._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+admin.site.register(StockAlert, StockAlertAdmin)
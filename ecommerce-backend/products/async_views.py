@@ -0,0 +1,124 @@
+"""
+Async (ASGI) variants of the catalog read endpoints, under /api/v1/async/.
+
+Each view is its sync counterpart with the async mixins from
+ecommerce.asyncapi in front: the same querysets, filters, pagination,
+serializers and response cache, so the responses are identical. Queries
+that do not depend on each other run concurrently. Writes stay on the
+sync views.
+"""
+from rest_framework.response import Response
+
+from ecommerce.asyncapi import (
+    AsyncGenericAPIView, AsyncListModelMixin, AsyncRetrieveModelMixin,
+    apaginate_queryset, aprefetch, run_in_pool, split_prefetches,
+)
+
+from .views import (
+    CategoryDetailView, CategoryListCreateView, ProductBatchView, ProductDetailView,
+    ProductListView,
+)
+
+READ_METHODS = ['get', 'head', 'options']
+
+
+class AsyncCachedResponseMixin:
+    """
+    CachedResponseMixin.get() (products.cache) for ecommerce.asyncapi
+    views. Goes ahead of a view that uses CachedResponseMixin; cache round
+    trips and namespace lookups run in the database pool.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        key, etag, last_modified = await run_in_pool(self.get_validators, request)
+        not_modified = self.get_not_modified(request, etag, last_modified)
+        if not_modified is not None and await run_in_pool(self.resource_exists, key):
+            return not_modified
+
+        if request.user.is_authenticated:
+            response = await super().get(request, *args, **kwargs)
+        else:
+            data = await run_in_pool(self.get_cached_data, key)
+            if data is not None:
+                response = Response(data)
+            else:
+                response = await super().get(request, *args, **kwargs)
+                await run_in_pool(self.set_cached_data, key, response)
+
+        if response.status_code == 200:
+            self.add_validators(response, etag, last_modified)
+        return response
+
+
+class AsyncRowListMixin(AsyncListModelMixin):
+    """
+    RowListMixin.list() (products.rows) for ecommerce.asyncapi views. Goes
+    ahead of a view that uses RowListMixin.
+    """
+
+    async def alist(self, request, *args, **kwargs):
+        serializer = self.get_row_serializer()
+        if serializer is None:
+            return await super().alist(request, *args, **kwargs)
+
+        queryset = await run_in_pool(self.filter_queryset, self.get_queryset())
+        get_cursor_fields = getattr(self.paginator, 'get_cursor_fields', None)
+        extra = get_cursor_fields(request, queryset, self) if get_cursor_fields else ()
+        rows = serializer.values(queryset, *extra)
+
+        page = await apaginate_queryset(self.paginator, rows, request, self)
+        if page is not None:
+            return self.get_paginated_response(serializer.serialize(page))
+        return Response(serializer.serialize(await run_in_pool(list, rows)))
+
+
+class AsyncBatchRetrieveMixin:
+    """
+    BatchRetrieveMixin for ecommerce.asyncapi views.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        return await self.aretrieve_batch()
+
+    async def post(self, request, *args, **kwargs):
+        return await self.aretrieve_batch()
+
+    async def aretrieve_batch(self):
+        queryset, attribute, requested = self.get_batch_lookup()
+        queryset, lookups = split_prefetches(queryset)
+        instances = await run_in_pool(list, queryset)
+        await aprefetch(instances, lookups)
+        instances, missing = self.match_batch(instances, attribute, requested)
+        return Response({
+            'results': await self.aserialize(instances, many=True),
+            'missing': missing,
+        })
+
+
+class AsyncProductListView(AsyncCachedResponseMixin, AsyncRowListMixin, AsyncGenericAPIView, ProductListView):
+    http_method_names = READ_METHODS
+
+
+class AsyncProductDetailView(AsyncCachedResponseMixin, AsyncRetrieveModelMixin, AsyncGenericAPIView,
+                             ProductDetailView):
+    http_method_names = READ_METHODS
+    # The nested category queries its children when nested deeper than CATEGORY_MAX_DEPTH
+    serialize_in_pool = True
+
+
+class AsyncProductBatchView(AsyncCachedResponseMixin, AsyncBatchRetrieveMixin, AsyncGenericAPIView,
+                            ProductBatchView):
+    http_method_names = ['get', 'post', 'head', 'options']
+    serialize_in_pool = True
+
+
+class AsyncCategoryListView(AsyncCachedResponseMixin, AsyncListModelMixin, AsyncGenericAPIView,
+                            CategoryListCreateView):
+    http_method_names = READ_METHODS
+    # Categories nested deeper than CATEGORY_MAX_DEPTH (older data) query their children
+    serialize_in_pool = True
+
+
+class AsyncCategoryDetailView(AsyncRetrieveModelMixin, AsyncGenericAPIView, CategoryDetailView):
+    http_method_names = READ_METHODS
+    serialize_in_pool = True
@@ -0,0 +1,433 @@
+"""
+Endpoint benchmarks driven through the Django test client.
+
+Each scenario is one or more URLs requested in rotation. Every timed
+request records its latency, query count and response size; one extra
+request per scenario runs under tracemalloc for its peak allocation. The
+result is plain JSON so runs can be stored and compared across commits.
+"""
+import io
+import platform
+import resource
+import statistics
+import subprocess
+import time
+import tracemalloc
+import uuid
+from collections import OrderedDict, namedtuple
+from datetime import date, datetime, time as clock_time, timedelta, timezone
+from decimal import Decimal
+from itertools import cycle
+
+import django
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.db.models.functions import Length
+from django.test import Client, RequestFactory
+from django.utils.translation import gettext_lazy
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework_simplejwt.tokens import AccessToken
+
+from ecommerce.fastjson import FastJSONParser, FastJSONRenderer
+from ecommerce.instrumentation import percentiles
+
+from .models import Category, Product, ProductReview
+from .pagination import KeysetPagination
+from .search import ProductSearchFilter
+from .serializers import (
+    ProductBatchSerializer, ProductListRowSerializer, ProductListSerializer, ProductReviewRowSerializer, ProductReviewSerializer,
+)
+from .views import product_list_queryset
+
+API_PREFIX = '/api/v1/'
+SAMPLE_SIZE = 20
+# Page-number and cursor scenarios at this depth show whether deep pages stay flat
+DEEP_PAGE = 5000
+
+Scenario = namedtuple('Scenario', 'name paths')
+
+
+def sample_slugs(count=SAMPLE_SIZE):
+    # Spread over the id range; ORDER BY random() would scan the whole table
+    bounds = Product.objects.filter(is_active=True).order_by('pk').values_list('pk', flat=True)
+    first, last = bounds.first(), bounds.last()
+    if first is None:
+        return []
+    step = max((last - first) // count, 1)
+    slugs = []
+    for start in range(first, last + 1, step):
+        slug = bounds.filter(pk__gte=start).values_list('slug', flat=True).first()
+        if slug and slug not in slugs:
+            slugs.append(slug)
+        if len(slugs) == count:
+            break
+    return slugs
+
+
+def deep_page_paths(products, page=DEEP_PAGE):
+    """
+    The same page of the default product list by page number and by the
+    cursor a client paging from the start would hold there. The page is
+    clamped to the last one of the catalog.
+    """
+    page_size = KeysetPagination.page_size
+    ordered = Product.objects.filter(is_active=True).order_by('-created_at', '-id')
+    page = max(min(page, -(-ordered.count() // page_size)), 1)
+    if page == 1:
+        return page, f'{products}?page=1', f'{products}?pagination=cursor'
+    # The cursor points at the last row of the previous page
+    row = ordered.values('created_at', 'id')[(page - 1) * page_size - 1]
+    paginator = KeysetPagination()
+    paginator.field = 'created_at'
+    paginator.base_url = f'{products}?pagination=cursor'
+    return page, f'{products}?page={page}', paginator.encode_cursor(row)
+
+
+def build_scenarios(search='leather'):
+    """
+    The default suite: the product list in its common shapes, search,
+    detail, reviews, batch reads and the category endpoints.
+    """
+    slugs = sample_slugs()
+    if not slugs:
+        return []
+    categories = Category.objects.filter(is_active=True)
+    root = categories.filter(parent__isnull=True).order_by('pk').values_list('slug', flat=True).first()
+    # Longest path first: the deepest category
+    leaf = categories.order_by(Length('path').desc(), 'pk').values_list('slug', flat=True).first()
+
+    products = f'{API_PREFIX}products/'
+    deep_page, deep_page_path, deep_cursor_path = deep_page_paths(products)
+    scenarios = [
+        Scenario('product-list', [products]),
+        Scenario('product-list-deep-page', [f'{products}?page=50']),
+        Scenario(f'product-list-page-{deep_page}', [deep_page_path]),
+        Scenario('product-list-cursor', [f'{products}?pagination=cursor']),
+        Scenario(f'product-list-cursor-page-{deep_page}', [deep_cursor_path]),
+        Scenario('product-list-sparse', [f'{products}?fields=id,name,slug,price']),
+        Scenario('product-list-filtered', [
+            f'{products}?in_stock=true&min_price=20&max_price=200&ordering=-price'
+        ]),
+        Scenario('product-search', [f'{products}?search={search}']),
+        Scenario('product-detail', [f'{products}{slug}/' for slug in slugs]),
+        Scenario('product-reviews', [f'{products}{slug}/reviews/' for slug in slugs]),
+        Scenario('product-batch', [f'{products}batch/?slugs={",".join(slugs)}']),
+        Scenario('category-list', [f'{API_PREFIX}categories/']),
+        Scenario('category-tree', [f'{API_PREFIX}categories/tree/']),
+    ]
+    if root:
+        scenarios.append(Scenario('product-list-category-root', [f'{products}?category={root}']))
+    if leaf and leaf != root:
+        scenarios.append(Scenario('product-list-category-leaf', [f'{products}?category={leaf}']))
+    return scenarios
+
+
+def default_host():
+    # The test client's "testserver" is only allowed under the test runner
+    for host in settings.ALLOWED_HOSTS:
+        if host != '*':
+            return host.lstrip('.')
+    return 'localhost'
+
+
+def build_client(user=None, host=None):
+    headers = {'HTTP_HOST': host or default_host(), 'HTTP_ACCEPT': 'application/json'}
+    if user is not None:
+        # Authenticated requests skip the anonymous response cache
+        headers['HTTP_AUTHORIZATION'] = f'Bearer {AccessToken.for_user(user)}'
+    return Client(**headers)
+
+
+def summarize(values, digits=2):
+    if not values:
+        return {}
+    return {
+        'mean': round(statistics.fmean(values), digits),
+        'min': round(min(values), digits),
+        'max': round(max(values), digits),
+        **{name: round(value, digits) for name, value in percentiles(values).items()},
+    }
+
+
+class QueryCounter:
+    # An execute_wrapper: unlike connection.queries it needs no debug cursor
+    # and is not capped at 9000 entries
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def run_scenario(client, scenario, iterations, warmup=5, memory=True):
+    paths = cycle(scenario.paths)
+    for _ in range(warmup):
+        client.get(next(paths))
+
+    latencies, queries, sizes, errors = [], [], [], 0
+    for _ in range(iterations):
+        path = next(paths)
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            started = time.perf_counter()
+            response = client.get(path)
+            latencies.append((time.perf_counter() - started) * 1000)
+        queries.append(counter.count)
+        sizes.append(len(response.content))
+        if response.status_code != 200:
+            errors += 1
+
+    result = {
+        'requests': iterations,
+        'errors': errors,
+        'latency_ms': summarize(latencies),
+        'queries': summarize(queries),
+        'bytes': summarize(sizes, digits=0),
+    }
+    if memory:
+        # Separate request: tracing slows everything down several times
+        tracemalloc.start()
+        try:
+            client.get(next(paths))
+            result['peak_alloc_kb'] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(client, scenarios, iterations, warmup=5, memory=True, log=None):
+    results = {}
+    for scenario in scenarios:
+        results[scenario.name] = run_scenario(client, scenario, iterations, warmup, memory)
+        if log:
+            latency = results[scenario.name]['latency_ms']
+            log(f"{scenario.name}: p50 {latency['p50']}ms, p95 {latency['p95']}ms")
+    return {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'products': Product.objects.count(),
+            'categories': Category.objects.count(),
+            'iterations': iterations,
+            'warmup': warmup,
+            # Kilobytes on Linux
+            'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        },
+        'scenarios': results,
+    }
+
+
+def compare(baseline, current, metrics=(('latency_ms', 'p50'), ('latency_ms', 'p95'), ('queries', 'mean'))):
+    """
+    Rows of (scenario, metric, before, after, change %) for the scenarios
+    present in both runs.
+    """
+    rows = []
+    for name, result in current['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if previous is None:
+            continue
+        for group, key in metrics:
+            before = previous.get(group, {}).get(key)
+            after = result.get(group, {}).get(key)
+            if before is None or after is None:
+                continue
+            change = round((after - before) * 100 / before, 1) if before else None
+            rows.append((name, f'{group}.{key}', before, after, change))
+    return rows
+
+
+def serializer_cases():
+    # (ModelSerializer, RowSerializer, queryset) as the list views build them
+    list_fields = ProductListSerializer().get_field_names_for_output()
+    return {
+        'product-list': (
+            ProductListSerializer, ProductListRowSerializer,
+            product_list_queryset(list_fields).order_by('pk'),
+        ),
+        'product-reviews': (
+            ProductReviewSerializer, ProductReviewRowSerializer,
+            ProductReview.objects.filter(is_approved=True).select_related('user').order_by('pk'),
+        ),
+    }
+
+
+def best_of(repeat, function):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def serializer_throughput(serializer_class, row_serializer_class, queryset, count=1000, repeat=5):
+    """
+    Rows per second through the ModelSerializer (model instances, with
+    the view's prefetches) and through its RowSerializer (.values() rows),
+    on the same already fetched rows, plus whether both render the same
+    JSON bytes.
+    """
+    started = time.perf_counter()
+    instances = list(queryset[:count])
+    instance_fetch = time.perf_counter() - started
+    started = time.perf_counter()
+    rows = list(row_serializer_class().values(queryset)[:count])
+    row_fetch = time.perf_counter() - started
+
+    renderer = JSONRenderer()
+    identical = (
+        renderer.render(serializer_class(instances, many=True).data) ==
+        renderer.render(row_serializer_class().serialize(rows))
+    )
+    model_time = best_of(repeat, lambda: serializer_class(instances, many=True).data)
+    row_time = best_of(repeat, lambda: row_serializer_class().serialize(rows))
+    return {
+        'rows': len(rows),
+        'identical_json': identical,
+        'fetch_ms': {'model': round(instance_fetch * 1000, 2), 'values': round(row_fetch * 1000, 2)},
+        'rows_per_second': {
+            'model': round(len(instances) / model_time) if model_time else None,
+            'values': round(len(rows) / row_time) if row_time else None,
+        },
+        'speedup': round(model_time / row_time, 2) if row_time else None,
+    }
+
+
+def golden_payloads():
+    # Values the fast renderer has to write exactly like the stdlib one
+    errors = ProductBatchSerializer(data={'ids': ['x'], 'shape': 'square'})
+    errors.is_valid()
+    return {
+        'golden-types': OrderedDict([
+            ('decimals', [Decimal('12.50'), Decimal('3'), Decimal('-0.01'), Decimal('99999999.99')]),
+            ('lazy', gettext_lazy('Not found.')),
+            ('datetimes', [
+                datetime(2024, 1, 2, 3, 4, 5, 678901),
+                datetime(2024, 1, 2, 3, 4, 5),
+                datetime(2024, 1, 2, 3, 4, 5, 1, tzinfo=timezone.utc),
+                datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone(timedelta(hours=3))),
+            ]),
+            ('date', date(2024, 2, 29)),
+            ('time', clock_time(23, 59, 58, 5)),
+            ('timedelta', timedelta(days=1, microseconds=5)),
+            ('uuid', uuid.UUID('12345678-1234-5678-1234-567812345678')),
+            ('text', ['Caf\u00e9 \u2713 \U0001f600', 'line\u2028para\u2029', '\x00\x1f"\\/\t']),
+            ('numbers', [0, -1, 2 ** 63 - 1, 0.0, 1.5, -2.25, 37.47, 1 / 3, 1e15]),
+            ('int_keys', {1: 'a', 2: 'b'}),
+            ('tuple', (1, 'two', None, True, False)),
+            ('queryset', Category.objects.none()),
+        ]),
+        'golden-big-int': {'value': 2 ** 70 + 1},
+        'golden-errors': errors.errors,
+    }
+
+
+def endpoint_payloads(client):
+    # response.data of the heaviest reads, as the renderer receives it
+    slugs = sample_slugs()
+    products = f'{API_PREFIX}products/'
+    paths = {
+        'product-list': products,
+        'product-list-100': f'{products}?pagination=cursor&page_size=100',
+        'product-detail': f'{products}{slugs[0]}/' if slugs else None,
+        'product-batch-detail': f'{products}batch/?shape=detail&slugs={",".join(slugs)}' if slugs else None,
+        'category-list': f'{API_PREFIX}categories/',
+        'category-tree': f'{API_PREFIX}categories/tree/',
+    }
+    payloads = {}
+    for name, path in paths.items():
+        if path is None:
+            continue
+        response = client.get(path)
+        if response.status_code == 200:
+            payloads[name] = response.data
+    return payloads
+
+
+def renderer_throughput(data, repeat=20):
+    """
+    Render ``data`` with DRF's JSONRenderer and FastJSONRenderer, parse the
+    result back with both parsers, and time each step (best of ``repeat``).
+    """
+    stdlib, fast = JSONRenderer(), FastJSONRenderer()
+    expected = stdlib.render(data)
+    rendered = fast.render(data)
+    parse = lambda parser: parser.parse(io.BytesIO(expected))
+    render_stdlib = best_of(repeat, lambda: stdlib.render(data))
+    render_fast = best_of(repeat, lambda: fast.render(data))
+    parse_stdlib = best_of(repeat, lambda: parse(JSONParser()))
+    parse_fast = best_of(repeat, lambda: parse(FastJSONParser()))
+    return {
+        'bytes': len(expected),
+        'identical_output': rendered == expected,
+        'identical_parse': parse(FastJSONParser()) == parse(JSONParser()),
+        'render_us': {'stdlib': round(render_stdlib * 1e6, 1), 'fast': round(render_fast * 1e6, 1)},
+        'parse_us': {'stdlib': round(parse_stdlib * 1e6, 1), 'fast': round(parse_fast * 1e6, 1)},
+        'render_speedup': round(render_stdlib / render_fast, 2) if render_fast else None,
+        'parse_speedup': round(parse_stdlib / parse_fast, 2) if parse_fast else None,
+    }
+
+
+# What ?search= ran before ProductSearchFilter: DRF's SearchFilter over these
+LEGACY_SEARCH_FIELDS = ('name', 'description', 'sku', 'category__name')
+
+
+def search_querysets(terms):
+    """
+    The product list's ?search= query before and after the full-text
+    search backend, in the order each returns its results.
+    """
+    products = Product.objects.filter(is_active=True).defer('search_vector')
+    legacy = products
+    for term in terms.split():
+        legacy = legacy.filter(
+            Q(*(Q(**{f'{field}__icontains': term}) for field in LEGACY_SEARCH_FIELDS), _connector=Q.OR)
+        )
+    request = Request(RequestFactory().get('/', {'search': terms}))
+    return {
+        'icontains': legacy.order_by('-created_at', '-id'),
+        'fulltext': ProductSearchFilter().filter_queryset(request, products, None),
+    }
+
+
+def search_comparison(terms, page_size=20, repeat=5):
+    """
+    Plans and best-of-``repeat`` timings of the first page and the COUNT(*)
+    of a search, for the icontains scan it replaced and the full-text query.
+    """
+    results = {}
+    for name, queryset in search_querysets(terms).items():
+        page = queryset[:page_size]
+        results[name] = {
+            'matches': queryset.count(),
+            'page_ms': round(best_of(repeat, lambda: list(page.all())) * 1000, 2),
+            'count_ms': round(best_of(repeat, queryset.count) * 1000, 2),
+            'page_plan': page.explain(analyze=True).splitlines(),
+            'count_plan': queryset.order_by().explain(analyze=True).splitlines(),
+        }
+    legacy, fulltext = results['icontains'], results['fulltext']
+    return {
+        'terms': terms,
+        'products': Product.objects.count(),
+        **results,
+        'page_speedup': round(legacy['page_ms'] / fulltext['page_ms'], 2) if fulltext['page_ms'] else None,
+        'count_speedup': round(legacy['count_ms'] / fulltext['count_ms'], 2) if fulltext['count_ms'] else None,
+    }
@@ -0,0 +1,155 @@
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import transaction
+from django.utils import timezone
+
+from .cache import invalidate_products
+from .models import Product
+from .stock import StockChange, record_stock_changes, stock_level
+
+DEFAULT_BATCH_SIZE = 500
+
+SET = 'set'
+DELTA = 'delta'
+PERCENT = 'percent'
+
+NUMERIC_FIELDS = ('price', 'compare_at_price', 'quantity')
+FLAG_FIELDS = ('is_active', 'is_featured')
+UPDATE_FIELDS = NUMERIC_FIELDS + FLAG_FIELDS
+
+CENT = Decimal('0.01')
+# Largest value a DecimalField(max_digits=10, decimal_places=2) holds
+MAX_PRICE = Decimal('99999999.99')
+
+
+class BulkUpdateFailed(Exception):
+    # Raised inside the transaction to roll back a dry run or a failed update
+    pass
+
+
+def merge_updates(updates):
+    """
+    Flatten ``[{'skus': [...], <field>: <change>, ...}]`` into one change set
+    per SKU; a later entry for the same SKU and field wins.
+    """
+    merged = {}
+    for update in updates:
+        changes = {field: update[field] for field in UPDATE_FIELDS if field in update}
+        for sku in update['skus']:
+            merged.setdefault(sku, {}).update(changes)
+    return merged
+
+
+def apply_change(field, current, change):
+    if field in FLAG_FIELDS:
+        return change
+    mode, value = change
+    if mode == SET:
+        new = value
+    elif current is None:
+        raise ValueError(f'{field} is not set, so it cannot be adjusted')
+    elif mode == DELTA:
+        new = current + value
+    else:
+        new = Decimal(current) * (1 + Decimal(value) / 100)
+    if new is None:
+        return None
+    if field == 'quantity':
+        # Percentages of stock round to whole units
+        new = int(Decimal(new).to_integral_value(ROUND_HALF_UP))
+        if new < 0:
+            raise ValueError('Quantity cannot be negative')
+    else:
+        new = Decimal(new).quantize(CENT, ROUND_HALF_UP)
+        if new <= 0:
+            raise ValueError('Price must be greater than 0')
+        if new > MAX_PRICE:
+            raise ValueError(f'{field} cannot exceed {MAX_PRICE}')
+    return new
+
+
+def _lock_batch(skus):
+    return (
+        Product.objects.select_for_update()
+        .filter(sku__in=skus)
+        .only('id', 'sku', 'slug', 'low_stock_threshold', *UPDATE_FIELDS)
+        .order_by('pk')
+    )
+
+
+def bulk_update_products(updates, dry_run=False, batch_size=DEFAULT_BATCH_SIZE, max_reported=None):
+    """
+    Apply price/stock/flag changes to many SKUs with one bulk_update per batch.
+
+    Changes are ``('set'|'delta'|'percent', value)`` tuples for the numeric
+    fields and plain booleans for the flags. Validation mirrors
+    ProductSerializer.validate_price/validate_quantity; if any SKU fails, or
+    on a dry run, the whole transaction is rolled back. Rows are locked with
+    SELECT ... FOR UPDATE, so deltas never lose a concurrent write.
+    """
+    merged = merge_updates(updates)
+    skus = sorted(merged)
+    changes, errors = [], []
+    changed_ids = []
+    activity_changed = False
+
+    try:
+        with transaction.atomic():
+            now = timezone.now()
+            for start in range(0, len(skus), batch_size):
+                batch = skus[start:start + batch_size]
+                products = {product.sku: product for product in _lock_batch(batch)}
+                dirty, stock_changes = [], []
+                for sku in batch:
+                    product = products.get(sku)
+                    if product is None:
+                        errors.append({'sku': sku, 'error': 'not_found'})
+                        continue
+                    diff = {}
+                    try:
+                        for field, change in merged[sku].items():
+                            old = getattr(product, field)
+                            new = apply_change(field, old, change)
+                            if new != old:
+                                diff[field] = {'old': old, 'new': new}
+                    except ValueError as exc:
+                        errors.append({'sku': sku, 'error': str(exc)})
+                        continue
+                    if not diff:
+                        continue
+                    if 'quantity' in diff:
+                        stock_changes.append(StockChange(
+                            product.pk, None, sku,
+                            stock_level(diff['quantity']['old'], product.low_stock_threshold),
+                            diff['quantity']['new'], product.low_stock_threshold,
+                        ))
+                    for field, values in diff.items():
+                        setattr(product, field, values['new'])
+                    product.updated_at = now
+                    dirty.append(product)
+                    changed_ids.append(product.pk)
+                    activity_changed = activity_changed or 'is_active' in diff
+                    if max_reported is None or len(changes) < max_reported:
+                        changes.append({'sku': sku, 'changes': diff})
+                if dirty and not errors:
+                    # bulk_update skips save() and auto_now, hence updated_at above
+                    Product.objects.bulk_update(dirty, [*UPDATE_FIELDS, 'updated_at'])
+                    record_stock_changes(stock_changes)
+            if errors or dry_run:
+                raise BulkUpdateFailed
+    except BulkUpdateFailed:
+        applied = False
+    else:
+        applied = True
+
+    if applied and changed_ids:
+        # bulk_update bypasses post_save, so bump the cached responses directly
+        invalidate_products(changed_ids, counts_changed=activity_changed)
+    return {
+        'dry_run': dry_run,
+        'applied': applied,
+        'matched': len(skus) - sum(1 for error in errors if error['error'] == 'not_found'),
+        'changed': len(changed_ids),
+        'changes': changes,
+        'errors': errors if max_reported is None else errors[:max_reported],
+    }
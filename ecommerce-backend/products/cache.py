@@ -0,0 +1,201 @@
+import hashlib
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from .models import Product
+
+# Namespaces that cached responses depend on; bumping one orphans its entries
+PRODUCTS = 'products'
+CATEGORIES = 'categories'
+# Every product detail at once, for bulk writes that touch many products
+PRODUCT_DETAILS = 'product-details'
+
+VERSION_KEY = 'catalog:version:{}'
+CHANGED_KEY = 'catalog:changed:{}'
+RESPONSE_KEY = 'catalog:response:{}'
+STATS_KEY = 'catalog:stats:{}'
+STATS_EVENTS = ('hits', 'misses', 'invalidations')
+
+
+def get_cache():
+    return caches[settings.CATALOG_CACHE_ALIAS]
+
+
+def product_namespace(slug):
+    return f'product:{slug}'
+
+
+def _new_version():
+    # Time based, so a version that fell out of the cache never comes back
+    return int(time.time() * 1000)
+
+
+def get_namespace_state(namespaces):
+    """
+    Return ([version, ...], last_modified) for the namespaces in one round trip.
+    """
+    cache = get_cache()
+    version_keys = [VERSION_KEY.format(namespace) for namespace in namespaces]
+    changed_keys = [CHANGED_KEY.format(namespace) for namespace in namespaces]
+    values = cache.get_many(version_keys + changed_keys)
+    for key in version_keys:
+        if key not in values:
+            cache.add(key, _new_version(), None)
+            values[key] = cache.get(key)
+    for key in changed_keys:
+        if key not in values:
+            # Unknown change time: assume now so clients revalidate
+            cache.add(key, time.time(), None)
+            values[key] = cache.get(key)
+    last_modified = max((values[key] for key in changed_keys), default=None)
+    return [values[key] for key in version_keys], last_modified
+
+
+def get_versions(namespaces):
+    return get_namespace_state(namespaces)[0]
+
+
+def bump(*namespaces):
+    cache = get_cache()
+    now = time.time()
+    for namespace in set(namespaces):
+        key = VERSION_KEY.format(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _new_version(), None)
+        cache.set(CHANGED_KEY.format(namespace), now, None)
+        record('invalidations')
+
+
+def invalidate_products(product_ids, counts_changed=False):
+    """
+    For set-based updates that bypass post_save. ``product_ids`` may be a
+    subquery. ``counts_changed`` when products were (de)activated, since
+    active product counts appear in the category list and tree.
+    """
+    slugs = Product.objects.filter(pk__in=product_ids).values_list('slug', flat=True)
+    namespaces = [PRODUCTS, *(product_namespace(slug) for slug in slugs)]
+    if counts_changed:
+        namespaces.append(CATEGORIES)
+    bump(*namespaces)
+
+
+def build_key(request, namespaces, versions=None):
+    # Absolute URL because pagination links embed scheme and host
+    params = sorted(
+        (name, values) for name, values in request.query_params.lists()
+    )
+    if versions is None:
+        versions = get_versions(namespaces)
+    raw = repr((request.build_absolute_uri(request.path), params, versions))
+    return RESPONSE_KEY.format(hashlib.md5(raw.encode('utf-8')).hexdigest())
+
+
+def build_etag(key, request):
+    # The same data renders differently per media type (JSON vs browsable API)
+    raw = f'{key}:{request.accepted_media_type}'
+    return '"%s"' % hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+
+def record(event):
+    cache = get_cache()
+    key = STATS_KEY.format(event)
+    if cache.add(key, 1, None):
+        return
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def get_stats():
+    cache = get_cache()
+    keys = {event: STATS_KEY.format(event) for event in STATS_EVENTS}
+    values = cache.get_many(keys.values())
+    return {event: values.get(key, 0) for event, key in keys.items()}
+
+
+class CachedResponseMixin:
+    """
+    Caches the serialized data of anonymous GET responses and answers
+    conditional GETs for everyone.
+
+    Views list the namespaces their output depends on in
+    get_cache_namespaces(); products.signals bumps those namespaces
+    when the underlying rows change. The ETag and Last-Modified
+    validators come from the same namespace state, so a 304 costs no
+    database queries unless a detail view has to confirm its object
+    exists.
+    """
+    cache_namespaces = ()
+
+    def get_cache_namespaces(self):
+        return list(self.cache_namespaces)
+
+    def get(self, request, *args, **kwargs):
+        key, etag, last_modified = self.get_validators(request)
+        not_modified = self.get_not_modified(request, etag, last_modified)
+        if not_modified is not None and self.resource_exists(key):
+            return not_modified
+
+        if request.user.is_authenticated:
+            response = super().get(request, *args, **kwargs)
+        else:
+            data = self.get_cached_data(key)
+            if data is not None:
+                response = Response(data)
+            else:
+                response = super().get(request, *args, **kwargs)
+                self.set_cached_data(key, response)
+
+        if response.status_code == 200:
+            self.add_validators(response, etag, last_modified)
+        return response
+
+    def get_validators(self, request):
+        versions, last_modified = get_namespace_state(self.get_cache_namespaces())
+        # Round up so a change later in the same second is never reported as older
+        last_modified = math.ceil(last_modified)
+        key = build_key(request, None, versions)
+        return key, build_etag(key, request), last_modified
+
+    def get_not_modified(self, request, etag, last_modified):
+        not_modified = get_conditional_response(
+            request._request, etag=etag, last_modified=last_modified
+        )
+        if not_modified is None:
+            return None
+        return self.add_validators(Response(status=not_modified.status_code), etag, last_modified)
+
+    def resource_exists(self, key):
+        # Matching validators only say the namespaces are unchanged; a detail
+        # view must not answer 304 for an object that is not there
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        if lookup_url_kwarg not in self.kwargs:
+            return True
+        # Only 200 responses are cached
+        if get_cache().has_key(key):
+            return True
+        queryset = self.filter_queryset(self.get_queryset())
+        return queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]}).exists()
+
+    def get_cached_data(self, key):
+        data = get_cache().get(key)
+        record('hits' if data is not None else 'misses')
+        return data
+
+    def set_cached_data(self, key, response):
+        if response.status_code == 200:
+            get_cache().set(key, response.data, settings.CATALOG_CACHE_TIMEOUT)
+
+    def add_validators(self, response, etag, last_modified):
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        return response
@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, Tags, register
+
+
+@register(Tags.caches, deploy=True)
+def check_catalog_cache(app_configs, **kwargs):
+    # The namespace versions behind every cached response and ETag live in
+    # this cache; with a per-process cache a bump in one worker never
+    # reaches the others, which keep serving stale bodies and 304s
+    if isinstance(caches[settings.CATALOG_CACHE_ALIAS], LocMemCache):
+        return [Error(
+            f'CATALOG_CACHE_ALIAS ({settings.CATALOG_CACHE_ALIAS!r}) is a LocMemCache, '
+            f'which is private to each process.',
+            hint='Set REDIS_URL, or run a single worker process.',
+            id='products.E001',
+        )]
+    return []
@@ -0,0 +1,152 @@
+import csv
+import io
+import zlib
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+
+from .models import Category, Product, ProductImage, ProductVariant
+
+DEFAULT_CHUNK_SIZE = 2000
+
+EXPORT_FIELDS = [
+    'id', 'sku', 'name', 'slug', 'description', 'price', 'compare_at_price',
+    'quantity', 'in_stock', 'category_path', 'image_url', 'average_rating',
+    'rating_count', 'variants', 'updated_at',
+]
+
+VARIANT_FIELDS = ('sku', 'name', 'value', 'price_adjustment', 'quantity')
+
+
+def category_paths():
+    # One query for every category, then "Parent > Child" names from the materialized path
+    names = dict(Category.objects.values_list('id', 'name'))
+    paths = {}
+    for category_id, path in Category.objects.values_list('id', 'path'):
+        ancestors = [int(part) for part in path.strip('/').split('/') if part]
+        paths[category_id] = ' > '.join(names[pk] for pk in ancestors if pk in names)
+    return paths
+
+
+def export_queryset():
+    return (
+        Product.objects.filter(is_active=True)
+        .defer('search_vector')
+        .order_by('pk')
+        .prefetch_related(
+            Prefetch('images', queryset=ProductImage.objects.only('product_id', 'image', 'is_primary', 'order')),
+            Prefetch('variants', queryset=ProductVariant.objects.only('product_id', *VARIANT_FIELDS)),
+        )
+    )
+
+
+def iter_records(chunk_size=DEFAULT_CHUNK_SIZE, build_url=None):
+    """
+    Yield one dict per active product.
+
+    iterator(chunk_size=...) keeps a server-side cursor open and runs the
+    image/variant prefetches once per chunk, so memory stays constant no
+    matter how large the catalog is.
+    """
+    paths = category_paths()
+    for product in export_queryset().iterator(chunk_size=chunk_size):
+        images = list(product.images.all())
+        primary = next((image for image in images if image.is_primary), images[0] if images else None)
+        image_url = None
+        if primary:
+            image_url = build_url(primary.image.url) if build_url else primary.image.url
+        yield {
+            'id': product.pk,
+            'sku': product.sku,
+            'name': product.name,
+            'slug': product.slug,
+            'description': product.description,
+            'price': product.price,
+            'compare_at_price': product.compare_at_price,
+            'quantity': product.quantity,
+            'in_stock': product.in_stock,
+            'category_path': paths.get(product.category_id, ''),
+            'image_url': image_url,
+            'average_rating': product.average_rating,
+            'rating_count': product.rating_count,
+            'variants': [
+                {field: getattr(variant, field) for field in VARIANT_FIELDS}
+                for variant in product.variants.all()
+            ],
+            'updated_at': product.updated_at,
+        }
+
+
+def iter_jsonl(records):
+    encoder = DjangoJSONEncoder()
+    for record in records:
+        yield encoder.encode(record) + '\n'
+
+
+def iter_csv(records):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    encoder = DjangoJSONEncoder()
+    for record in records:
+        # Variants do not fit a flat row, so they travel as a JSON column
+        writer.writerow(dict(record, variants=encoder.encode(record['variants'])))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+WRITERS = {'csv': iter_csv, 'jsonl': iter_jsonl}
+CONTENT_TYPES = {'csv': 'text/csv', 'jsonl': 'application/x-ndjson'}
+
+
+def iter_bytes(lines, compress=False, buffer_size=64 * 1024):
+    # Group small lines into larger writes; gzip through a streaming compressor
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    pending = []
+    size = 0
+    for line in lines:
+        pending.append(line)
+        size += len(line)
+        if size >= buffer_size:
+            data = ''.join(pending).encode('utf-8')
+            pending, size = [], 0
+            if compressor:
+                data = compressor.compress(data)
+            if data:
+                yield data
+    data = ''.join(pending).encode('utf-8')
+    if compressor:
+        data = compressor.compress(data) + compressor.flush()
+    if data:
+        yield data
+
+
+def export_catalog(file_format, compress=False, chunk_size=DEFAULT_CHUNK_SIZE, build_url=None):
+    records = iter_records(chunk_size=chunk_size, build_url=build_url)
+    return iter_bytes(WRITERS[file_format](records), compress=compress)
+
+
+async def aiter_chunks(chunks):
+    """
+    ``chunks`` as an async iterator, one chunk per step in a sync thread.
+
+    Under ASGI, Django 4.2 reads a sync StreamingHttpResponse iterator to
+    the end before sending anything, so the export would be held in memory.
+    thread_sensitive keeps every step, and the server-side cursor behind
+    them, on the request's one sync thread.
+    """
+    step = sync_to_async(next, thread_sensitive=True)
+    done = object()
+    try:
+        while True:
+            chunk = await step(chunks, done)
+            if chunk is done:
+                break
+            yield chunk
+    finally:
+        # Client went away: close the generator, and its cursor, on the same thread
+        await sync_to_async(chunks.close, thread_sensitive=True)()
@@ -0,0 +1,378 @@
+import codecs
+import csv
+import io
+import json
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.db import DatabaseError, IntegrityError, connection, transaction
+
+from . import cache
+from .models import Category, Product, ProductImage, ProductVariant
+from .slugs import allocate_slugs, slug_base
+from .stock import IN_STOCK, StockChange, record_stock_changes, stock_level
+
+DEFAULT_CHUNK_SIZE = 1000
+
+PRODUCT_UPDATE_FIELDS = [
+    'name', 'description', 'price', 'compare_at_price', 'cost_per_item',
+    'barcode', 'quantity', 'low_stock_threshold', 'category', 'is_active',
+    'is_featured', 'updated_at',
+]
+VARIANT_UPDATE_FIELDS = [
+    'product', 'name', 'value', 'price_adjustment', 'quantity', 'low_stock_threshold',
+]
+
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 't'}
+FALSE_VALUES = {'0', 'false', 'no', 'n', 'f'}
+
+
+class RowError(ValueError):
+    pass
+
+
+def iter_csv(stream):
+    # Variants and images are JSON-encoded columns in CSV files
+    for row in csv.DictReader(stream):
+        for column in ('variants', 'images'):
+            if not row.get(column):
+                row[column] = None
+                continue
+            try:
+                row[column] = json.loads(row[column])
+            except ValueError:
+                row[column] = RowError(f'{column} must be a JSON array')
+        yield row
+
+
+def iter_jsonl(stream):
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as exc:
+            yield RowError(f'Invalid JSON: {exc}')
+
+
+READERS = {'csv': iter_csv, 'jsonl': iter_jsonl}
+
+
+def open_text(fileobj):
+    # Uploaded files and files opened in binary mode are decoded lazily;
+    # utf-8-sig drops the byte order mark Excel writes ahead of the header
+    if isinstance(fileobj, io.TextIOBase):
+        return fileobj
+    return codecs.getreader('utf-8-sig')(fileobj)
+
+
+def _decimal(row, field, required=False):
+    value = row.get(field)
+    if value in (None, ''):
+        if required:
+            raise RowError(f'{field} is required')
+        return None
+    try:
+        value = Decimal(str(value))
+    except InvalidOperation:
+        raise RowError(f'{field} must be a number')
+    # NaN and Infinity parse, but compare and store badly
+    if not value.is_finite():
+        raise RowError(f'{field} must be a number')
+    return value
+
+
+def _integer(row, field, default):
+    value = row.get(field)
+    if value in (None, ''):
+        return default
+    # int() would truncate 2.9 to 2
+    if isinstance(value, float) and not value.is_integer():
+        raise RowError(f'{field} must be an integer')
+    try:
+        return int(value)
+    except (TypeError, ValueError, OverflowError):
+        raise RowError(f'{field} must be an integer')
+
+
+def _boolean(row, field, default):
+    value = row.get(field)
+    if isinstance(value, bool):
+        return value
+    # A blank cell means the default, as it does for numbers
+    value = '' if value is None else str(value).strip().lower()
+    if not value:
+        return default
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise RowError(f'{field} must be a boolean')
+
+
+def build_variant(variant):
+    if not isinstance(variant, dict) or not variant.get('sku'):
+        raise RowError('Every variant needs a sku')
+    quantity = _integer(variant, 'quantity', 0)
+    if quantity < 0:
+        raise RowError('Variant quantity cannot be negative')
+    return {
+        'sku': str(variant['sku']),
+        'name': variant.get('name') or '',
+        'value': variant.get('value') or '',
+        'price_adjustment': _decimal(variant, 'price_adjustment') or Decimal('0'),
+        'quantity': quantity,
+        'low_stock_threshold': _integer(variant, 'low_stock_threshold', 10),
+    }
+
+
+def build_image(image):
+    # A path, or an object with the path and its alt text
+    if isinstance(image, str):
+        return {'image': image, 'alt_text': None}
+    if not isinstance(image, dict):
+        raise RowError('Every image must be a path or an object')
+    return {'image': image.get('image', ''), 'alt_text': image.get('alt_text')}
+
+
+def build_product(row, categories):
+    """
+    Validate one input row and return (Product, [variant dicts], [image dicts] or None).
+
+    The rules mirror ProductSerializer.validate_price/validate_quantity.
+    """
+    if isinstance(row, Exception):
+        raise row
+    if not isinstance(row, dict):
+        raise RowError('Row must be an object')
+    sku = str(row.get('sku') or '').strip()
+    name = str(row.get('name') or '').strip()
+    if not sku:
+        raise RowError('sku is required')
+    if not name:
+        raise RowError('name is required')
+
+    price = _decimal(row, 'price', required=True)
+    if price <= 0:
+        raise RowError('Price must be greater than 0')
+    quantity = _integer(row, 'quantity', 0)
+    if quantity < 0:
+        raise RowError('Quantity cannot be negative')
+
+    category_id = None
+    category_slug = row.get('category')
+    if category_slug:
+        category_id = categories.get(str(category_slug))
+        if category_id is None:
+            raise RowError(f'Unknown category {category_slug!r}')
+
+    variants = row.get('variants') or []
+    images = row.get('images')
+    for column, value in (('variants', variants), ('images', images)):
+        if isinstance(value, Exception):
+            raise value
+        if value is not None and not isinstance(value, list):
+            raise RowError(f'{column} must be a list')
+    variants = [build_variant(variant) for variant in variants]
+    if images is not None:
+        images = [build_image(image) for image in images]
+
+    product = Product(
+        name=name,
+        slug=row.get('slug') or '',
+        description=row.get('description') or '',
+        price=price,
+        compare_at_price=_decimal(row, 'compare_at_price'),
+        cost_per_item=_decimal(row, 'cost_per_item'),
+        sku=sku,
+        barcode=row.get('barcode') or None,
+        quantity=quantity,
+        low_stock_threshold=_integer(row, 'low_stock_threshold', 10),
+        category_id=category_id,
+        is_active=_boolean(row, 'is_active', True),
+        is_featured=_boolean(row, 'is_featured', False),
+    )
+    # Allocated per chunk in ProductImporter.write, and again on a retry
+    product._generate_slug = not product.slug
+    return product, variants, images
+
+
+class ProductImporter:
+    """
+    Streams product rows into the database in chunks.
+
+    Each chunk is validated in Python, upserted on ``sku`` with
+    ``bulk_create(update_conflicts=True)`` inside one transaction, and
+    falls back to row-by-row savepoints only if the chunk hits a
+    database error, so one bad row never aborts the import.
+    """
+
+    def __init__(self, chunk_size=DEFAULT_CHUNK_SIZE, max_errors=None, on_error=None):
+        self.chunk_size = chunk_size
+        self.max_errors = max_errors
+        self.on_error = on_error
+        self.created = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors = []
+        self.categories = dict(Category.objects.values_list('slug', 'id'))
+
+    def run(self, rows):
+        rows = enumerate(rows, start=1)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            self.import_chunk(chunk)
+        # Bulk writes bypass post_save, so refresh derived data once at the end
+        cache.bump(cache.PRODUCTS, cache.CATEGORIES, cache.PRODUCT_DETAILS)
+        return self.summary()
+
+    def summary(self):
+        return {
+            'created': self.created,
+            'updated': self.updated,
+            'failed': self.failed,
+            'errors': self.errors,
+        }
+
+    def record_error(self, line, message):
+        self.failed += 1
+        error = {'row': line, 'error': str(message)}
+        if self.on_error:
+            self.on_error(error)
+        if self.max_errors is None or len(self.errors) < self.max_errors:
+            self.errors.append(error)
+
+    def import_chunk(self, chunk):
+        valid = {}
+        for line, row in chunk:
+            try:
+                product, variants, images = build_product(row, self.categories)
+            except RowError as exc:
+                self.record_error(line, exc)
+                continue
+            # A later row for the same SKU wins, as it would row by row
+            valid[product.sku] = (line, product, variants, images)
+
+        if not valid:
+            return
+        try:
+            with transaction.atomic():
+                self.write(list(valid.values()))
+        except (IntegrityError, DatabaseError):
+            for entry in valid.values():
+                try:
+                    with transaction.atomic():
+                        self.write([entry])
+                except (IntegrityError, DatabaseError) as exc:
+                    self.record_error(entry[0], exc)
+
+    def write(self, entries):
+        skus = [product.sku for _, product, _, _ in entries]
+        # Previous stock levels, for the low-stock change feed
+        existing = {
+            sku: stock_level(quantity, threshold)
+            for sku, quantity, threshold in Product.objects.filter(sku__in=skus).values_list(
+                'sku', 'quantity', 'low_stock_threshold'
+            )
+        }
+
+        # Existing products keep their slug (it is not in PRODUCT_UPDATE_FIELDS),
+        # so only new rows without one get a slug, allocated for the whole chunk.
+        # A slug taken concurrently fails the chunk and the row-by-row retry
+        # allocates again.
+        unnamed = [
+            product for _, product, _, _ in entries
+            if product._generate_slug and product.sku not in existing
+        ]
+        max_length = Product._meta.get_field('slug').max_length
+        slugs = allocate_slugs(Product, [slug_base(product.name, max_length, 'product') for product in unnamed])
+        for product, slug in zip(unnamed, slugs):
+            product.slug = slug
+
+        Product.objects.bulk_create(
+            [product for _, product, _, _ in entries],
+            update_conflicts=True,
+            unique_fields=['sku'],
+            update_fields=PRODUCT_UPDATE_FIELDS,
+        )
+        # update_conflicts does not return primary keys, so look them up once
+        ids = dict(Product.objects.filter(sku__in=skus).values_list('sku', 'id'))
+
+        variants = [
+            ProductVariant(product_id=ids[product.sku], **variant)
+            for _, product, product_variants, _ in entries
+            for variant in product_variants
+        ]
+        existing_variants = {}
+        if variants:
+            existing_variants = {
+                sku: (pk, stock_level(quantity, threshold))
+                for sku, pk, quantity, threshold in ProductVariant.objects.filter(
+                    sku__in=[variant.sku for variant in variants]
+                ).values_list('sku', 'id', 'quantity', 'low_stock_threshold')
+            }
+            ProductVariant.objects.bulk_create(
+                variants,
+                update_conflicts=True,
+                unique_fields=['sku'],
+                update_fields=VARIANT_UPDATE_FIELDS,
+            )
+        self.record_stock(entries, ids, existing, variants, existing_variants)
+
+        # Rows that list images replace the product's images wholesale
+        replaced = [ids[product.sku] for _, product, _, images in entries if images is not None]
+        if replaced:
+            # A plain DELETE; delete() would emit post_delete per image and the
+            # caches are invalidated once at the end of the run anyway
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'DELETE FROM {connection.ops.quote_name(ProductImage._meta.db_table)} '
+                    f'WHERE product_id = ANY(%s)',
+                    [replaced],
+                )
+            ProductImage.objects.bulk_create([
+                ProductImage(
+                    product_id=ids[product.sku],
+                    is_primary=position == 0,
+                    order=position,
+                    **image,
+                )
+                for _, product, _, images in entries if images is not None
+                for position, image in enumerate(images)
+            ])
+
+        Product.refresh_search_vectors(list(ids.values()))
+        self.created += len(entries) - len(existing)
+        self.updated += len(existing)
+
+    def record_stock(self, entries, ids, existing, variants, existing_variants):
+        changes = [
+            StockChange(
+                ids[product.sku], None, product.sku, existing.get(product.sku),
+                product.quantity, product.low_stock_threshold,
+            )
+            for _, product, _, _ in entries
+        ]
+        variant_changes = [
+            (variant, existing_variants.get(variant.sku, (None, None)))
+            for variant in variants
+        ]
+        # New variants only need their id when they start out low on stock
+        missing = [
+            variant.sku for variant, (pk, level) in variant_changes
+            if pk is None and stock_level(variant.quantity, variant.low_stock_threshold) != IN_STOCK
+        ]
+        new_ids = dict(
+            ProductVariant.objects.filter(sku__in=missing).values_list('sku', 'id')
+        ) if missing else {}
+        changes.extend(
+            StockChange(
+                variant.product_id, pk or new_ids.get(variant.sku), variant.sku, level,
+                variant.quantity, variant.low_stock_threshold,
+            )
+            for variant, (pk, level) in variant_changes
+        )
+        record_stock_changes(changes)
@@ -0,0 +1,147 @@
+from collections import OrderedDict
+
+from django.db import transaction
+from django.db.models import F, Q
+
+from .cache import invalidate_products
+from .models import Product, ProductVariant
+from .stock import StockChange, record_stock_changes, stock_level
+
+PRODUCT = 'product'
+VARIANT = 'variant'
+
+
+class ReservationFailed(Exception):
+    # Raised inside the transaction to roll back an all-or-nothing reservation
+    pass
+
+
+def _merge_lines(lines):
+    # Same SKU twice in one request is reserved as a single conditional update
+    merged = OrderedDict()
+    for line in lines:
+        kind, sku = (VARIANT, line['variant_sku']) if line.get('variant_sku') else (PRODUCT, line['sku'])
+        merged[(kind, sku)] = merged.get((kind, sku), 0) + line['quantity']
+    return merged
+
+
+def _model_for(kind):
+    return ProductVariant if kind == VARIANT else Product
+
+
+def _apply(merged, sign):
+    """
+    Run one conditional UPDATE per line in a fixed (kind, sku) order.
+
+    Every transaction locks rows in the same order, so concurrent
+    multi-line reservations cannot deadlock each other.
+    """
+    applied = {}
+    for kind, sku in sorted(merged):
+        quantity = merged[(kind, sku)]
+        queryset = _model_for(kind).objects.filter(sku=sku)
+        if sign < 0:
+            queryset = queryset.filter(quantity__gte=quantity)
+            if kind == PRODUCT:
+                queryset = queryset.filter(is_active=True)
+        applied[(kind, sku)] = queryset.update(quantity=F('quantity') + sign * quantity) == 1
+    return applied
+
+
+def _record_levels(merged, applied, sign):
+    # The rows are still locked by our updates, so the old quantity is exact
+    changes = []
+    for kind in (PRODUCT, VARIANT):
+        skus = [sku for (line_kind, sku), ok in applied.items() if ok and line_kind == kind]
+        if not skus:
+            continue
+        product_field = 'product_id' if kind == VARIANT else 'id'
+        rows = _model_for(kind).objects.filter(sku__in=skus).values_list(
+            'sku', 'id', product_field, 'quantity', 'low_stock_threshold'
+        )
+        for sku, pk, product_id, quantity, threshold in rows:
+            previous = quantity - sign * merged[(kind, sku)]
+            changes.append(StockChange(
+                product_id, pk if kind == VARIANT else None, sku,
+                stock_level(previous, threshold), quantity, threshold,
+            ))
+    record_stock_changes(changes)
+
+
+def _invalidate(keys):
+    # update() bypasses post_save, so bump the cached responses directly
+    product_skus = [sku for kind, sku in keys if kind == PRODUCT]
+    variant_skus = [sku for kind, sku in keys if kind == VARIANT]
+    product_ids = Product.objects.filter(
+        Q(sku__in=product_skus) |
+        Q(pk__in=ProductVariant.objects.filter(sku__in=variant_skus).values('product_id'))
+    ).values('pk')
+    invalidate_products(product_ids)
+
+
+def _available(keys):
+    available = {}
+    for kind in (PRODUCT, VARIANT):
+        skus = [sku for line_kind, sku in keys if line_kind == kind]
+        if skus:
+            rows = _model_for(kind).objects.filter(sku__in=skus).values_list('sku', 'quantity')
+            available.update({(kind, sku): quantity for sku, quantity in rows})
+    return available
+
+
+def reserve_stock(lines, allow_partial=False):
+    """
+    Decrement stock for ``lines`` (dicts with ``sku`` or ``variant_sku`` and
+    ``quantity``) and return ``(success, results)`` with one result per line.
+
+    By default the reservation is all-or-nothing; with ``allow_partial`` the
+    lines that fit are kept even if others fail.
+    """
+    merged = _merge_lines(lines)
+    applied = {}
+    try:
+        with transaction.atomic():
+            applied = _apply(merged, -1)
+            if not allow_partial and not all(applied.values()):
+                raise ReservationFailed
+            _record_levels(merged, applied, -1)
+    except ReservationFailed:
+        rolled_back = True
+    else:
+        rolled_back = False
+
+    failed = [key for key, ok in applied.items() if not ok]
+    available = _available(failed) if failed else {}
+    results = []
+    for key, quantity in merged.items():
+        kind, sku = key
+        result = {'type': kind, 'sku': sku, 'quantity': quantity,
+                  'reserved': applied[key] and not rolled_back}
+        if not applied[key]:
+            result['error'] = 'insufficient_stock' if key in available else 'not_found'
+            result['available'] = available.get(key, 0)
+        elif rolled_back:
+            result['error'] = 'rolled_back'
+        results.append(result)
+
+    reserved = [key for key, ok in applied.items() if ok and not rolled_back]
+    if reserved:
+        _invalidate(reserved)
+    return all(result['reserved'] for result in results), results
+
+
+def release_stock(lines):
+    """
+    Return previously reserved stock, e.g. for a cancelled checkout.
+    """
+    merged = _merge_lines(lines)
+    with transaction.atomic():
+        applied = _apply(merged, 1)
+        _record_levels(merged, applied, 1)
+    released = [key for key, ok in applied.items() if ok]
+    if released:
+        _invalidate(released)
+    return [
+        {'type': kind, 'sku': sku, 'quantity': quantity, 'released': applied[(kind, sku)]}
+        for (kind, sku), quantity in merged.items()
+    ]
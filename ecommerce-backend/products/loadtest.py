@@ -0,0 +1,269 @@
+"""
+Throughput of the catalog endpoints behind real servers: gunicorn with
+sync workers (WSGI) against uvicorn (ASGI).
+
+Each server runs the project as a child process on a free local port.
+The load is closed-loop: ``concurrency`` clients each send their next
+request as soon as the previous response is in, for ``duration`` seconds
+per scenario. The client is plain asyncio over HTTP/1.1. It keeps
+connections alive where the server allows it; gunicorn's sync workers
+close them after every response, as they would behind a proxy.
+
+Three targets separate the server from the views:
+``wsgi`` is gunicorn with the sync views, ``asgi`` is uvicorn with the
+same sync views, and ``asgi-async`` is uvicorn with products.async_views.
+"""
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, namedtuple
+from importlib.util import find_spec
+from itertools import cycle
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.urls import Resolver404, resolve
+
+from .benchmark import API_PREFIX, summarize
+
+ASYNC_PREFIX = f'{API_PREFIX}async/'
+READY_PATH = f'{API_PREFIX}categories/tree/'
+
+Server = namedtuple('Server', 'name module command')
+Target = namedtuple('Target', 'name server async_views')
+
+SERVERS = {
+    'gunicorn': Server('gunicorn', 'gunicorn', lambda app, port, workers: [
+        sys.executable, '-m', 'gunicorn', app, '--workers', str(workers),
+        '--bind', f'127.0.0.1:{port}', '--log-level', 'warning',
+    ]),
+    'uvicorn': Server('uvicorn', 'uvicorn', lambda app, port, workers: [
+        sys.executable, '-m', 'uvicorn', app, '--workers', str(workers),
+        '--host', '127.0.0.1', '--port', str(port), '--log-level', 'warning', '--no-access-log',
+    ]),
+}
+TARGETS = {
+    'wsgi': Target('wsgi', 'gunicorn', False),
+    'asgi': Target('asgi', 'uvicorn', False),
+    'asgi-async': Target('asgi-async', 'uvicorn', True),
+}
+
+
+class LoadTestError(Exception):
+    pass
+
+
+def application_path(server):
+    # 'ecommerce.wsgi.application' -> 'ecommerce.wsgi:application'
+    dotted = settings.WSGI_APPLICATION if server == 'gunicorn' else settings.ASGI_APPLICATION
+    module, _, attribute = dotted.rpartition('.')
+    return f'{module}:{attribute}'
+
+
+def async_path(path):
+    """
+    The async view's URL for ``path``, or None when it has none.
+    """
+    candidate = ASYNC_PREFIX + path[len(API_PREFIX):]
+    try:
+        resolve(urlsplit(candidate).path)
+    except Resolver404:
+        return None
+    return candidate
+
+
+def target_scenarios(scenarios):
+    """
+    The scenarios every target can run, with the async URLs alongside.
+    """
+    paired = []
+    for scenario in scenarios:
+        async_paths = [async_path(path) for path in scenario.paths]
+        if all(async_paths):
+            paired.append((scenario, async_paths))
+    return paired
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class ServerProcess:
+    """
+    A server running the project until the ``with`` block exits.
+    """
+
+    def __init__(self, server, workers, host, timeout=30):
+        self.server = SERVERS[server]
+        self.workers = workers
+        self.host = host
+        self.timeout = timeout
+        self.port = free_port()
+        self.process = None
+        self.log = None
+
+    def __enter__(self):
+        if find_spec(self.server.module) is None:
+            raise LoadTestError(f'{self.server.name} is not installed')
+        command = self.server.command(application_path(self.server.name), self.port, self.workers)
+        # A file, not a pipe: a full pipe would block the server's logging
+        self.log = tempfile.TemporaryFile(mode='w+')
+        self.process = subprocess.Popen(
+            command, cwd=settings.BASE_DIR, env=os.environ.copy(),
+            stdout=subprocess.DEVNULL, stderr=self.log, text=True,
+        )
+        try:
+            self.wait_until_ready()
+        except BaseException:
+            self.stop()
+            raise
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def wait_until_ready(self):
+        deadline = time.monotonic() + self.timeout
+        request = build_request(READY_PATH, self.host)
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                self.log.seek(0)
+                raise LoadTestError(f'{self.server.name} exited: {self.log.read()[-2000:]}')
+            try:
+                status = asyncio.run(fetch_once('127.0.0.1', self.port, request))
+            except (OSError, asyncio.IncompleteReadError):
+                time.sleep(0.2)
+                continue
+            if status >= 400:
+                raise LoadTestError(f'{self.server.name} answered {READY_PATH} with {status}')
+            return
+        raise LoadTestError(f'{self.server.name} did not start within {self.timeout}s')
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        if self.log is not None:
+            self.log.close()
+            self.log = None
+
+
+def build_request(path, host, headers=()):
+    lines = [f'GET {path} HTTP/1.1', f'Host: {host}', 'Accept: application/json', *headers]
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+
+async def read_response(reader):
+    """
+    Read one response; (status, whether the server closes the connection).
+    """
+    head = (await reader.readuntil(b'\r\n\r\n')).decode('latin-1')
+    status_line, *lines = head.split('\r\n')
+    headers = {}
+    for line in lines:
+        if line:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        while True:
+            size = int((await reader.readuntil(b'\r\n')).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if not size:
+                break
+    else:
+        await reader.readexactly(int(headers.get('content-length', 0)))
+    return int(status_line.split(' ', 2)[1]), headers.get('connection', '').lower() == 'close'
+
+
+async def fetch_once(host, port, request):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(request)
+        return (await read_response(reader))[0]
+    finally:
+        writer.close()
+
+
+async def run_client(port, requests, deadline, latencies, errors):
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        request = next(requests)
+        started = time.perf_counter()
+        try:
+            # Reconnecting is part of the request when the server closed the last one
+            if writer is None:
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(request)
+            status, close = await read_response(reader)
+        except (OSError, asyncio.IncompleteReadError, ValueError) as exc:
+            errors[type(exc).__name__] += 1
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+        if status >= 400:
+            errors[str(status)] += 1
+        if close:
+            writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def generate_load(port, requests, concurrency, duration):
+    latencies, errors = [], Counter()
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        run_client(port, requests, deadline, latencies, errors) for _ in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - started
+    return {
+        'requests': len(latencies),
+        'errors': dict(errors),
+        'requests_per_second': round(len(latencies) / elapsed, 1),
+        'latency_ms': summarize(latencies),
+    }
+
+
+def run_load(port, paths, host, headers, concurrency, duration, warmup):
+    requests = cycle([build_request(path, host, headers) for path in paths])
+    if warmup:
+        asyncio.run(generate_load(port, requests, concurrency, warmup))
+    return asyncio.run(generate_load(port, requests, concurrency, duration))
+
+
+def run_targets(targets, scenarios, concurrency_levels, duration, warmup=2, workers=2,
+                host='localhost', headers=(), log=None):
+    """
+    {target: {scenario: {concurrency: result}}} for every combination.
+    """
+    log = log or (lambda message: None)
+    paired = target_scenarios(scenarios)
+    results = {name: {} for name in targets}
+    for server in dict.fromkeys(TARGETS[name].server for name in targets):
+        with ServerProcess(server, workers, host) as process:
+            for name in targets:
+                target = TARGETS[name]
+                if target.server != server:
+                    continue
+                for scenario, async_paths in paired:
+                    paths = async_paths if target.async_views else scenario.paths
+                    results[name][scenario.name] = {}
+                    for concurrency in concurrency_levels:
+                        result = run_load(process.port, paths, host, headers, concurrency, duration, warmup)
+                        results[name][scenario.name][str(concurrency)] = result
+                        log(f"{name} {scenario.name} c={concurrency}: {result['requests_per_second']} req/s, "
+                            f"p95 {result['latency_ms'].get('p95')}ms, errors {sum(result['errors'].values())}")
+    return results
@@ -0,0 +1,83 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from products.benchmark import build_client, build_scenarios, compare, run_suite
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the main catalog endpoints through the Django test client and '
+        'report latency percentiles, queries per request and memory as JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50,
+                            help='Timed requests per scenario')
+        parser.add_argument('--warmup', type=int, default=5,
+                            help='Untimed requests per scenario before measuring')
+        parser.add_argument('--scenario', action='append', dest='scenarios', default=None,
+                            help='Only run this scenario (repeatable)')
+        parser.add_argument('--search', default='leather',
+                            help='Term used by the search scenario')
+        parser.add_argument('--anonymous', action='store_true',
+                            help='Send anonymous requests, served from the response cache')
+        parser.add_argument('--host', default=None,
+                            help='Host header, defaults to the first ALLOWED_HOSTS entry')
+        parser.add_argument('--no-memory', action='store_true',
+                            help='Skip the traced request measuring peak allocations')
+        parser.add_argument('--output', default=None,
+                            help='Write the JSON report to this file instead of stdout')
+        parser.add_argument('--compare', default=None,
+                            help='JSON report of an earlier run to compare against')
+        parser.add_argument('--list', action='store_true', help='List the scenarios and exit')
+
+    def handle(self, *args, **options):
+        scenarios = build_scenarios(search=options['search'])
+        if not scenarios:
+            raise CommandError('No active products to benchmark; run generate_catalog first')
+        if options['list']:
+            for scenario in scenarios:
+                self.stdout.write(f'{scenario.name}: {scenario.paths[0]}')
+            return
+        if options['scenarios']:
+            unknown = set(options['scenarios']) - {scenario.name for scenario in scenarios}
+            if unknown:
+                raise CommandError(f'Unknown scenarios: {", ".join(sorted(unknown))}')
+            scenarios = [scenario for scenario in scenarios if scenario.name in options['scenarios']]
+
+        user = None
+        if not options['anonymous']:
+            user = get_user_model().objects.filter(is_active=True, is_staff=False).order_by('pk').first()
+            if user is None:
+                raise CommandError('No active non-staff user to authenticate as; pass --anonymous')
+
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as handle:
+                baseline = json.load(handle)
+
+        report = run_suite(
+            build_client(user, options['host']),
+            scenarios,
+            iterations=options['iterations'],
+            warmup=options['warmup'],
+            memory=not options['no_memory'],
+            log=self.stderr.write,
+        )
+        report['meta']['anonymous'] = options['anonymous']
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(output + '\n')
+            self.stderr.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+        else:
+            self.stdout.write(output)
+
+        if baseline is not None:
+            self.stderr.write(f"Compared with {baseline.get('meta', {}).get('revision') or options['compare']}:")
+            for name, metric, before, after, change in compare(baseline, report):
+                change = 'n/a' if change is None else f'{change:+.1f}%'
+                self.stderr.write(f'  {name:<32} {metric:<16} {before:>10} -> {after:<10} {change}')
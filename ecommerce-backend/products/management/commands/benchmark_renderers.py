@@ -0,0 +1,37 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from products.benchmark import build_client, endpoint_payloads, golden_payloads, renderer_throughput
+
+
+class Command(BaseCommand):
+    help = (
+        'Check that FastJSONRenderer/FastJSONParser match DRF\'s stdlib JSON classes '
+        'on golden values and endpoint payloads, and compare their speed'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20,
+                            help='Runs per payload; the fastest one counts')
+        parser.add_argument('--golden-only', action='store_true',
+                            help='Skip the endpoint payloads')
+
+    def handle(self, *args, **options):
+        payloads = golden_payloads()
+        if not options['golden_only']:
+            user = get_user_model().objects.filter(is_active=True, is_staff=False).order_by('pk').first()
+            payloads.update(endpoint_payloads(build_client(user)))
+
+        report = {
+            name: renderer_throughput(data, repeat=options['repeat'])
+            for name, data in payloads.items()
+        }
+        self.stdout.write(json.dumps(report, indent=2))
+        mismatched = [
+            name for name, result in report.items()
+            if not (result['identical_output'] and result['identical_parse'])
+        ]
+        if mismatched:
+            raise CommandError(f'Fast JSON output differs for: {", ".join(mismatched)}')
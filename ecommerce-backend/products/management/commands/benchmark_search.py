@@ -0,0 +1,40 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from products.benchmark import search_comparison
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the query plans and latency of ?search= before (icontains over name, '
+        'description, SKU and category name) and after the full-text search backend'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--term', action='append', dest='terms', default=None,
+                            help='Search to run (repeatable); defaults to a word, a phrase and a SKU prefix')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Runs per query; the fastest one counts')
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--output', default=None,
+                            help='Write the JSON report to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        terms = options['terms'] or ['leather', 'waterproof boots', 'BENCH-00001']
+        report = []
+        for term in terms:
+            result = search_comparison(term, page_size=options['page_size'], repeat=options['repeat'])
+            report.append(result)
+            self.stderr.write(
+                f"{term!r}: page {result['icontains']['page_ms']}ms -> {result['fulltext']['page_ms']}ms, "
+                f"count {result['icontains']['count_ms']}ms -> {result['fulltext']['count_ms']}ms"
+            )
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(output + '\n')
+            self.stderr.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+        else:
+            self.stdout.write(output)
@@ -0,0 +1,37 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from products.benchmark import serializer_cases, serializer_throughput
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare rows/second of the list ModelSerializers with their '
+        '.values() RowSerializer counterparts, and check their JSON matches'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000,
+                            help='Rows serialized per run')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Runs per serializer; the fastest one counts')
+        parser.add_argument('--case', action='append', dest='cases', default=None,
+                            help='Only run this case (repeatable)')
+
+    def handle(self, *args, **options):
+        cases = serializer_cases()
+        if options['cases']:
+            unknown = set(options['cases']) - set(cases)
+            if unknown:
+                raise CommandError(f'Unknown cases: {", ".join(sorted(unknown))}')
+            cases = {name: case for name, case in cases.items() if name in options['cases']}
+
+        report = {
+            name: serializer_throughput(*case, count=options['rows'], repeat=options['repeat'])
+            for name, case in cases.items()
+        }
+        self.stdout.write(json.dumps(report, indent=2))
+        mismatched = [name for name, result in report.items() if not result['identical_json']]
+        if mismatched:
+            raise CommandError(f'Row serializer output differs for: {", ".join(mismatched)}')
@@ -0,0 +1,99 @@
+import json
+import platform
+from datetime import datetime, timezone
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from products.benchmark import build_scenarios, default_host, git_revision
+from products.loadtest import TARGETS, LoadTestError, run_targets, target_scenarios
+
+
+class Command(BaseCommand):
+    help = (
+        'Load the catalog endpoints through gunicorn (sync workers) and uvicorn, with the '
+        'sync and the async views, and report throughput and latency per concurrency level as JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', action='append', dest='targets', default=None,
+                            choices=sorted(TARGETS), help='Only run this target (repeatable)')
+        parser.add_argument('--scenario', action='append', dest='scenarios', default=None,
+                            help='Only run this scenario (repeatable)')
+        parser.add_argument('--concurrency', default='1,16,64',
+                            help='Comma-separated numbers of concurrent clients')
+        parser.add_argument('--duration', type=float, default=10,
+                            help='Measured seconds per scenario and concurrency level')
+        parser.add_argument('--warmup', type=float, default=2,
+                            help='Unmeasured seconds before each measurement')
+        parser.add_argument('--workers', type=int, default=2,
+                            help='Worker processes for each server')
+        parser.add_argument('--anonymous', action='store_true',
+                            help='Send anonymous requests, served from the response cache')
+        parser.add_argument('--host', default=None,
+                            help='Host header, defaults to the first ALLOWED_HOSTS entry')
+        parser.add_argument('--output', default=None,
+                            help='Write the JSON report to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        try:
+            concurrency = [int(value) for value in options['concurrency'].split(',') if value.strip()]
+        except ValueError:
+            raise CommandError('--concurrency takes comma-separated integers')
+        if not concurrency or min(concurrency) < 1:
+            raise CommandError('--concurrency needs at least one level of 1 or more')
+
+        scenarios = [scenario for scenario, _ in target_scenarios(build_scenarios())]
+        if not scenarios:
+            raise CommandError('No active products to benchmark; run generate_catalog first')
+        if options['scenarios']:
+            unknown = set(options['scenarios']) - {scenario.name for scenario in scenarios}
+            if unknown:
+                raise CommandError(f'Unknown scenarios: {", ".join(sorted(unknown))}')
+            scenarios = [scenario for scenario in scenarios if scenario.name in options['scenarios']]
+
+        headers = []
+        if not options['anonymous']:
+            user = get_user_model().objects.filter(is_active=True, is_staff=False).order_by('pk').first()
+            if user is None:
+                raise CommandError('No active non-staff user to authenticate as; pass --anonymous')
+            headers.append(f'Authorization: Bearer {AccessToken.for_user(user)}')
+
+        targets = options['targets'] or list(TARGETS)
+        try:
+            results = run_targets(
+                targets, scenarios, concurrency,
+                duration=options['duration'],
+                warmup=options['warmup'],
+                workers=options['workers'],
+                host=options['host'] or default_host(),
+                headers=headers,
+                log=self.stderr.write,
+            )
+        except LoadTestError as exc:
+            raise CommandError(str(exc))
+
+        report = {
+            'meta': {
+                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'revision': git_revision(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'workers': options['workers'],
+                'duration': options['duration'],
+                'anonymous': options['anonymous'],
+                'conn_max_age': settings.DATABASES['default'].get('CONN_MAX_AGE', 0),
+                'async_db_workers': settings.ASYNC_DB_WORKERS,
+            },
+            'results': results,
+        }
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(output + '\n')
+            self.stderr.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+        else:
+            self.stdout.write(output)
@@ -0,0 +1,40 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from products.exporter import DEFAULT_CHUNK_SIZE, WRITERS, export_catalog
+
+
+class Command(BaseCommand):
+    help = 'Stream the active catalog (variants, primary image, category path, ratings) to CSV or JSONL'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(WRITERS), default='jsonl')
+        parser.add_argument('--output', help='File to write (defaults to stdout)')
+        parser.add_argument('--gzip', action='store_true', help='Gzip the output')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                            help='Products fetched (and prefetched) per server-side cursor batch')
+        parser.add_argument('--base-url', default='',
+                            help='Prefix for image URLs, e.g. https://shop.example.com')
+
+    def handle(self, *args, **options):
+        base_url = options['base_url'].rstrip('/')
+        chunks = export_catalog(
+            options['format'],
+            compress=options['gzip'],
+            chunk_size=options['chunk_size'],
+            build_url=(lambda url: base_url + url) if base_url else None,
+        )
+        output = open(options['output'], 'wb') if options['output'] else sys.stdout.buffer
+        written = 0
+        try:
+            for chunk in chunks:
+                output.write(chunk)
+                written += len(chunk)
+        finally:
+            if options['output']:
+                output.close()
+            else:
+                output.flush()
+        if options['output']:
+            self.stdout.write(self.style.SUCCESS(f"Wrote {written} bytes to {options['output']}"))
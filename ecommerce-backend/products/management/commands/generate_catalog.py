@@ -0,0 +1,69 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from products.synthetic import CatalogGenerator
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate a reproducible synthetic catalog (categories, users, products, '
+        'images, variants and reviews) for benchmarking'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Same seed and sizes always give the same catalog')
+        parser.add_argument('--prefix', default='bench',
+                            help='Namespace for generated slugs, SKUs and emails')
+        parser.add_argument('--products', type=int, default=10000)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--root-categories', type=int, default=8)
+        parser.add_argument('--depth', type=int, default=4,
+                            help='Levels in each category tree')
+        parser.add_argument('--branching', type=int, default=3,
+                            help='Children per category below the roots')
+        parser.add_argument('--images', type=int, default=3,
+                            help='Maximum images per product')
+        parser.add_argument('--variants', type=int, default=4,
+                            help='Maximum variants per product')
+        parser.add_argument('--reviews', type=int, default=5,
+                            help='Maximum reviews per product')
+        parser.add_argument('--batch-size', type=int, default=2000,
+                            help='Products written per transaction')
+
+    def handle(self, *args, **options):
+        if options['depth'] < 1 or options['root_categories'] < 1:
+            raise CommandError('--depth and --root-categories must be at least 1')
+        if options['depth'] > settings.CATEGORY_MAX_DEPTH:
+            raise CommandError(f'--depth can be at most CATEGORY_MAX_DEPTH ({settings.CATEGORY_MAX_DEPTH})')
+        if options['variants'] > 10:
+            raise CommandError('--variants can be at most 10')
+
+        generator = CatalogGenerator(
+            seed=options['seed'],
+            prefix=options['prefix'],
+            batch_size=options['batch_size'],
+            log=self.stdout.write,
+        )
+        if generator.existing():
+            raise CommandError(
+                f"Data with prefix '{options['prefix']}' already exists; "
+                f"choose another --prefix or use a fresh database"
+            )
+
+        started = time.perf_counter()
+        totals = generator.generate(
+            roots=options['root_categories'],
+            depth=options['depth'],
+            branching=options['branching'],
+            users=options['users'],
+            products=options['products'],
+            images=options['images'],
+            variants=options['variants'],
+            reviews=options['reviews'],
+        )
+        elapsed = time.perf_counter() - started
+        summary = ', '.join(f'{count} {name}' for name, count in totals.items())
+        self.stdout.write(self.style.SUCCESS(f'Generated {summary} in {elapsed:.1f}s'))
@@ -0,0 +1,46 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from products.importer import DEFAULT_CHUNK_SIZE, READERS, ProductImporter
+
+
+class Command(BaseCommand):
+    help = 'Stream products (with variants and image references) from a CSV or JSONL file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or JSONL file to import')
+        parser.add_argument('--format', choices=sorted(READERS),
+                            help='Input format (defaults to the file extension)')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                            help='Rows validated and written per transaction')
+        parser.add_argument('--errors', help='Write per-row errors to this JSONL file')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or os.path.splitext(path)[1].lstrip('.').lower()
+        if file_format not in READERS:
+            raise CommandError(f'Unknown format {file_format!r}; use --format')
+
+        error_file = open(options['errors'], 'w') if options['errors'] else None
+
+        def on_error(error):
+            if error_file:
+                error_file.write(json.dumps(error) + '\n')
+            else:
+                self.stderr.write(f"row {error['row']}: {error['error']}")
+
+        # Errors go straight to the sink so memory stays flat on huge files
+        importer = ProductImporter(chunk_size=options['chunk_size'], max_errors=0, on_error=on_error)
+        try:
+            with open(path, newline='', encoding='utf-8-sig') as stream:
+                summary = importer.run(READERS[file_format](stream))
+        finally:
+            if error_file:
+                error_file.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {summary['created']} new and {summary['updated']} updated products, "
+            f"{summary['failed']} rows failed"
+        ))
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from products.models import Category
+from products.tree import invalidate_category_tree
+
+
+class Command(BaseCommand):
+    help = 'Recompute the materialized path of every category from its parent links'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of categories written per bulk_update',
+        )
+
+    def handle(self, *args, **options):
+        parents = dict(Category.objects.values_list('id', 'parent_id'))
+        children = {}
+        for category_id, parent_id in parents.items():
+            children.setdefault(parent_id, []).append(category_id)
+
+        # Walk down from the roots so every parent path is known before its children
+        paths = {}
+        stack = [(category_id, '/') for category_id in children.get(None, [])]
+        while stack:
+            category_id, prefix = stack.pop()
+            paths[category_id] = f"{prefix}{category_id}/"
+            stack.extend((child_id, paths[category_id]) for child_id in children.get(category_id, []))
+
+        if len(paths) != len(parents):
+            raise CommandError(
+                f'{len(parents) - len(paths)} categories are not reachable from a root (parent cycle?)'
+            )
+
+        Category.objects.bulk_update(
+            [Category(pk=category_id, path=path) for category_id, path in paths.items()],
+            ['path'],
+            batch_size=options['batch_size'],
+        )
+        invalidate_category_tree()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt paths for {len(paths)} categories'))
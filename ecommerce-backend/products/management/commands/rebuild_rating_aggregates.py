@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from products.models import Product
+
+
+class Command(BaseCommand):
+    help = 'Recompute rating_sum, rating_count and average_rating for every product'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Number of products updated per statement',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        product_ids = Product.objects.order_by('pk').values_list('pk', flat=True)
+        updated = 0
+        last_id = 0
+        while True:
+            batch = list(product_ids.filter(pk__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            updated += Product.refresh_rating_aggregates(batch)
+            last_id = batch[-1]
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt rating aggregates for {updated} products'))
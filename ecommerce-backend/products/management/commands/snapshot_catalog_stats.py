@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from products.statistics import take_snapshot
+
+
+class Command(BaseCommand):
+    help = "Store today's catalog statistics (run daily, e.g. from cron) for ?source=snapshot and the stock-out series"
+
+    def handle(self, *args, **options):
+        snapshot = take_snapshot()
+        self.stdout.write(self.style.SUCCESS(
+            f'Saved snapshot for {snapshot.date}: {snapshot.total_products} products, '
+            f'{snapshot.out_of_stock} out of stock'
+        ))
@@ -0,0 +1,75 @@
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from products.inventory import reserve_stock
+from products.models import Product
+
+
+class Command(BaseCommand):
+    help = (
+        'Hammer one SKU with concurrent reservations and verify that stock '
+        'never goes negative (run against a disposable database)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('sku', help='SKU of the product to reserve')
+        parser.add_argument('--threads', type=int, default=32)
+        parser.add_argument('--attempts', type=int, default=200,
+                            help='Reservations attempted per thread')
+        parser.add_argument('--quantity', type=int, default=1,
+                            help='Units requested per reservation')
+        parser.add_argument('--stock', type=int, default=None,
+                            help='Reset the SKU to this quantity before starting')
+
+    def handle(self, *args, **options):
+        sku = options['sku']
+        if options['stock'] is not None:
+            Product.objects.filter(sku=sku).update(quantity=options['stock'])
+        try:
+            initial = Product.objects.get(sku=sku).quantity
+        except Product.DoesNotExist:
+            raise CommandError(f'No product with SKU {sku}')
+
+        line = [{'sku': sku, 'quantity': options['quantity']}]
+        successes = []
+        errors = []
+
+        def worker():
+            reserved = 0
+            try:
+                for _ in range(options['attempts']):
+                    if reserve_stock(line)[0]:
+                        reserved += 1
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                successes.append(reserved)
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(options['threads'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        final = Product.objects.get(sku=sku).quantity
+        reserved_units = sum(successes) * options['quantity']
+        attempts = options['threads'] * options['attempts']
+
+        self.stdout.write(f'attempts:        {attempts}')
+        self.stdout.write(f'successful:      {sum(successes)}')
+        self.stdout.write(f'stock:           {initial} -> {final}')
+        self.stdout.write(f'throughput:      {attempts / elapsed:.0f} reservations/s')
+        for exc in errors:
+            self.stderr.write(f'worker error: {exc!r}')
+
+        if final < 0 or initial - final != reserved_units:
+            raise CommandError(
+                f'Inconsistent stock: {reserved_units} units reserved but stock moved by {initial - final}'
+            )
+        self.stdout.write(self.style.SUCCESS('No overselling detected'))
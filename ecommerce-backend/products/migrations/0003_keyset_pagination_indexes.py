@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-17 21:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_remove_product_products_pr_vendor__69616a_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_active', 'created_at', 'id'], name='products_pr_is_acti_eec6ac_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_active', 'price', 'id'], name='products_pr_is_acti_e059f3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_active', 'name', 'id'], name='products_pr_is_acti_632c77_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productreview',
+            index=models.Index(fields=['product', 'is_approved', 'created_at', 'id'], name='products_pr_product_d0c9ad_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.7 on 2026-10-17 21:17
+
+from django.db import migrations, models
+from django.db.models import Avg, Count, Sum
+
+
+def backfill_rating_aggregates(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    ProductReview = apps.get_model('products', 'ProductReview')
+    aggregates = (
+        ProductReview.objects.filter(is_approved=True)
+        .order_by()
+        .values('product_id')
+        .annotate(total=Sum('rating'), count=Count('id'), avg=Avg('rating'))
+    )
+    for row in aggregates.iterator():
+        Product.objects.filter(pk=row['product_id']).update(
+            rating_sum=row['total'],
+            rating_count=row['count'],
+            average_rating=round(row['avg'], 2),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='average_rating',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=3),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_active', 'average_rating', 'id'], name='products_pr_is_acti_48c8ef_idx'),
+        ),
+        migrations.RunPython(backfill_rating_aggregates, migrations.RunPython.noop),
+    ]
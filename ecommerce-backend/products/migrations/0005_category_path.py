@@ -0,0 +1,41 @@
+# Generated by Django 4.2.7 on 2026-10-17 21:18
+
+from django.db import migrations, models
+
+
+def backfill_category_paths(apps, schema_editor):
+    Category = apps.get_model('products', 'Category')
+    children = {}
+    for category_id, parent_id in Category.objects.values_list('id', 'parent_id'):
+        children.setdefault(parent_id, []).append(category_id)
+
+    # Walk down from the roots with a stack, so deep trees cannot hit the
+    # recursion limit and every parent path is known before its children
+    paths = {}
+    stack = [(category_id, '/') for category_id in children.get(None, [])]
+    while stack:
+        category_id, prefix = stack.pop()
+        paths[category_id] = f"{prefix}{category_id}/"
+        stack.extend((child_id, paths[category_id]) for child_id in children.get(category_id, []))
+
+    Category.objects.bulk_update(
+        [Category(pk=category_id, path=path) for category_id, path in paths.items()],
+        ['path'],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_product_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='path',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(backfill_category_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.7 on 2026-10-17 21:44
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0007_catalog_snapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sku', models.CharField(max_length=100)),
+                ('previous_level', models.CharField(blank=True, choices=[('in_stock', 'In stock'), ('low_stock', 'Low stock'), ('out_of_stock', 'Out of stock')], max_length=20)),
+                ('level', models.CharField(choices=[('in_stock', 'In stock'), ('low_stock', 'Low stock'), ('out_of_stock', 'Out of stock')], max_length=20)),
+                ('quantity', models.IntegerField()),
+                ('threshold', models.IntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='productvariant',
+            name='low_stock_threshold',
+            field=models.IntegerField(default=10),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True), ('quantity__lte', models.F('low_stock_threshold'))), fields=['quantity', 'id'], name='product_low_stock'),
+        ),
+        migrations.AddIndex(
+            model_name='productvariant',
+            index=models.Index(condition=models.Q(('quantity__lte', models.F('low_stock_threshold'))), fields=['quantity', 'id'], name='variant_low_stock'),
+        ),
+        migrations.AddField(
+            model_name='stockalert',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_alerts', to='products.product'),
+        ),
+        migrations.AddField(
+            model_name='stockalert',
+            name='variant',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='stock_alerts', to='products.productvariant'),
+        ),
+    ]
@@ -1,8 +1,16 @@
-from django.db import models
-from django.contrib.auth import get_user_model
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import models, transaction
+from django.db.models import (
+    Avg, Case, Count, ExpressionWrapper, F, OuterRef, Q, Subquery, Sum, Value, When
+)
+from django.db.models.functions import Coalesce, Concat, Round, Substr, Upper
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.conf import settings
-from django.utils.text import slugify
+from .slugs import save_with_unique_slug, slug_base
 
 User = settings.AUTH_USER_MODEL
 
@@ -12,6 +20,8 @@ class Category(models.Model):
     description = models.TextField(blank=True, null=True)
     parent = models.ForeignKey('self', on_delete=models.CASCADE, 
                              null=True, blank=True, related_name='children')
+    # Materialized path of ancestor ids, e.g. "/1/5/12/"; a subtree is path__startswith
+    path = models.CharField(max_length=255, db_index=True, editable=False, default='')
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -23,22 +33,122 @@ class Category(models.Model):
             models.Index(fields=['is_active']),
         ]
     
+    @property
+    def depth(self):
+        # "/1/5/12/" is three levels deep
+        return self.path.count('/') - 1 if self.path else 1
+
+    def clean(self):
+        super().clean()
+        self.check_depth(self.parent)
+
+    def check_depth(self, parent):
+        """
+        Raise ValidationError if putting this category (and everything under
+        it) below ``parent`` would nest deeper than CATEGORY_MAX_DEPTH.
+        """
+        height = 1
+        if self.pk and self.path:
+            paths = self.get_descendants().values_list('path', flat=True)
+            height += max(path.count('/') for path in paths) - self.path.count('/')
+        depth = (parent.depth if parent else 0) + height
+        if depth > settings.CATEGORY_MAX_DEPTH:
+            raise ValidationError(
+                {'parent': f'Categories can be nested at most {settings.CATEGORY_MAX_DEPTH} levels deep'}
+            )
+
     def save(self, *args, **kwargs):
         if not self.slug or self.slug.strip() == '':
-            self.slug = slugify(self.name)
+            self.slug = slug_base(self.name, self._meta.get_field('slug').max_length, 'category')
         
-        if self.slug:
-            original_slug = self.slug
-            counter = 1
-            while Category.objects.filter(slug=self.slug).exclude(id=self.id).exists():
-                self.slug = f"{original_slug}-{counter}"
-                counter += 1
+        old_path = self.path
+        parent_path = self.parent.path if self.parent_id else '/'
+        if not old_path or not old_path.startswith(parent_path):
+            # New or moved: the path column only fits CATEGORY_MAX_DEPTH levels
+            self.check_depth(self.parent)
         
-        super().save(*args, **kwargs)
+        # The path needs our own pk, so it is written after the insert; in one
+        # transaction, so no other connection sees the row without its path
+        with transaction.atomic():
+            # A taken slug gets the next free "-<n>" suffix
+            save_with_unique_slug(self, super().save, *args, **kwargs)
+            
+            new_path = self.build_path()
+            if new_path != old_path:
+                Category.objects.filter(pk=self.pk).update(path=new_path)
+                if old_path:
+                    Category.objects.filter(path__startswith=old_path).exclude(pk=self.pk).update(
+                        path=Concat(models.Value(new_path), Substr('path', len(old_path) + 1))
+                    )
+                self.path = new_path
+    
+    def build_path(self):
+        parent_path = self.parent.path if self.parent_id else '/'
+        return f"{parent_path}{self.pk}/"
+    
+    def subtree_filter(self, prefix=''):
+        # A row written without its path (bulk_create) has path '', and
+        # path__startswith='' would match every category
+        if not self.path:
+            return Q(**{f'{prefix}pk': self.pk})
+        return Q(**{f'{prefix}path__startswith': self.path})
+    
+    def get_descendants(self, include_self=True):
+        queryset = Category.objects.filter(self.subtree_filter())
+        if not include_self:
+            queryset = queryset.exclude(pk=self.pk)
+        return queryset
     
     def __str__(self):
         return self.name
 
+class annotated_property:
+    """
+    A read-only property that a queryset annotation of the same name
+    replaces, so annotated rows skip the Python computation.
+    """
+    
+    def __init__(self, func):
+        self.func = func
+        self.name = func.__name__
+        self.__doc__ = func.__doc__
+    
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        if self.name in instance.__dict__:
+            return instance.__dict__[self.name]
+        return self.func(instance)
+    
+    def __set__(self, instance, value):
+        # Called by the ORM when it loads an annotation
+        instance.__dict__[self.name] = value
+
+class ProductQuerySet(models.QuerySet):
+    def with_computed(self):
+        """
+        Annotate in_stock, low_stock and discount_percentage in SQL so they
+        can be filtered and ordered on. Use on read-only querysets: the
+        annotations do not follow later changes to the instance.
+        """
+        return self.annotate(
+            in_stock=ExpressionWrapper(Q(quantity__gt=0), output_field=models.BooleanField()),
+            low_stock=ExpressionWrapper(
+                Q(quantity__gt=0, quantity__lte=F('low_stock_threshold')),
+                output_field=models.BooleanField(),
+            ),
+            discount_percentage=Case(
+                When(
+                    compare_at_price__gt=F('price'),
+                    then=Round(
+                        (F('compare_at_price') - F('price')) * 100 / F('compare_at_price'), 2
+                    ),
+                ),
+                default=Value(0),
+                output_field=models.DecimalField(max_digits=5, decimal_places=2),
+            ),
+        )
+
 class Product(models.Model):
     name = models.CharField(max_length=200)
     slug = models.SlugField(max_length=200, unique=True)
@@ -60,9 +170,19 @@ class Product(models.Model):
     is_active = models.BooleanField(default=True)
     is_featured = models.BooleanField(default=False)
     
+    # Approved review aggregates, kept in sync by products.signals
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    average_rating = models.DecimalField(max_digits=3, decimal_places=2, default=0)
+    
+    # Weighted full-text document, see refresh_search_vectors
+    search_vector = SearchVectorField(null=True, editable=False)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = ProductQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-created_at']
         indexes = [
@@ -72,24 +192,87 @@ class Product(models.Model):
             models.Index(fields=['is_active']),
             models.Index(fields=['is_featured']),
             models.Index(fields=['category', 'is_active']),
+            # Keyset pagination: (sort key, id) for each ordering_fields option
+            models.Index(fields=['is_active', 'created_at', 'id']),
+            models.Index(fields=['is_active', 'price', 'id']),
+            models.Index(fields=['is_active', 'name', 'id']),
+            models.Index(fields=['is_active', 'average_rating', 'id']),
+            GinIndex(fields=['search_vector'], name='product_search_vector_gin'),
+            # Trigram indexes serve the UPPER(...) LIKE that icontains/istartswith emit
+            GinIndex(OpClass(Upper('sku'), name='gin_trgm_ops'), name='product_sku_trgm'),
+            GinIndex(OpClass(Upper('name'), name='gin_trgm_ops'), name='product_name_trgm'),
+            # Partial index holding only low/out-of-stock rows (see products.stock)
+            models.Index(
+                fields=['quantity', 'id'],
+                condition=Q(is_active=True, quantity__lte=F('low_stock_threshold')),
+                name='product_low_stock',
+            ),
         ]
     
     def __str__(self):
         return self.name
     
-    @property
+    def save(self, *args, **kwargs):
+        # slug is read-only in the API, so new products get one from their name
+        if not self.slug or self.slug.strip() == '':
+            self.slug = slug_base(self.name, self._meta.get_field('slug').max_length, 'product')
+        save_with_unique_slug(self, super().save, *args, **kwargs)
+    
+    @classmethod
+    def refresh_rating_aggregates(cls, product_ids=None):
+        # One set-based UPDATE, so bulk review changes cost a single statement
+        approved = ProductReview.objects.filter(
+            product=OuterRef('pk'), is_approved=True
+        ).order_by().values('product')
+        queryset = cls.objects.all()
+        if product_ids is not None:
+            queryset = queryset.filter(pk__in=product_ids)
+        return queryset.update(
+            rating_sum=Coalesce(Subquery(approved.annotate(total=Sum('rating')).values('total')), 0),
+            rating_count=Coalesce(Subquery(approved.annotate(total=Count('id')).values('total')), 0),
+            average_rating=Coalesce(
+                Round(Subquery(approved.annotate(avg=Avg('rating')).values('avg')), 2),
+                0,
+                output_field=models.DecimalField(max_digits=3, decimal_places=2),
+            ),
+        )
+    
+    @classmethod
+    def search_vector_expression(cls):
+        category_name = Subquery(
+            Category.objects.filter(pk=OuterRef('category_id')).values('name')[:1]
+        )
+        config = settings.PRODUCT_SEARCH_CONFIG
+        return (
+            SearchVector('name', weight='A', config=config) +
+            SearchVector('sku', weight='A', config=config) +
+            SearchVector(category_name, weight='B', config=config) +
+            SearchVector('description', weight='C', config=config)
+        )
+    
+    @classmethod
+    def refresh_search_vectors(cls, product_ids=None):
+        # update() cannot join, so the category name comes from a subquery
+        queryset = cls.objects.all()
+        if product_ids is not None:
+            queryset = queryset.filter(pk__in=product_ids)
+        return queryset.update(search_vector=cls.search_vector_expression())
+    
+    # ProductQuerySet.with_computed() annotates these under the same names
+    @annotated_property
     def in_stock(self):
         return self.quantity > 0
     
-    @property
+    @annotated_property
     def low_stock(self):
         return 0 < self.quantity <= self.low_stock_threshold
     
-    @property
+    @annotated_property
     def discount_percentage(self):
+        # Same arithmetic and rounding (half up) as ROUND() in the annotation
         if self.compare_at_price and self.compare_at_price > self.price:
-            discount = ((self.compare_at_price - self.price) / self.compare_at_price) * 100
-            return round(discount, 2)
+            discount = (self.compare_at_price - self.price) * 100 / self.compare_at_price
+            return discount.quantize(Decimal('0.01'), ROUND_HALF_UP)
         return 0
 
 class ProductImage(models.Model):
@@ -114,9 +297,17 @@ class ProductVariant(models.Model):
     sku = models.CharField(max_length=100, unique=True)
     price_adjustment = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     quantity = models.IntegerField(default=0)
+    low_stock_threshold = models.IntegerField(default=10)
     
     class Meta:
         unique_together = ['product', 'name', 'value']
+        indexes = [
+            models.Index(
+                fields=['quantity', 'id'],
+                condition=Q(quantity__lte=F('low_stock_threshold')),
+                name='variant_low_stock',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.product.name} - {self.name}: {self.value}"
@@ -138,6 +329,58 @@ class ProductReview(models.Model):
     class Meta:
         ordering = ['-created_at']
         unique_together = ['product', 'user']
+        indexes = [
+            models.Index(fields=['product', 'is_approved', 'created_at', 'id']),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.email} - {self.product.name} ({self.rating}/5)"
+
+class CatalogSnapshot(models.Model):
+    # One row per day, written by the snapshot_catalog_stats command
+    date = models.DateField(unique=True)
+    total_products = models.PositiveIntegerField(default=0)
+    active_products = models.PositiveIntegerField(default=0)
+    out_of_stock = models.PositiveIntegerField(default=0)
+    low_stock = models.PositiveIntegerField(default=0)
+    new_products = models.PositiveIntegerField(default=0)
+    review_count = models.PositiveIntegerField(default=0)
+    average_rating = models.DecimalField(max_digits=3, decimal_places=2, default=0)
+    categories = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-date']
+    
+    def __str__(self):
+        return f"Catalog snapshot {self.date}"
+
+
+class StockAlert(models.Model):
+    # Append-only feed of stock level crossings, polled by replenishment jobs
+    IN_STOCK = 'in_stock'
+    LOW_STOCK = 'low_stock'
+    OUT_OF_STOCK = 'out_of_stock'
+    LEVEL_CHOICES = [
+        (IN_STOCK, 'In stock'),
+        (LOW_STOCK, 'Low stock'),
+        (OUT_OF_STOCK, 'Out of stock'),
+    ]
+    
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, 
+                               related_name='stock_alerts')
+    variant = models.ForeignKey(ProductVariant, on_delete=models.CASCADE, 
+                               null=True, blank=True, related_name='stock_alerts')
+    sku = models.CharField(max_length=100)
+    previous_level = models.CharField(max_length=20, choices=LEVEL_CHOICES, blank=True)
+    level = models.CharField(max_length=20, choices=LEVEL_CHOICES)
+    quantity = models.IntegerField()
+    threshold = models.IntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['id']
     
     def __str__(self):
-        return f"{self.user.email} - {self.product.name} ({self.rating}/5)"
\ No newline at end of file
+        return f"{self.sku}: {self.previous_level or 'new'} -> {self.level}"
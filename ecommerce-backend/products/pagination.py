@@ -0,0 +1,202 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework import filters
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on (ordering field, id).
+
+    Unlike PageNumberPagination it never issues a COUNT(*) and never uses
+    OFFSET, so every page costs the same regardless of how deep it is.
+    Only the fields in the view's ``cursor_ordering_fields`` can be paged
+    through, since each needs an (is_active, field, id) style index to seek
+    on; other orderings are a 400.
+    """
+    page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE', 20)
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+    ordering = '-created_at'
+    tie_breaker = 'id'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+
+        field = self.get_cursor_ordering(request, queryset, view)
+        self.descending = field.startswith('-')
+        self.field = field.lstrip('-')
+
+        cursor = self.decode_cursor(request)
+        reverse = bool(cursor and cursor.get('r'))
+
+        # Walking backwards means flipping the sort, then flipping the page back
+        descending = self.descending != reverse
+        prefix = '-' if descending else ''
+        queryset = queryset.order_by(prefix + self.field, prefix + self.tie_breaker)
+
+        if cursor:
+            # The cursor is client input: bad values are a bad cursor, not a 500
+            try:
+                cursor = self.coerce_cursor(cursor, queryset)
+                queryset = queryset.filter(self.cursor_filter(cursor, descending))
+            except (DjangoValidationError, ValueError, TypeError):
+                raise NotFound(self.invalid_cursor_message)
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        self.page = results
+        self.has_next = has_more if not reverse else cursor is not None
+        self.has_previous = cursor is not None if not reverse else has_more
+        return results
+
+    def get_ordering(self, request, queryset, view):
+        # Honour ?ordering= when the view exposes OrderingFilter
+        for backend in getattr(view, 'filter_backends', []):
+            if issubclass(backend, filters.OrderingFilter):
+                ordering = backend().get_ordering(request, queryset, view)
+                if ordering:
+                    return ordering[0]
+        view_ordering = getattr(view, 'ordering', None)
+        if view_ordering:
+            return view_ordering[0] if isinstance(view_ordering, (list, tuple)) else view_ordering
+        return self.ordering
+
+    def get_cursor_ordering(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view)
+        allowed = getattr(view, 'cursor_ordering_fields', None) or [self.ordering.lstrip('-')]
+        if ordering.lstrip('-') not in allowed:
+            raise ValidationError({'ordering': [
+                f'Cursor pagination can only order by {", ".join(allowed)}.'
+            ]})
+        # Search ranks are computed per query, there is no index to seek on
+        if 'search_rank' in queryset.query.annotations and not request.query_params.get(
+            api_settings.ORDERING_PARAM
+        ):
+            raise ValidationError({'pagination': [
+                'Search results are ordered by rank and cannot be paged with a cursor; '
+                'pass ?ordering= or use page numbers.'
+            ]})
+        return ordering
+
+    def get_cursor_fields(self, request, queryset, view):
+        # What encode_cursor() reads, for views paginating .values() rows
+        return (self.get_cursor_ordering(request, queryset, view).lstrip('-'), self.tie_breaker)
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def coerce_cursor(self, cursor, queryset):
+        field = queryset.model._meta.get_field(self.field)
+        return dict(cursor, v=field.to_python(cursor['v']), id=int(cursor['id']))
+
+    def cursor_filter(self, cursor, descending):
+        lookup = 'lt' if descending else 'gt'
+        value, pk = cursor['v'], cursor['id']
+        # The first term is implied by the other two, but it is what PostgreSQL
+        # turns into an Index Cond; without it the OR is a Filter over every
+        # row before the cursor and deep pages get linearly slower
+        return Q(**{f'{self.field}__{lookup}e': value}) & (
+            Q(**{f'{self.field}__{lookup}': value}) |
+            Q(**{self.field: value, f'{self.tie_breaker}__{lookup}': pk})
+        )
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            if not isinstance(cursor, dict) or 'v' not in cursor or 'id' not in cursor:
+                raise ValueError
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
+
+    def encode_cursor(self, instance, reverse=False):
+        if isinstance(instance, dict):
+            value, pk = instance[self.field], instance[self.tie_breaker]
+        else:
+            value, pk = getattr(instance, self.field), getattr(instance, self.tie_breaker)
+        cursor = {
+            'v': value.isoformat() if hasattr(value, 'isoformat') else str(value),
+            'id': pk,
+        }
+        if reverse:
+            cursor['r'] = 1
+        encoded = base64.urlsafe_b64encode(json.dumps(cursor).encode('ascii'))
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded.decode('ascii'))
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1])
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class CursorPaginationMixin:
+    """
+    Lets a list view opt into KeysetPagination with ``?pagination=cursor``
+    while keeping the global page-number pagination as the default.
+    """
+    cursor_pagination_class = KeysetPagination
+    pagination_query_param = 'pagination'
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            request = getattr(self, 'request', None)
+            params = request.query_params if request is not None else {}
+            use_cursor = (
+                params.get(self.pagination_query_param) == 'cursor' or
+                self.cursor_pagination_class.cursor_query_param in params
+            )
+            pagination_class = self.cursor_pagination_class if use_cursor else self.pagination_class
+            self._paginator = pagination_class() if pagination_class is not None else None
+        return self._paginator
@@ -0,0 +1,161 @@
+"""
+Read-only serialization straight from QuerySet.values() rows.
+
+A RowSerializer mirrors one ModelSerializer. It instantiates that
+serializer once, sparse fieldset included, and compiles an accessor per
+output field, so a row costs a dict lookup and at most one conversion per
+field instead of DRF's get_attribute/to_representation dispatch. The
+output is the ModelSerializer's own: same keys, same order, same values,
+and the same keys left out when a nullable relation is missing.
+"""
+from decimal import Decimal
+from operator import itemgetter
+
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import serializers
+from rest_framework.fields import empty
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+# Returned by an accessor when DRF would skip the field (SkipField)
+SKIP = object()
+
+# Database values of these fields already are what to_representation returns
+PASSTHROUGH_FIELDS = (serializers.CharField, serializers.IntegerField, serializers.BooleanField)
+
+
+def compile_converter(field):
+    if isinstance(field, PASSTHROUGH_FIELDS):
+        return None
+    if isinstance(field, serializers.DecimalField) and field.decimal_places is not None and not field.localize:
+        exponent = -field.decimal_places
+        coerce = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+        to_representation = field.to_representation
+
+        def convert(value):
+            # Numeric columns come back at the field's scale, where quantize() is a no-op
+            if isinstance(value, Decimal) and value.as_tuple().exponent == exponent:
+                return f'{value:f}' if coerce else value
+            return to_representation(value)
+        return convert
+    return field.to_representation
+
+
+def compile_missing(field):
+    # What Field.get_attribute() does when the source cannot be reached
+    if field.default is not empty:
+        return field.get_default
+    if field.allow_null:
+        return lambda: None
+    return lambda: SKIP
+
+
+class RowSerializer:
+    """
+    Subclasses set ``serializer_class``. Plain and one-hop dotted sources
+    (``category.name``) are compiled automatically; any other field needs
+    a ``get_<field>(row)`` method plus the values() it reads in ``columns``.
+    """
+    serializer_class = None
+    # Output field -> {values() alias: lookup or expression}
+    columns = {}
+
+    def __init__(self, fields=None, omit=None, context=None):
+        serializer = self.serializer_class(fields=fields, omit=omit, context=context)
+        self.model = serializer.Meta.model
+        self.context = context or {}
+        self.lookups = []
+        self.expressions = {}
+        self.accessors = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if name in self.columns:
+                self.expressions.update(self.columns[name])
+                self.accessors.append((name, getattr(self, f'get_{name}')))
+            else:
+                self.accessors.append((name, self.compile(name, field)))
+        self.field_names = [name for name, accessor in self.accessors]
+
+    def compile(self, name, field):
+        attrs = field.source_attrs
+        key = '__'.join(attrs)
+        if len(attrs) > 2 or not attrs:
+            raise ImproperlyConfigured(
+                f'{type(self).__name__} cannot compile {name!r} (source {field.source!r}); '
+                f'declare it in columns with a get_{name}() method'
+            )
+        self.lookups.append(key)
+        convert = compile_converter(field)
+
+        relation = self.model._meta.get_field(attrs[0]) if len(attrs) == 2 else None
+        if relation is None or not relation.null:
+            if convert is None:
+                return itemgetter(key)
+            return lambda row: None if row[key] is None else convert(row[key])
+
+        # A NULL column through a nullable relation may mean no related row at all
+        present = f'{attrs[0]}__pk'
+        self.lookups.append(present)
+        missing = compile_missing(field)
+
+        def accessor(row):
+            if row[present] is None:
+                return missing()
+            value = row[key]
+            return value if value is None or convert is None else convert(value)
+        return accessor
+
+    def values(self, queryset, *extra):
+        """
+        ``queryset`` as the rows this serializer reads, plus any ``extra``
+        columns the caller needs (a pagination cursor, say).
+        """
+        lookups = [name for name in dict.fromkeys([*self.lookups, *extra]) if name not in self.expressions]
+        # Prefetches need model instances and would run against dicts
+        return queryset.prefetch_related(None).values(*lookups, **self.expressions)
+
+    def to_representation(self, row):
+        data = {}
+        for name, accessor in self.accessors:
+            value = accessor(row)
+            if value is not SKIP:
+                data[name] = value
+        return data
+
+    def serialize(self, rows):
+        to_representation = self.to_representation
+        return [to_representation(row) for row in rows]
+
+
+class RowListMixin:
+    """
+    Serves list GETs through ``row_serializer_class`` when the view sets
+    one; requests using ``?expand=`` need model instances and keep the
+    regular serializer. Needs SparseFieldsetMixin.
+    """
+    row_serializer_class = None
+
+    def get_row_serializer(self):
+        options = self.get_sparse_options()
+        if self.row_serializer_class is None or options.get('expand'):
+            return None
+        return self.row_serializer_class(
+            fields=options.get('fields'), omit=options.get('omit'), context=self.get_serializer_context()
+        )
+
+    def list(self, request, *args, **kwargs):
+        serializer = self.get_row_serializer()
+        if serializer is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        # Keyset pagination builds its cursor from columns the output may omit
+        get_cursor_fields = getattr(self.paginator, 'get_cursor_fields', None)
+        extra = get_cursor_fields(request, queryset, self) if get_cursor_fields else ()
+        rows = serializer.values(queryset, *extra)
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serializer.serialize(page))
+        return Response(serializer.serialize(rows))
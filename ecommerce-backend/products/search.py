@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F, Q
+from rest_framework import filters
+from rest_framework.settings import api_settings
+
+
+class ProductSearchFilter(filters.SearchFilter):
+    """
+    ?search= backed by Product.search_vector instead of icontains scans.
+
+    Matches the weighted full-text document, plus SKU prefixes through the
+    trigram index, and orders by rank unless ?ordering= is given.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = request.query_params.get(self.search_param, '').replace('\x00', '').strip()
+        if not terms:
+            return queryset
+
+        query = SearchQuery(terms, search_type='websearch', config=settings.PRODUCT_SEARCH_CONFIG)
+        queryset = queryset.annotate(
+            search_rank=SearchRank(F('search_vector'), query)
+        ).filter(Q(search_vector=query) | Q(sku__istartswith=terms))
+
+        if not request.query_params.get(api_settings.ORDERING_PARAM):
+            queryset = queryset.order_by('-search_rank', '-created_at', '-id')
+        return queryset
+
@@ -1,7 +1,34 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.urls import reverse
 from rest_framework import serializers
-from .models import Category, Product, ProductImage, ProductVariant, ProductReview
+from .models import Category, Product, ProductImage, ProductVariant, ProductReview, StockAlert
+from .rows import RowSerializer
+from .sparse import DynamicFieldsMixin
+from .stock import stock_level
 
-class CategorySerializer(serializers.ModelSerializer):
+RATING_STARS = range(1, 6)
+
+def rating_histogram_annotations(prefix='reviews__'):
+    # Approved review counts per star, as Count() expressions for one aggregate
+    return {
+        f'rating_{star}': Count(
+            'id' if not prefix else f'{prefix}id',
+            filter=Q(**{f'{prefix}is_approved': True, f'{prefix}rating': star}),
+        )
+        for star in RATING_STARS
+    }
+
+def latest_reviews_queryset():
+    return ProductReview.objects.filter(is_approved=True).select_related('user').order_by('-created_at', '-id')
+
+class DiscountField(serializers.ReadOnlyField):
+    # The integer 0 without a discount, as the API has always returned
+    def to_representation(self, value):
+        return value or 0
+
+class CategorySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     children = serializers.SerializerMethodField()
     product_count = serializers.SerializerMethodField()
     
@@ -11,12 +38,29 @@ class CategorySerializer(serializers.ModelSerializer):
                   'is_active', 'children', 'product_count')
         read_only_fields = ('slug', 'children', 'product_count')
     
+    def validate_parent(self, value):
+        # A category cannot be moved underneath itself
+        if value and self.instance and self.instance.path and value.path.startswith(self.instance.path):
+            raise serializers.ValidationError("A category cannot be its own ancestor")
+        try:
+            (self.instance or Category()).check_depth(value)
+        except DjangoValidationError as exc:
+            raise serializers.ValidationError(exc.message_dict['parent'])
+        return value
+    
     def get_children(self, obj):
-        if obj.children.exists():
-            return CategorySerializer(obj.children.filter(is_active=True), many=True).data
-        return []
+        # Use the Prefetch from the view when present, query otherwise
+        children = getattr(obj, 'active_children', None)
+        if children is None:
+            children = obj.children.filter(is_active=True)
+        # Children share the parent's fieldset
+        options = {name: value for name, value in self.sparse_options.items()
+                   if value is not None and name != 'expand'}
+        return CategorySerializer(children, many=True, context=self.context, **options).data
     
     def get_product_count(self, obj):
+        if hasattr(obj, 'active_product_count'):
+            return obj.active_product_count
         return obj.products.filter(is_active=True).count()
 
 class ProductImageSerializer(serializers.ModelSerializer):
@@ -29,7 +73,7 @@ class ProductVariantSerializer(serializers.ModelSerializer):
         model = ProductVariant
         fields = ('id', 'name', 'value', 'sku', 'price_adjustment', 'quantity')
 
-class ProductReviewSerializer(serializers.ModelSerializer):
+class ProductReviewSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     user_email = serializers.EmailField(source='user.email', read_only=True)
     user_name = serializers.CharField(source='user.get_full_name', read_only=True)
     
@@ -39,7 +83,17 @@ class ProductReviewSerializer(serializers.ModelSerializer):
                   'comment', 'is_approved', 'created_at', 'updated_at')
         read_only_fields = ('is_approved', 'created_at', 'updated_at')
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductReviewRowSerializer(RowSerializer):
+    serializer_class = ProductReviewSerializer
+    columns = {
+        'user_name': {'user_first_name': F('user__first_name'), 'user_last_name': F('user__last_name')},
+    }
+    
+    def get_user_name(self, row):
+        # AbstractUser.get_full_name()
+        return f"{row['user_first_name']} {row['user_last_name']}".strip()
+
+class ProductSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     category = CategorySerializer(read_only=True)
     category_id = serializers.PrimaryKeyRelatedField(
         queryset=Category.objects.filter(is_active=True),
@@ -49,9 +103,14 @@ class ProductSerializer(serializers.ModelSerializer):
     
     images = ProductImageSerializer(many=True, read_only=True)
     variants = ProductVariantSerializer(many=True, read_only=True)
-    reviews = ProductReviewSerializer(many=True, read_only=True)
+    reviews = serializers.SerializerMethodField()
+    reviews_url = serializers.SerializerMethodField()
+    in_stock = serializers.BooleanField(read_only=True)
+    low_stock = serializers.BooleanField(read_only=True)
+    discount_percentage = DiscountField()
     average_rating = serializers.SerializerMethodField()
-    review_count = serializers.SerializerMethodField()
+    review_count = serializers.IntegerField(source='rating_count', read_only=True)
+    rating_histogram = serializers.SerializerMethodField()
     
     class Meta:
         model = Product
@@ -60,18 +119,35 @@ class ProductSerializer(serializers.ModelSerializer):
             'cost_per_item', 'sku', 'barcode', 'quantity', 'low_stock_threshold',
             'category', 'category_id', 'is_active', 'is_featured',
             'in_stock', 'low_stock', 'discount_percentage', 'images', 'variants',
-            'reviews', 'average_rating', 'review_count', 'created_at', 'updated_at'
+            'reviews', 'reviews_url', 'average_rating', 'review_count', 'rating_histogram',
+            'created_at', 'updated_at'
         )
         read_only_fields = ('slug', 'created_at', 'updated_at')
     
     def get_average_rating(self, obj):
-        reviews = obj.reviews.filter(is_approved=True)
-        if reviews.exists():
-            return round(sum(r.rating for r in reviews) / reviews.count(), 2)
-        return 0
+        # An int 0 without approved reviews, as the API has always returned
+        if not obj.rating_count:
+            return 0
+        return float(obj.average_rating)
     
-    def get_review_count(self, obj):
-        return obj.reviews.filter(is_approved=True).count()
+    def get_reviews(self, obj):
+        # Only the latest approved reviews; the rest are paginated at reviews_url
+        reviews = getattr(obj, 'latest_reviews', None)
+        if reviews is None:
+            reviews = latest_reviews_queryset().filter(product=obj)[:settings.PRODUCT_DETAIL_REVIEW_LIMIT]
+        return ProductReviewSerializer(reviews, many=True, context=self.context).data
+    
+    def get_reviews_url(self, obj):
+        url = reverse('product-reviews', kwargs={'slug': obj.slug})
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+    
+    def get_rating_histogram(self, obj):
+        if not hasattr(obj, 'rating_1'):
+            counts = obj.reviews.aggregate(**rating_histogram_annotations(prefix=''))
+        else:
+            counts = {f'rating_{star}': getattr(obj, f'rating_{star}') for star in RATING_STARS}
+        return {star: counts[f'rating_{star}'] for star in RATING_STARS}
     
     def validate_price(self, value):
         if value <= 0:
@@ -83,9 +159,19 @@ class ProductSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Quantity cannot be negative")
         return value
 
-class ProductListSerializer(serializers.ModelSerializer):
+class ProductListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     category_name = serializers.CharField(source='category.name', read_only=True)
     image_url = serializers.SerializerMethodField()
+    # Read from ProductQuerySet.with_computed() annotations when present,
+    # otherwise from the Product properties of the same name
+    in_stock = serializers.BooleanField(read_only=True)
+    discount_percentage = DiscountField()
+    
+    expandable_fields = {
+        'category': (CategorySerializer, {'omit': ['children', 'product_count']}),
+        'images': (ProductImageSerializer, {'many': True}),
+        'variants': (ProductVariantSerializer, {'many': True}),
+    }
     
     class Meta:
         model = Product
@@ -96,10 +182,131 @@ class ProductListSerializer(serializers.ModelSerializer):
         )
     
     def get_image_url(self, obj):
-        primary_image = obj.images.filter(is_primary=True).first()
+        # Iterate .all() so the images prefetched by the view are reused
+        images = list(obj.images.all())
+        primary_image = next((image for image in images if image.is_primary), None)
         if primary_image:
             return primary_image.image.url
-        first_image = obj.images.first()
-        if first_image:
-            return first_image.image.url
-        return None
\ No newline at end of file
+        if images:
+            return images[0].image.url
+        return None
+
+def primary_image_subquery():
+    # The image get_image_url() picks: the primary one, else the first by order
+    return Subquery(
+        ProductImage.objects.filter(product=OuterRef('pk'))
+        .order_by('-is_primary', 'order', 'pk').values('image')[:1]
+    )
+
+class ProductListRowSerializer(RowSerializer):
+    serializer_class = ProductListSerializer
+    columns = {'image_url': {'primary_image': primary_image_subquery()}}
+    image_storage = ProductImage._meta.get_field('image').storage
+    
+    def get_image_url(self, row):
+        name = row['primary_image']
+        return self.image_storage.url(name) if name else None
+
+class InventoryLineSerializer(serializers.Serializer):
+    sku = serializers.CharField(max_length=100, required=False)
+    variant_sku = serializers.CharField(max_length=100, required=False)
+    quantity = serializers.IntegerField(min_value=1)
+    
+    def validate(self, attrs):
+        if bool(attrs.get('sku')) == bool(attrs.get('variant_sku')):
+            raise serializers.ValidationError("Provide exactly one of sku or variant_sku")
+        return attrs
+
+class InventoryReservationSerializer(serializers.Serializer):
+    lines = InventoryLineSerializer(many=True, allow_empty=False)
+    allow_partial = serializers.BooleanField(default=False)
+
+class ProductBatchSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False)
+    slugs = serializers.ListField(child=serializers.SlugField(), required=False)
+    shape = serializers.ChoiceField(choices=['list', 'detail'], default='list')
+    
+    def validate(self, attrs):
+        if bool(attrs.get('ids')) == bool(attrs.get('slugs')):
+            raise serializers.ValidationError("Provide exactly one of ids or slugs")
+        lookup = 'ids' if attrs.get('ids') else 'slugs'
+        # Duplicates are resolved once, first occurrence keeps its position
+        attrs[lookup] = list(dict.fromkeys(attrs[lookup]))
+        if len(attrs[lookup]) > settings.PRODUCT_BATCH_LIMIT:
+            raise serializers.ValidationError(
+                f"At most {settings.PRODUCT_BATCH_LIMIT} products can be requested at once"
+            )
+        attrs['lookup'] = lookup
+        return attrs
+
+class AdjustmentField(serializers.Field):
+    """
+    A plain number sets the value; {"delta": n} or {"percent": n} adjust it.
+    """
+    modes = ('set', 'delta', 'percent')
+    
+    def __init__(self, value_field, **kwargs):
+        self.value_field = value_field
+        super().__init__(**kwargs)
+    
+    def to_internal_value(self, data):
+        if isinstance(data, dict):
+            if len(data) != 1 or next(iter(data)) not in self.modes:
+                raise serializers.ValidationError(
+                    'Use a number or an object with one of: set, delta, percent.'
+                )
+            mode, value = next(iter(data.items()))
+        else:
+            mode, value = 'set', data
+        if value is None:
+            if mode != 'set' or not self.allow_null:
+                raise serializers.ValidationError('This field may not be null.')
+            return mode, None
+        if mode == 'percent':
+            return mode, serializers.DecimalField(max_digits=7, decimal_places=2).run_validation(value)
+        return mode, self.value_field.run_validation(value)
+
+class ProductBulkUpdateLineSerializer(serializers.Serializer):
+    skus = serializers.ListField(child=serializers.CharField(max_length=100), allow_empty=False)
+    price = AdjustmentField(serializers.DecimalField(max_digits=10, decimal_places=2), required=False)
+    compare_at_price = AdjustmentField(
+        serializers.DecimalField(max_digits=10, decimal_places=2), required=False, allow_null=True
+    )
+    quantity = AdjustmentField(serializers.IntegerField(), required=False)
+    is_active = serializers.BooleanField(required=False)
+    is_featured = serializers.BooleanField(required=False)
+    
+    def validate(self, attrs):
+        if len(attrs) == 1:
+            raise serializers.ValidationError("Provide at least one field to change")
+        return attrs
+
+class ProductBulkUpdateSerializer(serializers.Serializer):
+    updates = ProductBulkUpdateLineSerializer(many=True, allow_empty=False)
+    dry_run = serializers.BooleanField(default=False)
+
+class LowStockItemSerializer(serializers.Serializer):
+    # Rows of products.stock.low_stock_rows(), products and variants alike
+    type = serializers.CharField(source='kind')
+    id = serializers.IntegerField(source='item_id')
+    product_id = serializers.IntegerField(source='parent_id')
+    sku = serializers.CharField(source='item_sku')
+    name = serializers.CharField(source='item_name')
+    quantity = serializers.IntegerField(source='stock')
+    low_stock_threshold = serializers.IntegerField(source='threshold')
+    level = serializers.SerializerMethodField()
+    
+    def get_level(self, row):
+        return stock_level(row['stock'], row['threshold'])
+
+class StockAlertSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = StockAlert
+        fields = (
+            'id', 'product', 'variant', 'sku', 'previous_level', 'level',
+            'quantity', 'threshold', 'created_at',
+        )
+
+ProductReviewSerializer.expandable_fields = {
+    'product': (ProductListSerializer, {}),
+}
@@ -0,0 +1,130 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from . import cache
+from .models import Category, Product, ProductImage, ProductReview, ProductVariant
+from .stock import StockChange, record_stock_changes, stock_level
+
+# Fields whose changes trigger derived-data refreshes on save
+PRODUCT_TRACKED_FIELDS = ('category_id', 'is_active', 'name', 'description', 'sku', 'slug')
+PRODUCT_SEARCH_FIELDS = ('category_id', 'name', 'description', 'sku')
+STOCK_FIELDS = ('quantity', 'low_stock_threshold')
+
+
+def changed_fields(instance, fields):
+    loaded = instance._loaded_state
+    return {field for field in fields if loaded.get(field) != getattr(instance, field)}
+
+
+def record_stock_change(instance, product_id, variant_id, created):
+    loaded = instance._loaded_state
+    if created:
+        previous_level = None
+    elif loaded.get('quantity') is None or loaded.get('low_stock_threshold') is None:
+        # Loaded with the stock fields deferred, so there is nothing to compare
+        return
+    else:
+        previous_level = stock_level(loaded['quantity'], loaded['low_stock_threshold'])
+    record_stock_changes([StockChange(
+        product_id, variant_id, instance.sku, previous_level,
+        instance.quantity, instance.low_stock_threshold,
+    )])
+
+
+def product_slug(product_id):
+    return Product.objects.filter(pk=product_id).values_list('slug', flat=True).first()
+
+
+@receiver(post_init, sender=ProductReview)
+def remember_review_state(sender, instance, **kwargs):
+    instance._loaded_state = {'is_approved': instance.__dict__.get('is_approved')}
+
+
+@receiver(post_save, sender=ProductReview)
+@receiver(post_delete, sender=ProductReview)
+def update_product_rating(sender, instance, **kwargs):
+    Product.refresh_rating_aggregates([instance.product_id])
+    namespaces = [cache.product_namespace(product_slug(instance.product_id))]
+    # Unapproved reviews never reach the list's rating sort
+    if instance.is_approved or instance._loaded_state['is_approved']:
+        namespaces.append(cache.PRODUCTS)
+    cache.bump(*namespaces)
+    instance._loaded_state = {'is_approved': instance.is_approved}
+
+
+@receiver(post_init, sender=Category)
+def remember_category_state(sender, instance, **kwargs):
+    instance._loaded_state = {'name': instance.__dict__.get('name')}
+
+
+@receiver(post_save, sender=Category)
+def category_saved(sender, instance, created, **kwargs):
+    cache.bump(cache.CATEGORIES, cache.PRODUCTS)
+    if not created and changed_fields(instance, ('name',)):
+        Product.refresh_search_vectors(
+            Product.objects.filter(category=instance).values('pk')
+        )
+    instance._loaded_state = {'name': instance.name}
+
+
+@receiver(post_delete, sender=Category)
+def category_deleted(sender, instance, **kwargs):
+    cache.bump(cache.CATEGORIES, cache.PRODUCTS)
+
+
+@receiver(post_init, sender=Product)
+def remember_product_state(sender, instance, **kwargs):
+    # Deferred fields are absent from __dict__ and simply compare as changed
+    instance._loaded_state = {
+        field: instance.__dict__.get(field) for field in PRODUCT_TRACKED_FIELDS + STOCK_FIELDS
+    }
+
+
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance, created, **kwargs):
+    changed = set(PRODUCT_TRACKED_FIELDS) if created else changed_fields(instance, PRODUCT_TRACKED_FIELDS)
+    namespaces = [cache.PRODUCTS, cache.product_namespace(instance.slug)]
+    if 'slug' in changed and instance._loaded_state['slug']:
+        namespaces.append(cache.product_namespace(instance._loaded_state['slug']))
+    # Only category or activation changes affect per-category product counts
+    if changed & {'category_id', 'is_active'}:
+        namespaces.append(cache.CATEGORIES)
+    cache.bump(*namespaces)
+    if changed & set(PRODUCT_SEARCH_FIELDS):
+        Product.refresh_search_vectors([instance.pk])
+    if created or changed_fields(instance, STOCK_FIELDS):
+        record_stock_change(instance, instance.pk, None, created)
+    instance._loaded_state = {
+        field: getattr(instance, field) for field in PRODUCT_TRACKED_FIELDS + STOCK_FIELDS
+    }
+
+
+@receiver(post_delete, sender=Product)
+def product_deleted(sender, instance, **kwargs):
+    cache.bump(cache.PRODUCTS, cache.CATEGORIES, cache.product_namespace(instance.slug))
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+def product_image_changed(sender, instance, **kwargs):
+    # The list shows the primary image, the detail shows all of them
+    cache.bump(cache.PRODUCTS, cache.product_namespace(product_slug(instance.product_id)))
+
+
+@receiver(post_init, sender=ProductVariant)
+def remember_variant_state(sender, instance, **kwargs):
+    instance._loaded_state = {field: instance.__dict__.get(field) for field in STOCK_FIELDS}
+
+
+@receiver(post_save, sender=ProductVariant)
+def product_variant_saved(sender, instance, created, **kwargs):
+    # The list embeds variants with ?expand=variants
+    cache.bump(cache.PRODUCTS, cache.product_namespace(product_slug(instance.product_id)))
+    if created or changed_fields(instance, STOCK_FIELDS):
+        record_stock_change(instance, instance.product_id, instance.pk, created)
+    instance._loaded_state = {field: getattr(instance, field) for field in STOCK_FIELDS}
+
+
+@receiver(post_delete, sender=ProductVariant)
+def product_variant_deleted(sender, instance, **kwargs):
+    cache.bump(cache.PRODUCTS, cache.product_namespace(product_slug(instance.product_id)))
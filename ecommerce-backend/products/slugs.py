@@ -0,0 +1,112 @@
+import random
+import re
+from functools import reduce
+from operator import or_
+
+from django.db import IntegrityError, transaction
+from django.db.models import BigIntegerField, Case, Count, Max, Q, When
+from django.db.models.functions import Cast, Substr
+from django.utils.text import slugify
+
+# Room kept free at the end of generated slugs for a "-<n>" suffix
+SUFFIX_ROOM = 10
+SAVE_ATTEMPTS = 10
+
+
+def slug_base(value, max_length, fallback):
+    return slugify(value)[:max_length - SUFFIX_ROOM].strip('-') or fallback
+
+
+def _suffix_pattern(base):
+    # Bounded so the suffix always fits a bigint
+    return rf'^{re.escape(base)}-[0-9]{{1,18}}$'
+
+
+def next_free_slug(model, base, max_length, exclude_pk=None, spread=1):
+    """
+    Return ``base`` if it is free, else ``base-<highest suffix + 1>``, or a
+    random one of the next ``spread`` suffixes.
+
+    One aggregate over the rows starting with ``base`` (served by the
+    varchar_pattern_ops index PostgreSQL gets for unique slug fields),
+    however many collisions there are.
+    """
+    queryset = model._default_manager.filter(slug__startswith=base)
+    if exclude_pk is not None:
+        queryset = queryset.exclude(pk=exclude_pk)
+    state = queryset.aggregate(
+        taken=Count('pk', filter=Q(slug=base)),
+        # CASE keeps the cast away from slugs that are not base-<digits>
+        top=Max(Case(When(
+            slug__regex=_suffix_pattern(base),
+            then=Cast(Substr('slug', len(base) + 2), BigIntegerField()),
+        ))),
+    )
+    if not state['taken']:
+        return base
+    slug = f"{base}-{(state['top'] or 0) + 1 + random.randrange(spread)}"
+    if len(slug) > max_length:
+        return next_free_slug(model, base[:max_length - SUFFIX_ROOM].strip('-'), max_length, exclude_pk, spread)
+    return slug
+
+
+def allocate_slugs(model, bases):
+    """
+    Free slugs for a batch of new rows, one per entry in ``bases`` and in
+    the same order, with a single query for the whole batch.
+
+    Bases should come from slug_base() so a suffix always fits. A row that
+    grabs one of these slugs concurrently surfaces as an IntegrityError
+    on insert, and the caller simply allocates again.
+    """
+    unique_bases = set(bases)
+    if not unique_bases:
+        return []
+    existing = model._default_manager.filter(
+        reduce(or_, (Q(slug__startswith=base) for base in unique_bases))
+    ).values_list('slug', flat=True)
+
+    taken = set()
+    top = dict.fromkeys(unique_bases, 0)
+    for slug in existing:
+        if slug in unique_bases:
+            taken.add(slug)
+        prefix, _, suffix = slug.rpartition('-')
+        if prefix in top and suffix.isdigit():
+            top[prefix] = max(top[prefix], int(suffix))
+
+    slugs = []
+    for base in bases:
+        if base not in taken:
+            taken.add(base)
+            slugs.append(base)
+        else:
+            top[base] += 1
+            slugs.append(f'{base}-{top[base]}')
+    return slugs
+
+
+def save_with_unique_slug(instance, save, *args, **kwargs):
+    """
+    Call ``save`` and, if the insert or update trips the slug's unique
+    constraint, move the instance to the next free slug and try again.
+
+    Nothing is checked up front, so the common case costs no extra query
+    and two concurrent saves of the same name cannot both pass a check.
+    """
+    model = type(instance)
+    max_length = model._meta.get_field('slug').max_length
+    base = instance.slug
+    for attempt in range(SAVE_ATTEMPTS):
+        try:
+            with transaction.atomic():
+                return save(*args, **kwargs)
+        except IntegrityError:
+            clash = model._default_manager.filter(slug=instance.slug)
+            if instance.pk is not None:
+                clash = clash.exclude(pk=instance.pk)
+            if attempt == SAVE_ATTEMPTS - 1 or not clash.exists():
+                raise
+            # Racing saves see the same highest suffix (the other inserts are
+            # uncommitted), so repeated clashes pick from a widening range
+            instance.slug = next_free_slug(model, base, max_length, instance.pk, spread=attempt * 4 + 1)
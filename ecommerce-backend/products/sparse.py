@@ -0,0 +1,69 @@
+from rest_framework import permissions
+
+
+def parse_field_list(value):
+    if not value:
+        return None
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+class DynamicFieldsMixin:
+    """
+    Serializer mixin accepting ``fields``, ``omit`` and ``expand`` kwargs.
+
+    ``expandable_fields`` maps a name to ``(serializer_class, kwargs)``; those
+    fields are only added when listed in ``expand``.
+    """
+    expandable_fields = {}
+
+    def __init__(self, *args, **kwargs):
+        self.sparse_options = {
+            'fields': kwargs.pop('fields', None),
+            'omit': kwargs.pop('omit', None),
+            'expand': kwargs.pop('expand', None),
+        }
+        super().__init__(*args, **kwargs)
+
+        for name in self.sparse_options['expand'] or ():
+            if name in self.expandable_fields:
+                serializer_class, options = self.expandable_fields[name]
+                self.fields[name] = serializer_class(read_only=True, **options)
+
+        allowed = self.sparse_options['fields']
+        if allowed is not None:
+            for name in set(self.fields) - set(allowed):
+                self.fields.pop(name)
+        for name in self.sparse_options['omit'] or ():
+            self.fields.pop(name, None)
+
+    def get_field_names_for_output(self):
+        return {name for name, field in self.fields.items() if not field.write_only}
+
+
+class SparseFieldsetMixin:
+    """
+    View mixin reading ``?fields=``, ``?omit=`` and ``?expand=`` on safe
+    methods and passing them to the serializer, so get_queryset() can ask
+    get_requested_fields() which relations are actually needed.
+    """
+    sparse_methods = permissions.SAFE_METHODS
+
+    def get_sparse_options(self):
+        request = getattr(self, 'request', None)
+        if request is None or request.method not in self.sparse_methods:
+            return {}
+        options = {
+            name: parse_field_list(request.query_params.get(name))
+            for name in ('fields', 'omit', 'expand')
+        }
+        return {name: value for name, value in options.items() if value is not None}
+
+    def get_serializer(self, *args, **kwargs):
+        for name, value in self.get_sparse_options().items():
+            kwargs.setdefault(name, value)
+        return super().get_serializer(*args, **kwargs)
+
+    def get_requested_fields(self):
+        if not hasattr(self, '_requested_fields'):
+            self._requested_fields = self.get_serializer().get_field_names_for_output()
+        return self._requested_fields
@@ -0,0 +1,141 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from . import cache
+from .models import CatalogSnapshot, Product
+
+STATISTICS_KEY = 'catalog:statistics:{}:{}'
+MAX_SERIES_DAYS = 365
+
+
+def stock_aggregates():
+    # Conditional aggregates, so every figure comes out of the same scan
+    return {
+        'total_products': Count('id'),
+        'active_products': Count('id', filter=Q(is_active=True)),
+        'out_of_stock': Count('id', filter=Q(quantity__lte=0)),
+        'low_stock': Count('id', filter=Q(quantity__gt=0, quantity__lte=F('low_stock_threshold'))),
+        # Approved reviews only, via the per-product aggregates
+        'rating_sum': Sum('rating_sum'),
+        'review_count': Sum('rating_count'),
+    }
+
+
+def _finish(row):
+    rating_sum = row.pop('rating_sum') or 0
+    row['review_count'] = row['review_count'] or 0
+    row['average_rating'] = (
+        round(float(Decimal(rating_sum) / row['review_count']), 2) if row['review_count'] else 0
+    )
+    return row
+
+
+def catalog_totals():
+    return _finish(Product.objects.aggregate(**stock_aggregates()))
+
+
+def category_breakdown():
+    rows = (
+        Product.objects.order_by()
+        .values('category_id', category_name=F('category__name'))
+        .annotate(**stock_aggregates())
+        .order_by(F('category_name').asc(nulls_last=True))
+    )
+    return [_finish(row) for row in rows]
+
+
+def daily_series(days):
+    """
+    New products per day from Product.created_at, and stock-outs per day
+    from the snapshots (stock levels have no history of their own).
+    """
+    today = timezone.now().date()
+    start = today - timedelta(days=days - 1)
+    new_products = dict(
+        # A plain range on created_at rather than __date, which would hide the column
+        Product.objects.filter(created_at__gte=datetime.combine(start, time.min))
+        .annotate(day=TruncDate('created_at'))
+        .order_by()
+        .values_list('day')
+        .annotate(count=Count('id'))
+    )
+    stock_outs = dict(
+        CatalogSnapshot.objects.filter(date__gte=start).values_list('date', 'out_of_stock')
+    )
+    return [
+        {
+            'date': day,
+            'new_products': new_products.get(day, 0),
+            'out_of_stock': stock_outs.get(day),
+        }
+        for day in (start + timedelta(days=offset) for offset in range(days))
+    ]
+
+
+def get_statistics(days=30):
+    """
+    Dashboard payload, cached until a product or category changes.
+
+    The key embeds the PRODUCTS and CATEGORIES namespace versions that
+    products.signals bumps on every write, so a read after a write
+    recomputes (four queries) and every other read is a cache hit.
+    """
+    versions = cache.get_versions([cache.PRODUCTS, cache.CATEGORIES])
+    key = STATISTICS_KEY.format(days, '.'.join(str(version) for version in versions))
+    store = cache.get_cache()
+    data = store.get(key)
+    if data is None:
+        data = dict(
+            catalog_totals(),
+            categories=category_breakdown(),
+            daily=daily_series(days),
+            generated_at=timezone.now(),
+        )
+        store.set(key, data, settings.CATALOG_CACHE_TIMEOUT)
+    return data
+
+
+def get_snapshot_statistics(days=30):
+    # Reads only precomputed rows; falls back to live figures without a snapshot
+    snapshot = CatalogSnapshot.objects.first()
+    if snapshot is None:
+        return get_statistics(days)
+    start = snapshot.date - timedelta(days=days - 1)
+    history = CatalogSnapshot.objects.filter(date__gte=start).order_by('date').values(
+        'date', 'new_products', 'out_of_stock'
+    )
+    return {
+        'total_products': snapshot.total_products,
+        'active_products': snapshot.active_products,
+        'out_of_stock': snapshot.out_of_stock,
+        'low_stock': snapshot.low_stock,
+        'review_count': snapshot.review_count,
+        'average_rating': float(snapshot.average_rating),
+        'categories': snapshot.categories,
+        'daily': list(history),
+        'generated_at': snapshot.updated_at,
+    }
+
+
+def take_snapshot():
+    """
+    Store today's figures; re-running on the same day overwrites them.
+    """
+    today = timezone.now().date()
+    totals = catalog_totals()
+    new_products = Product.objects.filter(created_at__gte=datetime.combine(today, time.min)).count()
+    snapshot, _ = CatalogSnapshot.objects.update_or_create(
+        date=today,
+        defaults=dict(
+            totals,
+            new_products=new_products,
+            average_rating=Decimal(str(totals['average_rating'])),
+            categories=category_breakdown(),
+        ),
+    )
+    return snapshot
@@ -0,0 +1,98 @@
+from collections import namedtuple
+
+from django.db.models import CharField, F, Value
+from django.db.models.functions import Concat
+
+from .models import Product, ProductVariant, StockAlert
+
+IN_STOCK = StockAlert.IN_STOCK
+LOW_STOCK = StockAlert.LOW_STOCK
+OUT_OF_STOCK = StockAlert.OUT_OF_STOCK
+
+# One observed quantity change; previous_level is None for a new row
+StockChange = namedtuple(
+    'StockChange', 'product_id variant_id sku previous_level quantity threshold'
+)
+
+
+def stock_level(quantity, threshold):
+    # Mirrors Product.in_stock / Product.low_stock
+    if quantity <= 0:
+        return OUT_OF_STOCK
+    if quantity <= threshold:
+        return LOW_STOCK
+    return IN_STOCK
+
+
+def record_stock_changes(changes):
+    """
+    Append a StockAlert for every change that moves a SKU to another level.
+
+    New rows are only recorded when they start out low or out of stock.
+    Callers pass the quantities they already have in hand, so this costs
+    at most one INSERT.
+    """
+    alerts = []
+    for change in changes:
+        level = stock_level(change.quantity, change.threshold)
+        if level == change.previous_level:
+            continue
+        if change.previous_level is None and level == IN_STOCK:
+            continue
+        alerts.append(StockAlert(
+            product_id=change.product_id,
+            variant_id=change.variant_id,
+            sku=change.sku,
+            previous_level=change.previous_level or '',
+            level=level,
+            quantity=change.quantity,
+            threshold=change.threshold,
+        ))
+    if alerts:
+        StockAlert.objects.bulk_create(alerts)
+    return alerts
+
+
+def low_stock_products():
+    # Matches the product_low_stock partial index predicate exactly
+    return Product.objects.filter(is_active=True, quantity__lte=F('low_stock_threshold'))
+
+
+def low_stock_variants():
+    return ProductVariant.objects.filter(
+        quantity__lte=F('low_stock_threshold'), product__is_active=True
+    )
+
+
+def low_stock_rows(kind=None):
+    """
+    Low and out-of-stock products and variants as one queryset of dicts,
+    emptiest first. Each side is served by its partial index.
+    """
+    products = low_stock_products().values(
+        kind=Value('product', output_field=CharField()),
+        item_id=F('id'),
+        parent_id=F('id'),
+        item_sku=F('sku'),
+        item_name=F('name'),
+        stock=F('quantity'),
+        threshold=F('low_stock_threshold'),
+    )
+    variants = low_stock_variants().values(
+        kind=Value('variant', output_field=CharField()),
+        item_id=F('id'),
+        parent_id=F('product_id'),
+        item_sku=F('sku'),
+        item_name=Concat(
+            F('product__name'), Value(' - '), F('name'), Value(': '), F('value'),
+            output_field=CharField(),
+        ),
+        stock=F('quantity'),
+        threshold=F('low_stock_threshold'),
+    )
+    # (stock, id) is the partial indexes' own order, so pages need no sort
+    if kind == 'product':
+        return products.order_by('stock', 'item_id')
+    if kind == 'variant':
+        return variants.order_by('stock', 'item_id')
+    return products.union(variants, all=True).order_by('stock', 'kind', 'item_id')
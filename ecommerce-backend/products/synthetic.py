@@ -0,0 +1,238 @@
+"""
+Reproducible synthetic catalog data for benchmarking.
+
+Everything is drawn from one random.Random(seed) in a fixed order, so the
+same seed and scale always produce the same rows (database ids aside).
+Rows are written with bulk_create in batches, which skips the per-row
+signals; the derived data they would maintain (category paths, rating
+aggregates, search vectors, caches) is refreshed set-based instead.
+"""
+import random
+import time
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from . import cache
+from .models import Category, Product, ProductImage, ProductReview, ProductVariant
+from .tree import invalidate_category_tree
+
+ADJECTIVES = (
+    'classic', 'compact', 'deluxe', 'durable', 'elegant', 'ergonomic', 'essential',
+    'lightweight', 'modern', 'portable', 'premium', 'rugged', 'sleek', 'smart',
+    'vintage', 'waterproof', 'wireless', 'organic', 'handmade', 'heavy-duty',
+)
+MATERIALS = (
+    'aluminium', 'bamboo', 'canvas', 'carbon', 'ceramic', 'cotton', 'glass',
+    'leather', 'linen', 'marble', 'nylon', 'oak', 'rubber', 'silk', 'steel', 'wool',
+)
+NOUNS = (
+    'backpack', 'blender', 'boots', 'camera', 'chair', 'desk', 'headphones',
+    'jacket', 'kettle', 'lamp', 'mug', 'notebook', 'pan', 'sneakers', 'speaker',
+    'tent', 'umbrella', 'wallet', 'watch', 'bottle', 'keyboard', 'mattress',
+)
+CATEGORY_WORDS = (
+    'Home', 'Garden', 'Outdoor', 'Kitchen', 'Office', 'Sports', 'Travel', 'Audio',
+    'Fashion', 'Footwear', 'Lighting', 'Storage', 'Fitness', 'Kids', 'Pets', 'Tools',
+)
+SIZES = ('XS', 'S', 'M', 'L', 'XL', 'XXL', '38', '40', '42', '44')
+COLORS = ('Black', 'White', 'Red', 'Blue', 'Green', 'Grey', 'Navy', 'Beige', 'Olive', 'Pink')
+REVIEW_TITLES = ('Great value', 'Does the job', 'Not as described', 'Love it',
+                 'Solid build', 'Would buy again', 'Disappointing', 'Excellent quality')
+# Skewed towards good reviews, like real catalogs
+RATING_WEIGHTS = (5, 7, 15, 33, 40)
+
+CENT = Decimal('0.01')
+
+
+class CatalogGenerator:
+    """
+    Writes ``categories`` as ``roots`` trees of the given ``depth`` and
+    ``branching``, ``users`` customers, and ``products`` products with up
+    to ``images``/``variants``/``reviews`` children each.
+
+    ``prefix`` namespaces every unique value (slugs, SKUs, emails), so a
+    generated catalog can live next to real data.
+    """
+
+    def __init__(self, seed=0, prefix='bench', batch_size=2000, log=None):
+        self.random = random.Random(seed)
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.log = log or (lambda message: None)
+
+    def existing(self):
+        return (
+            Product.objects.filter(sku__startswith=f'{self.prefix.upper()}-').exists() or
+            Category.objects.filter(slug__startswith=f'{self.prefix}-').exists() or
+            get_user_model().objects.filter(email__endswith=f'@{self.prefix}.example.com').exists()
+        )
+
+    @transaction.atomic
+    def create_categories(self, roots, depth, branching):
+        categories = []
+        level = [None]
+        for depth_index in range(depth):
+            count = roots if depth_index == 0 else branching
+            batch = []
+            for parent in level:
+                for _ in range(count):
+                    number = len(categories) + len(batch) + 1
+                    word = self.random.choice(CATEGORY_WORDS)
+                    batch.append(Category(
+                        name=f'{word} {self.prefix.upper()}-{number}',
+                        slug=f'{self.prefix}-{word.lower()}-{number}',
+                        description=f'{word} products, level {depth_index + 1}',
+                        parent=parent,
+                    ))
+            Category.objects.bulk_create(batch, batch_size=self.batch_size)
+            # The path needs the pk, so each level is written before its children
+            for category in batch:
+                category.path = category.build_path()
+            Category.objects.bulk_update(batch, ['path'], batch_size=self.batch_size)
+            categories.extend(batch)
+            level = batch
+        invalidate_category_tree()
+        self.log(f'categories: {len(categories)} ({roots} roots, depth {depth})')
+        return categories
+
+    @transaction.atomic
+    def create_users(self, count):
+        User = get_user_model()
+        # One hash for everyone; hashing per user would dominate the run
+        password = make_password(None)
+        users = [
+            User(
+                username=f'{self.prefix}-user-{number}',
+                email=f'user{number}@{self.prefix}.example.com',
+                first_name=self.random.choice(ADJECTIVES).title(),
+                password=password,
+            )
+            for number in range(1, count + 1)
+        ]
+        User.objects.bulk_create(users, batch_size=self.batch_size)
+        self.log(f'users: {len(users)}')
+        return [user.pk for user in users]
+
+    def create_products(self, count, category_ids, user_ids, images, variants, reviews):
+        started = time.perf_counter()
+        totals = {'products': 0, 'images': 0, 'variants': 0, 'reviews': 0}
+        for offset in range(0, count, self.batch_size):
+            numbers = range(offset + 1, min(offset + self.batch_size, count) + 1)
+            products, children = [], {ProductImage: [], ProductVariant: [], ProductReview: []}
+            # Each product draws its children right away, so the batch size
+            # never changes the random sequence
+            for number in numbers:
+                product = self.build_product(number, category_ids)
+                products.append(product)
+                children[ProductImage].extend(self.build_images(product, images))
+                children[ProductVariant].extend(self.build_variants(product, variants))
+                children[ProductReview].extend(self.build_reviews(product, user_ids, reviews))
+            with transaction.atomic():
+                Product.objects.bulk_create(products)
+                for model, rows in children.items():
+                    model.objects.bulk_create(rows, batch_size=self.batch_size)
+                product_ids = [product.pk for product in products]
+                Product.refresh_rating_aggregates(product_ids)
+                Product.refresh_search_vectors(product_ids)
+            totals['products'] += len(products)
+            totals['images'] += len(children[ProductImage])
+            totals['variants'] += len(children[ProductVariant])
+            totals['reviews'] += len(children[ProductReview])
+            elapsed = time.perf_counter() - started
+            self.log(f'products: {totals["products"]}/{count} ({totals["products"] / elapsed:.0f}/s)')
+        return totals
+
+    def build_product(self, number, category_ids):
+        rng = self.random
+        adjective, material, noun = rng.choice(ADJECTIVES), rng.choice(MATERIALS), rng.choice(NOUNS)
+        price = Decimal(rng.lognormvariate(3.5, 1.0)).quantize(CENT, ROUND_HALF_UP)
+        price = min(max(price, Decimal('0.99')), Decimal('9999.99'))
+        compare_at_price = None
+        if rng.random() < 0.3:
+            compare_at_price = (price * Decimal(rng.uniform(1.05, 1.6))).quantize(CENT, ROUND_HALF_UP)
+        threshold = rng.choice((5, 10, 10, 20))
+        roll = rng.random()
+        if roll < 0.08:
+            quantity = 0
+        elif roll < 0.2:
+            quantity = rng.randint(1, threshold)
+        else:
+            quantity = rng.randint(threshold + 1, 500)
+        sku = f'{self.prefix.upper()}-{number:08d}'
+        return Product(
+            name=f'{adjective.title()} {material.title()} {noun.title()} {number}',
+            slug=f'{self.prefix}-{adjective}-{material}-{noun}-{number}',
+            description=' '.join(self.sentence(adjective, material, noun) for _ in range(rng.randint(2, 5))),
+            price=price,
+            compare_at_price=compare_at_price,
+            cost_per_item=(price * Decimal(rng.uniform(0.3, 0.7))).quantize(CENT, ROUND_HALF_UP),
+            sku=sku,
+            barcode=f'{rng.randrange(10 ** 12):013d}',
+            quantity=quantity,
+            low_stock_threshold=threshold,
+            category_id=rng.choice(category_ids) if category_ids else None,
+            is_active=rng.random() < 0.95,
+            is_featured=rng.random() < 0.05,
+        )
+
+    def sentence(self, adjective, material, noun):
+        rng = self.random
+        return (
+            f'This {adjective} {noun} is made of {material} and pairs well with a '
+            f'{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} for {rng.choice(CATEGORY_WORDS).lower()} use.'
+        )
+
+    def build_images(self, product, count):
+        return [
+            ProductImage(
+                product=product,
+                image=f'products/{product.sku.lower()}-{order}.jpg',
+                alt_text=product.name,
+                is_primary=order == 0,
+                order=order,
+            )
+            for order in range(self.random.randint(0, count))
+        ]
+
+    def build_variants(self, product, count):
+        rng = self.random
+        name, values = rng.choice((('Size', SIZES), ('Color', COLORS)))
+        return [
+            ProductVariant(
+                product=product,
+                name=name,
+                value=value,
+                sku=f'{product.sku}-{index + 1}',
+                price_adjustment=Decimal(rng.choice((0, 0, 5, 10, -5))),
+                quantity=rng.randint(0, 100),
+                low_stock_threshold=product.low_stock_threshold,
+            )
+            for index, value in enumerate(rng.sample(values, rng.randint(0, count)))
+        ]
+
+    def build_reviews(self, product, user_ids, count):
+        rng = self.random
+        # One review per user and product, as the unique constraint requires
+        return [
+            ProductReview(
+                product=product,
+                user_id=user_id,
+                rating=rng.choices(range(1, 6), RATING_WEIGHTS)[0],
+                title=rng.choice(REVIEW_TITLES),
+                comment=self.sentence(rng.choice(ADJECTIVES), rng.choice(MATERIALS), rng.choice(NOUNS)),
+                is_approved=rng.random() < 0.85,
+            )
+            for user_id in rng.sample(user_ids, rng.randint(0, min(count, len(user_ids))))
+        ]
+
+    def generate(self, roots, depth, branching, users, products, images, variants, reviews):
+        categories = self.create_categories(roots, depth, branching)
+        user_ids = self.create_users(users)
+        totals = self.create_products(
+            products, [category.pk for category in categories], user_ids, images, variants, reviews
+        )
+        cache.bump(cache.PRODUCTS, cache.CATEGORIES, cache.PRODUCT_DETAILS)
+        return {'categories': len(categories), 'users': len(user_ids), **totals}
@@ -0,0 +1,77 @@
+"""
+The async catalog views against their sync counterparts.
+
+A TransactionTestCase: the async views query from pool threads, each on
+its own connection, which would not see a TestCase's open transaction.
+"""
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from products.cache import get_cache
+from products.models import Category, Product, ProductImage, ProductReview, ProductVariant
+
+
+class AsyncProductViewTests(TransactionTestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.root = root = Category.objects.create(name='Home')
+        lighting = Category.objects.create(name='Lighting', parent=root)
+        Category.objects.create(name='Lamps', parent=lighting)
+        self.products = [
+            Product.objects.create(
+                name='Desk lamp', sku='LAMP-1', price=Decimal('20.00'), quantity=3, category=lighting,
+            ),
+            Product.objects.create(name='Uncategorized', sku='MISC-1', price=Decimal('5.00')),
+        ]
+        product = self.products[0]
+        ProductImage.objects.create(product=product, image='lamp.jpg', is_primary=True)
+        ProductVariant.objects.create(product=product, name='Colour', value='Black', sku='LAMP-1-B')
+        user = get_user_model().objects.create_user(
+            username='reader', email='reader@example.com', password='secret'
+        )
+        ProductReview.objects.create(product=product, user=user, rating=4, title='Bright', is_approved=True)
+
+    async def aget(self, name, *args, **params):
+        response = await AsyncClient().get(reverse(name, args=args), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    @sync_to_async
+    def get(self, name, *args, **params):
+        get_cache().clear()
+        response = self.client.get(reverse(name, args=args), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    async def test_detail_with_a_category(self):
+        categories = []
+        for product in self.products:
+            with self.subTest(sku=product.sku):
+                data = await self.aget('async-product-detail', product.slug)
+                self.assertEqual(data, await self.get('product-detail', product.slug))
+                categories.append(data['category'] and data['category']['name'])
+        self.assertEqual(categories, ['Lighting', None])
+
+    async def test_batch_with_a_category(self):
+        slugs = ','.join(product.slug for product in self.products)
+        data = await self.aget('async-product-batch', slugs=slugs, shape='detail')
+        self.assertEqual(data, await self.get('product-batch', slugs=slugs, shape='detail'))
+        self.assertEqual(
+            [result['category'] and result['category']['name'] for result in data['results']],
+            ['Lighting', None],
+        )
+
+    async def test_category_deeper_than_the_limit(self):
+        # Older data: the nested prefetch stops short and the serializer queries
+        product = await sync_to_async(Product.objects.create)(
+            name='Lamp shade', sku='SHADE-1', price=Decimal('8.00'), category=self.root,
+        )
+        with override_settings(CATEGORY_MAX_DEPTH=2):
+            data = await self.aget('async-product-detail', product.slug)
+            self.assertEqual(data, await self.get('product-detail', product.slug))
+        lighting, = data['category']['children']
+        self.assertEqual([child['name'] for child in lighting['children']], ['Lamps'])
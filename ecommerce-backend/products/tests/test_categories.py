@@ -0,0 +1,70 @@
+"""
+Materialized category paths: the depth limit and rows without a path.
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from products.models import Category, Product
+
+
+@override_settings(CATEGORY_MAX_DEPTH=3)
+class CategoryDepthTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.root = Category.objects.create(name='Root')
+        cls.child = Category.objects.create(name='Child', parent=cls.root)
+        cls.leaf = Category.objects.create(name='Leaf', parent=cls.child)
+        cls.admin = get_user_model().objects.create_user(
+            username='admin', email='admin@example.com', password='secret', is_staff=True
+        )
+
+    def test_depth(self):
+        self.assertEqual([self.root.depth, self.child.depth, self.leaf.depth], [1, 2, 3])
+
+    def test_save_below_the_limit_is_rejected(self):
+        with self.assertRaises(ValidationError):
+            Category.objects.create(name='Too deep', parent=self.leaf)
+        self.assertFalse(Category.objects.filter(name='Too deep').exists())
+
+    def test_moving_a_subtree_below_the_limit_is_rejected(self):
+        other = Category.objects.create(name='Other root')
+        self.child.parent = Category.objects.create(name='Other child', parent=other)
+        with self.assertRaises(ValidationError):
+            self.child.save()
+        self.leaf.refresh_from_db()
+        self.assertEqual(self.leaf.depth, 3)
+
+    def test_api_rejects_too_deep_parent(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.post(
+            reverse('category-list'), {'name': 'Too deep', 'parent': self.leaf.pk}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('parent', response.json())
+
+
+class MissingPathTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.kitchen = Category.objects.create(name='Kitchen')
+        cls.garden = Category.objects.create(name='Garden')
+        # bulk_create skips save(), so the path is never written
+        cls.unpathed, = Category.objects.bulk_create([Category(name='Unpathed', slug='unpathed')])
+        for category in (cls.kitchen, cls.garden, cls.unpathed):
+            Product.objects.create(
+                name=f'{category.name} thing', sku=f'SKU-{category.slug}', price=Decimal('5.00'),
+                category=category,
+            )
+
+    def test_descendants_of_a_category_without_a_path(self):
+        self.assertEqual(list(self.unpathed.get_descendants()), [self.unpathed])
+
+    def test_category_filter_without_a_path(self):
+        response = self.client.get(reverse('product-list'), {'category': 'unpathed'})
+        self.assertEqual([result['name'] for result in response.json()['results']], ['Unpathed thing'])
@@ -0,0 +1,49 @@
+"""
+discount_percentage renders the same way from the SQL annotation, the
+Product property and the row serializer.
+"""
+from decimal import Decimal
+
+from django.test import TestCase
+from django.urls import reverse
+
+from products.cache import get_cache
+from products.models import Category, Product
+
+
+class DiscountPercentageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Lighting')
+        cls.full_price = Product.objects.create(
+            name='Full price', sku='FULL', price=Decimal('10.00'), category=category,
+        )
+        cls.on_sale = Product.objects.create(
+            name='On sale', sku='SALE', price=Decimal('10.00'), compare_at_price=Decimal('15.00'),
+            category=category,
+        )
+
+    def setUp(self):
+        get_cache().clear()
+
+    def assertDiscounts(self, discounts):
+        # 0 stays an integer, as the API has always returned it, never 0.0
+        self.assertEqual(
+            [(value, type(value)) for value in discounts], [(0, int), (33.33, float)]
+        )
+
+    def test_list(self):
+        url = reverse('product-list')
+        # Row serializer, then the model serializer that ?expand= needs
+        for params in ({}, {'expand': 'category'}):
+            with self.subTest(params=params):
+                response = self.client.get(url, dict(params, ordering='name'))
+                self.assertDiscounts([
+                    result['discount_percentage'] for result in response.json()['results']
+                ])
+
+    def test_detail(self):
+        self.assertDiscounts([
+            self.client.get(reverse('product-detail', args=[product.slug])).json()['discount_percentage']
+            for product in (self.full_price, self.on_sale)
+        ])
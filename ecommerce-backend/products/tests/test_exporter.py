@@ -0,0 +1,42 @@
+"""
+The catalog export endpoint, under WSGI and ASGI.
+"""
+import json
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient, TestCase
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from products.models import Product
+
+
+class ProductExportViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        staff = get_user_model().objects.create_user(
+            username='staff', email='staff@example.com', password='secret', is_staff=True
+        )
+        cls.authorization = f'Bearer {AccessToken.for_user(staff)}'
+        for i in range(3):
+            Product.objects.create(name=f'Lamp {i}', sku=f'LAMP-{i}', price=Decimal('10.00'))
+
+    def test_wsgi_export_is_a_sync_stream(self):
+        response = self.client.get(reverse('product-export'), HTTP_AUTHORIZATION=self.authorization)
+        self.assertFalse(response.is_async)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)['sku'] for line in lines], ['LAMP-0', 'LAMP-1', 'LAMP-2'])
+
+    async def test_asgi_export_is_an_async_stream(self):
+        response = await AsyncClient().get(
+            reverse('product-export'), headers={'Authorization': self.authorization}
+        )
+        self.assertEqual(response.status_code, 200)
+        # A sync iterator would have been read to the end before the first byte
+        self.assertTrue(response.is_async)
+        content = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(
+            [json.loads(line)['sku'] for line in content.decode().splitlines()],
+            ['LAMP-0', 'LAMP-1', 'LAMP-2'],
+        )
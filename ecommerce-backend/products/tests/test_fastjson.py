@@ -0,0 +1,89 @@
+"""
+Golden outputs of ecommerce.fastjson against DRF's stdlib JSON classes.
+"""
+import io
+import uuid
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from unittest import mock, skipIf
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework import serializers
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from ecommerce import fastjson
+from ecommerce.fastjson import FastJSONParser, FastJSONRenderer
+
+
+class VariantSerializer(serializers.Serializer):
+    sku = serializers.CharField()
+    price_adjustment = serializers.DecimalField(max_digits=10, decimal_places=2, coerce_to_string=False)
+
+
+class ProductSerializer(serializers.Serializer):
+    id = serializers.UUIDField()
+    name = serializers.CharField()
+    price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    created_at = serializers.DateTimeField()
+    variants = VariantSerializer(many=True)
+
+
+def payload():
+    product = {
+        'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        'name': 'Café mug\u2028\u2029',
+        'price': Decimal('19.90'),
+        'created_at': datetime(2024, 5, 17, 9, 30, 15, 123456, tzinfo=timezone.utc),
+        'variants': [
+            {'sku': 'MUG-S', 'price_adjustment': Decimal('0.00')},
+            {'sku': 'MUG-L', 'price_adjustment': Decimal('2.50')},
+        ],
+    }
+    return {
+        'decimal': Decimal('1234.5600'),
+        'datetime': datetime(2024, 5, 17, 9, 30, 15, 123456, tzinfo=timezone.utc),
+        'naive_datetime': datetime(2024, 5, 17, 9, 30),
+        'date': date(2024, 5, 17),
+        'time': time(9, 30, 15),
+        'uuid': uuid.UUID('87654321-4321-8765-4321-876543218765'),
+        'lazy': gettext_lazy('This field is required.'),
+        'nested': ProductSerializer(product).data,
+        'many': ProductSerializer([product, product], many=True).data,
+        'numbers': [0, -1, 2 ** 63 - 1, 1.5, True, None],
+        1: 'integer key',
+    }
+
+
+def render(renderer_class, data):
+    return renderer_class().render(data, 'application/json', {})
+
+
+def parse(parser_class, body):
+    return parser_class().parse(io.BytesIO(body), 'application/json', {})
+
+
+class FastJSONGoldenTests(SimpleTestCase):
+    def assertMatchesStdlib(self):
+        data = payload()
+        expected = render(JSONRenderer, data)
+        rendered = render(FastJSONRenderer, data)
+        self.assertEqual(rendered, expected)
+        self.assertEqual(parse(JSONParser, rendered), parse(JSONParser, expected))
+        self.assertEqual(parse(FastJSONParser, expected), parse(JSONParser, expected))
+
+    @skipIf(fastjson.orjson is None, 'orjson is not installed')
+    def test_orjson_matches_stdlib(self):
+        self.assertTrue(FastJSONRenderer().can_use_orjson())
+        self.assertMatchesStdlib()
+
+    def test_without_orjson_matches_stdlib(self):
+        with mock.patch.object(fastjson, 'orjson', None):
+            self.assertFalse(FastJSONRenderer().can_use_orjson())
+            self.assertMatchesStdlib()
+
+    def test_large_integers_stay_exact(self):
+        body = b'{"id": 123456789012345678901234567890}'
+        self.assertEqual(parse(FastJSONParser, body), {'id': 123456789012345678901234567890})
+        self.assertEqual(render(FastJSONRenderer, {'id': 2 ** 70}), render(JSONRenderer, {'id': 2 ** 70}))
@@ -0,0 +1,56 @@
+"""
+ProductImporter over CSV and JSON Lines input.
+"""
+import io
+import json
+
+from django.test import TestCase
+
+from products.importer import ProductImporter, iter_csv, iter_jsonl, open_text
+from products.models import Product, ProductImage
+
+HEADER = 'sku,name,price,quantity,is_active,images\n'
+
+
+def import_csv(text, encoding='utf-8'):
+    stream = open_text(io.BytesIO(text.encode(encoding)))
+    return ProductImporter().run(iter_csv(stream))
+
+
+def import_jsonl(rows):
+    stream = open_text(io.BytesIO('\n'.join(json.dumps(row) for row in rows).encode()))
+    return ProductImporter().run(iter_jsonl(stream))
+
+
+class ProductImporterTests(TestCase):
+    def test_excel_byte_order_mark(self):
+        summary = import_csv(HEADER + 'MUG-1,Mug,9.50,3,,\n', encoding='utf-8-sig')
+        self.assertEqual(summary['created'], 1, summary['errors'])
+        self.assertEqual(Product.objects.get().sku, 'MUG-1')
+
+    def test_blank_is_active_keeps_the_default(self):
+        import_csv(HEADER + 'MUG-1,Mug,9.50,3,,\nMUG-2,Mug,9.50,3,no,\n')
+        self.assertEqual(
+            dict(Product.objects.values_list('sku', 'is_active')), {'MUG-1': True, 'MUG-2': False}
+        )
+
+    def test_images_are_replaced(self):
+        import_jsonl([{'sku': 'MUG-1', 'name': 'Mug', 'price': '9.50', 'images': ['a.jpg', 'b.jpg']}])
+        import_jsonl([{'sku': 'MUG-1', 'name': 'Mug', 'price': '9.50', 'images': [
+            {'image': 'c.jpg', 'alt_text': 'Side'},
+        ]}])
+        self.assertEqual(
+            list(ProductImage.objects.values_list('image', 'alt_text', 'is_primary')),
+            [('c.jpg', 'Side', True)],
+        )
+
+    def test_bad_rows_fail_on_their_own(self):
+        summary = import_jsonl([
+            ['not', 'an', 'object'],
+            {'sku': 'NAN', 'name': 'Bad price', 'price': 'NaN'},
+            {'sku': 'HALF', 'name': 'Bad quantity', 'price': '1', 'quantity': 2.5},
+            {'sku': 'IMG', 'name': 'Bad image', 'price': '1', 'images': [3]},
+            {'sku': 'GOOD', 'name': 'Good', 'price': '1'},
+        ])
+        self.assertEqual((summary['created'], summary['failed']), (1, 4))
+        self.assertEqual([error['row'] for error in summary['errors']], [1, 2, 3, 4])
@@ -0,0 +1,120 @@
+"""
+Stock reservations: concurrent reservations against one SKU, and who may
+reserve through the API.
+
+The concurrency tests are a TransactionTestCase so that every thread
+commits on its own connection, as concurrent requests would.
+"""
+import threading
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from products.inventory import reserve_stock
+from products.models import Product, ProductVariant
+
+STOCK = 5
+BUYERS = 12
+
+
+class ConcurrentReservationTests(TransactionTestCase):
+    def setUp(self):
+        self.product = Product.objects.create(
+            name='Limited', sku='LIMITED', price=Decimal('10.00'), quantity=STOCK,
+        )
+
+    def reserve_concurrently(self, line):
+        barrier = threading.Barrier(BUYERS)
+        outcomes = []
+        errors = []
+
+        def buy():
+            try:
+                barrier.wait()
+                outcomes.append(reserve_stock([line]))
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=buy) for _ in range(BUYERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        return outcomes
+
+    def assertOutcomes(self, outcomes):
+        successes = [results for ok, results in outcomes if ok]
+        failures = [results for ok, results in outcomes if not ok]
+        self.assertEqual(len(successes), STOCK)
+        for results in successes:
+            self.assertEqual([(line['reserved'], line['quantity']) for line in results], [(True, 1)])
+        # Every loser saw the stock already gone, never a half-applied update
+        for results in failures:
+            self.assertEqual(
+                [(line['reserved'], line['error'], line['available']) for line in results],
+                [(False, 'insufficient_stock', 0)],
+            )
+
+    def test_product_is_never_oversold(self):
+        outcomes = self.reserve_concurrently({'sku': 'LIMITED', 'quantity': 1})
+        self.product.refresh_from_db()
+        self.assertGreaterEqual(self.product.quantity, 0)
+        self.assertOutcomes(outcomes)
+        self.assertEqual(self.product.quantity, 0)
+
+    def test_variant_is_never_oversold(self):
+        variant = ProductVariant.objects.create(
+            product=self.product, name='Size', value='M', sku='LIMITED-M', quantity=STOCK,
+        )
+        outcomes = self.reserve_concurrently({'variant_sku': 'LIMITED-M', 'quantity': 1})
+        variant.refresh_from_db()
+        self.assertGreaterEqual(variant.quantity, 0)
+        self.assertOutcomes(outcomes)
+        self.assertEqual(variant.quantity, 0)
+
+
+class ReserveViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.customer = User.objects.create_user(username='customer', email='c@example.com', password='secret')
+        cls.staff = User.objects.create_user(
+            username='staff', email='s@example.com', password='secret', is_staff=True
+        )
+        Product.objects.create(name='Plenty', sku='PLENTY', price=Decimal('5.00'), quantity=10)
+        Product.objects.create(name='Scarce', sku='SCARCE', price=Decimal('5.00'), quantity=1)
+
+    def reserve(self, user, data):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.post(reverse('inventory-reserve'), data, format='json')
+
+    def test_customers_cannot_reserve(self):
+        response = self.reserve(self.customer, {'lines': [{'sku': 'PLENTY', 'quantity': 10}]})
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(Product.objects.get(sku='PLENTY').quantity, 10)
+
+    def test_partial_reservation_is_reported_as_committed(self):
+        response = self.reserve(self.staff, {
+            'lines': [{'sku': 'PLENTY', 'quantity': 2}, {'sku': 'SCARCE', 'quantity': 3}],
+            'allow_partial': True,
+        })
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertFalse(data['success'])
+        self.assertEqual(
+            [(line['sku'], line['reserved']) for line in data['lines']],
+            [('PLENTY', True), ('SCARCE', False)],
+        )
+        self.assertEqual(Product.objects.get(sku='PLENTY').quantity, 8)
+
+    def test_nothing_reserved_is_a_conflict(self):
+        response = self.reserve(self.staff, {'lines': [{'sku': 'SCARCE', 'quantity': 3}], 'allow_partial': True})
+        self.assertEqual(response.status_code, 409)
@@ -0,0 +1,83 @@
+"""
+Keyset pagination: paging through every ordering it accepts, and a 400
+for the orderings it cannot seek on.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from products.cache import get_cache
+from products.models import Product, ProductReview
+
+PRODUCTS = 7
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        for i in range(PRODUCTS):
+            product = Product.objects.create(
+                name=f'Lamp {i}', sku=f'LAMP-{i}', price=Decimal(10 + i % 3), quantity=1,
+            )
+            # Shared timestamps and prices, so the id tie-breaker matters
+            Product.objects.filter(pk=product.pk).update(created_at=now - timedelta(days=i // 2))
+        cls.product = product
+        for i in range(3):
+            user = get_user_model().objects.create_user(
+                username=f'reader{i}', email=f'reader{i}@example.com', password='secret'
+            )
+            ProductReview.objects.create(product=product, user=user, rating=5, title='Bright', is_approved=True)
+
+    def setUp(self):
+        get_cache().clear()
+
+    def walk(self, url, params):
+        seen = []
+        response = self.client.get(url, dict(params, pagination='cursor', page_size=2))
+        while True:
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            seen.extend(result['id'] for result in data['results'])
+            if not data['next']:
+                return seen
+            response = self.client.get(data['next'])
+
+    def test_every_cursor_ordering_pages_through_everything_once(self):
+        url = reverse('product-list')
+        for ordering in ('created_at', '-created_at', 'price', '-price', 'name', '-average_rating'):
+            with self.subTest(ordering=ordering):
+                seen = self.walk(url, {'ordering': ordering})
+                tie_breaker = '-id' if ordering.startswith('-') else 'id'
+                expected = list(Product.objects.order_by(ordering, tie_breaker).values_list('id', flat=True))
+                self.assertEqual(seen, expected)
+
+    def test_ordering_without_an_index_is_rejected(self):
+        response = self.client.get(
+            reverse('product-list'), {'pagination': 'cursor', 'ordering': 'discount_percentage'}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('ordering', response.json())
+
+    def test_review_ordering_on_a_related_field_is_rejected(self):
+        url = reverse('product-reviews', args=[self.product.slug])
+        # Row serializer, model serializer and a cursor built from the last page
+        for params in ({}, {'expand': 'product'}, {'cursor': 'eyJ2IjogIngiLCAiaWQiOiAxfQ=='}):
+            with self.subTest(params=params):
+                response = self.client.get(
+                    url, dict(params, pagination='cursor', ordering='user__email')
+                )
+                self.assertEqual(response.status_code, 400)
+
+    def test_search_needs_an_explicit_ordering(self):
+        url = reverse('product-list')
+        response = self.client.get(url, {'pagination': 'cursor', 'search': 'lamp'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('pagination', response.json())
+
+        response = self.client.get(url, {'pagination': 'cursor', 'search': 'lamp', 'ordering': '-price'})
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,123 @@
+"""
+Query counts of the catalog read endpoints.
+
+The fixtures give every product several images, variants and approved
+reviews and every category several children, so an N+1 on any of them
+changes the count.
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from products.cache import get_cache
+from products.models import Category, Product, ProductImage, ProductReview, ProductVariant
+
+PRODUCTS = 6
+
+
+class CatalogQueryCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        users = [
+            get_user_model().objects.create_user(
+                username=f'reviewer{i}', email=f'reviewer{i}@example.com', password='secret'
+            )
+            for i in range(3)
+        ]
+        cls.root = Category.objects.create(name='Root')
+        children = [Category.objects.create(name=f'Child {i}', parent=cls.root) for i in range(3)]
+        for child in children:
+            Category.objects.create(name=f'{child.name} leaf', parent=child)
+        for i in range(PRODUCTS):
+            product = Product.objects.create(
+                name=f'Product {i}', sku=f'SKU-{i}', price=Decimal('10.00'),
+                compare_at_price=Decimal('12.00'), quantity=5, category=children[i % len(children)],
+            )
+            for position in range(2):
+                ProductImage.objects.create(
+                    product=product, image=f'products/{i}-{position}.jpg',
+                    is_primary=position == 0, order=position,
+                )
+            for size in ('S', 'M'):
+                ProductVariant.objects.create(
+                    product=product, name='Size', value=size, sku=f'SKU-{i}-{size}', quantity=3,
+                )
+            for user in users:
+                ProductReview.objects.create(
+                    product=product, user=user, rating=4, title='Fine', comment='Does the job',
+                    is_approved=True,
+                )
+        cls.product = product
+
+    def setUp(self):
+        # Anonymous reads are answered from the response cache after the first one
+        get_cache().clear()
+
+    def assertQueries(self, count, url, data=None):
+        with self.assertNumQueries(count):
+            response = self.client.get(url, data)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_product_list(self):
+        response = self.assertQueries(2, reverse('product-list'))
+        self.assertEqual(response.json()['count'], PRODUCTS)
+
+    def test_product_list_cursor(self):
+        response = self.assertQueries(1, reverse('product-list'), {'pagination': 'cursor'})
+        self.assertEqual(len(response.json()['results']), PRODUCTS)
+
+    def test_product_list_expanded(self):
+        response = self.assertQueries(
+            4, reverse('product-list'), {'expand': 'images,variants,category'}
+        )
+        result = response.json()['results'][0]
+        self.assertEqual(len(result['images']), 2)
+        self.assertEqual(len(result['variants']), 2)
+
+    def test_product_detail(self):
+        response = self.assertQueries(7, reverse('product-detail', args=[self.product.slug]))
+        data = response.json()
+        self.assertEqual(len(data['images']), 2)
+        self.assertEqual(len(data['variants']), 2)
+        self.assertEqual(len(data['reviews']), 3)
+
+    def test_product_batch(self):
+        slugs = ','.join(Product.objects.values_list('slug', flat=True))
+        response = self.assertQueries(7, reverse('product-batch'), {'slugs': slugs, 'shape': 'detail'})
+        self.assertEqual(len(response.json()['results']), PRODUCTS)
+
+    def test_product_batch_cache_hit(self):
+        ids = ','.join(str(pk) for pk in Product.objects.values_list('pk', flat=True))
+        self.client.get(reverse('product-batch'), {'ids': ids})
+        self.assertQueries(0, reverse('product-batch'), {'ids': ids})
+
+    def test_category_list(self):
+        # COUNT, the page, then one query per level of children (the last finds none)
+        response = self.assertQueries(5, reverse('category-list'))
+        self.assertEqual(response.json()['count'], 7)
+
+    def test_category_detail(self):
+        response = self.assertQueries(4, reverse('category-detail', args=[self.root.pk]))
+        children = response.json()['children']
+        self.assertEqual(len(children), 3)
+        # The leaves come from one query for the whole level
+        self.assertEqual([len(child['children']) for child in children], [1, 1, 1])
+
+    def test_category_tree(self):
+        response = self.assertQueries(2, reverse('category-tree'))
+        self.assertEqual(len(response.json()[0]['children']), 3)
+        # Cached until CATEGORIES is bumped
+        self.assertQueries(0, reverse('category-tree'))
+
+    def test_review_list(self):
+        response = self.assertQueries(2, reverse('product-reviews', args=[self.product.slug]))
+        self.assertEqual(response.json()['count'], 3)
+
+    def test_review_list_cursor(self):
+        response = self.assertQueries(
+            1, reverse('product-reviews', args=[self.product.slug]), {'pagination': 'cursor'}
+        )
+        self.assertEqual(len(response.json()['results']), 3)
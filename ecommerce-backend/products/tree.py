@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.db.models import Count
+
+from .cache import CATEGORIES, bump, get_cache, get_versions
+from .models import Category, Product
+
+# Keyed on the categories version, like the cached category responses
+CATEGORY_TREE_KEY = 'catalog:category-tree:{}'
+
+TREE_FIELDS = ('id', 'name', 'slug', 'description', 'parent', 'is_active')
+
+
+def build_category_tree():
+    # Two queries regardless of tree size: all active nodes, then product counts
+    nodes = {
+        row['id']: dict(row, children=[], product_count=0)
+        for row in Category.objects.filter(is_active=True)
+        .order_by('name')
+        .values(*TREE_FIELDS)
+    }
+    counts = (
+        Product.objects.filter(is_active=True, category__isnull=False)
+        .order_by()
+        .values_list('category_id')
+        .annotate(total=Count('id'))
+    )
+    for category_id, total in counts:
+        if category_id in nodes:
+            nodes[category_id]['product_count'] = total
+
+    roots = []
+    for node in nodes.values():
+        if node['parent'] is None:
+            roots.append(node)
+        elif node['parent'] in nodes:
+            nodes[node['parent']]['children'].append(node)
+        # Nodes under an inactive parent are hidden along with it
+    return roots
+
+
+def get_category_tree():
+    cache = get_cache()
+    key = CATEGORY_TREE_KEY.format(*get_versions([CATEGORIES]))
+    tree = cache.get(key)
+    if tree is None:
+        tree = build_category_tree()
+        cache.set(key, tree, settings.CATEGORY_TREE_CACHE_TIMEOUT)
+    return tree
+
+
+def invalidate_category_tree():
+    # For writers that do not bump CATEGORIES themselves
+    bump(CATEGORIES)
@@ -1,21 +1,43 @@
 from django.urls import path
 from .views import (
     CategoryListCreateView,
+    CategoryTreeView,
     CategoryDetailView,
     ProductListView,
     ProductCreateView,
+    ProductImportView,
+    ProductExportView,
+    ProductBulkUpdateView,
+    ProductBatchView,
     ProductDetailView,
     ProductReviewListCreateView,
     ProductReviewDetailView,
-    ProductStatisticsView
+    ProductStatisticsView,
+    CacheStatsView,
+    InventoryReserveView,
+    InventoryReleaseView,
+    LowStockView,
+    StockAlertFeedView
+)
+from .async_views import (
+    AsyncCategoryListView,
+    AsyncCategoryDetailView,
+    AsyncProductListView,
+    AsyncProductBatchView,
+    AsyncProductDetailView
 )
 
 urlpatterns = [
     path('categories/', CategoryListCreateView.as_view(), name='category-list'),
+    path('categories/tree/', CategoryTreeView.as_view(), name='category-tree'),
     path('categories/<int:pk>/', CategoryDetailView.as_view(), name='category-detail'),
     
     path('products/', ProductListView.as_view(), name='product-list'),
     path('products/create/', ProductCreateView.as_view(), name='product-create'),
+    path('products/import/', ProductImportView.as_view(), name='product-import'),
+    path('products/export/', ProductExportView.as_view(), name='product-export'),
+    path('products/bulk-update/', ProductBulkUpdateView.as_view(), name='product-bulk-update'),
+    path('products/batch/', ProductBatchView.as_view(), name='product-batch'),
     path('products/<slug:slug>/', ProductDetailView.as_view(), name='product-detail'),
     
     path('products/<slug:slug>/reviews/', 
@@ -26,4 +48,17 @@ urlpatterns = [
          name='review-detail'),
     
     path('statistics/', ProductStatisticsView.as_view(), name='product-statistics'),
+    path('inventory/reserve/', InventoryReserveView.as_view(), name='inventory-reserve'),
+    path('inventory/release/', InventoryReleaseView.as_view(), name='inventory-release'),
+    path('inventory/low-stock/', LowStockView.as_view(), name='inventory-low-stock'),
+    path('inventory/alerts/', StockAlertFeedView.as_view(), name='inventory-alerts'),
+    
+    path('cache/stats/', CacheStatsView.as_view(), name='cache-stats'),
+    
+    # Read-only async variants for ASGI deployments
+    path('async/categories/', AsyncCategoryListView.as_view(), name='async-category-list'),
+    path('async/categories/<int:pk>/', AsyncCategoryDetailView.as_view(), name='async-category-detail'),
+    path('async/products/', AsyncProductListView.as_view(), name='async-product-list'),
+    path('async/products/batch/', AsyncProductBatchView.as_view(), name='async-product-batch'),
+    path('async/products/<slug:slug>/', AsyncProductDetailView.as_view(), name='async-product-detail'),
 ]
\ No newline at end of file
@@ -1,79 +1,174 @@
 from rest_framework import generics, filters, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticatedOrReadOnly, IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from django_filters import FilterSet, NumberFilter, CharFilter, BooleanFilter
-from django.db.models import Q, Avg, Count
+from django.conf import settings
+from django.db.models import Q, Count, Prefetch
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from .models import Category, Product, ProductReview
+from django.utils import timezone
+from .models import Category, Product, ProductReview, StockAlert
 from .serializers import (
-    CategorySerializer, ProductSerializer, ProductListSerializer,
-    ProductReviewSerializer
+    CategorySerializer, ProductSerializer, ProductListSerializer, ProductBatchSerializer,
+    ProductBulkUpdateSerializer, LowStockItemSerializer, StockAlertSerializer,
+    ProductReviewSerializer, InventoryReservationSerializer, InventoryLineSerializer,
+    ProductListRowSerializer, ProductReviewRowSerializer,
+    latest_reviews_queryset, rating_histogram_annotations
 )
 from .permissions import IsOwnerOrReadOnly, IsAdminOrReadOnly
+from . import cache
+from .cache import CachedResponseMixin
+from .bulk import bulk_update_products
+from .exporter import CONTENT_TYPES, aiter_chunks, export_catalog
+from .importer import READERS, ProductImporter, open_text
+from .inventory import reserve_stock, release_stock
+from .pagination import CursorPaginationMixin
+from .rows import RowListMixin
+from .sparse import SparseFieldsetMixin, parse_field_list
+from .search import ProductSearchFilter
+from .stock import low_stock_rows
+from .statistics import MAX_SERIES_DAYS, get_snapshot_statistics, get_statistics
+from .tree import get_category_tree
 
-class CategoryListCreateView(generics.ListCreateAPIView):
-    queryset = Category.objects.filter(is_active=True)
+def annotate_product_count(queryset):
+    return queryset.annotate(
+        active_product_count=Count('products', filter=Q(products__is_active=True))
+    )
+
+def active_children_prefetch(counts, depth=None):
+    # One query per level of the subtree actually rendered, each counting the
+    # products of that level's categories only. Nested down to
+    # CATEGORY_MAX_DEPTH so that every node rendered has active_children
+    depth = settings.CATEGORY_MAX_DEPTH if depth is None else depth
+    children = Category.objects.filter(is_active=True)
+    if counts:
+        children = annotate_product_count(children)
+    if depth > 1:
+        children = children.prefetch_related(active_children_prefetch(counts, depth - 1))
+    return Prefetch('children', queryset=children, to_attr='active_children')
+
+def category_queryset(queryset=None, fields=None):
+    # Everything CategorySerializer reads for a node and its subtree,
+    # limited to the requested fields when a sparse fieldset is in use
+    if queryset is None:
+        queryset = Category.objects.all()
+    counts = fields is None or 'product_count' in fields
+    if counts:
+        queryset = annotate_product_count(queryset)
+    if fields is None or 'children' in fields:
+        queryset = queryset.prefetch_related(active_children_prefetch(counts))
+    return queryset
+
+def product_list_queryset(fields):
+    # search_vector is only needed inside the database; the computed
+    # stock/discount values come from SQL so they can be filtered and sorted
+    queryset = Product.objects.filter(is_active=True).defer('search_vector').with_computed()
+    if fields & {'category_name', 'category'}:
+        queryset = queryset.select_related('category')
+    if fields & {'image_url', 'images'}:
+        queryset = queryset.prefetch_related('images')
+    if 'variants' in fields:
+        queryset = queryset.prefetch_related('variants')
+    return queryset
+
+def product_detail_queryset(fields):
+    # Prefetches work per queryset, so many products cost as many queries as one
+    queryset = Product.objects.filter(is_active=True).defer('search_vector')
+    if 'description' not in fields:
+        queryset = queryset.defer('description')
+    if 'category' in fields:
+        queryset = queryset.prefetch_related(Prefetch('category', queryset=category_queryset()))
+    if 'images' in fields:
+        queryset = queryset.prefetch_related('images')
+    if 'variants' in fields:
+        queryset = queryset.prefetch_related('variants')
+    if 'reviews' in fields:
+        queryset = queryset.prefetch_related(Prefetch(
+            'reviews',
+            queryset=latest_reviews_queryset()[:settings.PRODUCT_DETAIL_REVIEW_LIMIT],
+            to_attr='latest_reviews',
+        ))
+    if 'rating_histogram' in fields:
+        queryset = queryset.annotate(**rating_histogram_annotations())
+    return queryset
+
+class CategoryListCreateView(SparseFieldsetMixin, CachedResponseMixin, generics.ListCreateAPIView):
     serializer_class = CategorySerializer
     permission_classes = [IsAdminOrReadOnly]
     filter_backends = [filters.SearchFilter]
     search_fields = ['name', 'description']
+    cache_namespaces = [cache.CATEGORIES]
+
+    def get_queryset(self):
+        return category_queryset(
+            Category.objects.filter(is_active=True), self.get_requested_fields()
+        ).order_by('id')
+
+class CategoryTreeView(APIView):
+    permission_classes = [IsAdminOrReadOnly]
+
+    def get(self, request):
+        return Response(get_category_tree())
 
 class CategoryDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [IsAdminOrReadOnly]
 
+    def get_queryset(self):
+        return category_queryset(Category.objects.all())
+
     def perform_destroy(self, instance):
-        instance.is_active = False
-        instance.save()
+        # Soft delete the whole subtree so no active node hangs off an inactive one
+        instance.get_descendants().update(is_active=False, updated_at=timezone.now())
+        cache.bump(cache.CATEGORIES, cache.PRODUCTS)
 
 class ProductFilter(FilterSet):
     min_price = NumberFilter(field_name="price", lookup_expr='gte')
     max_price = NumberFilter(field_name="price", lookup_expr='lte')
-    category = CharFilter(field_name="category__slug")
+    category = CharFilter(method='filter_category')
     # REMOVED: vendor = CharFilter(field_name="vendor__email")
-    in_stock = BooleanFilter(field_name="quantity", lookup_expr='gt')
+    # These filter on ProductQuerySet.with_computed() annotations
+    in_stock = BooleanFilter(field_name="in_stock")
+    low_stock = BooleanFilter(field_name="low_stock")
+    on_sale = BooleanFilter(method='filter_on_sale')
+    min_discount = NumberFilter(field_name="discount_percentage", lookup_expr='gte')
     featured = BooleanFilter(field_name="is_featured")
 
     class Meta:
         model = Product
         # REMOVED 'vendor' from fields list
-        fields = ['category', 'min_price', 'max_price', 'in_stock', 'featured']
+        fields = [
+            'category', 'min_price', 'max_price', 'in_stock', 'low_stock',
+            'on_sale', 'min_discount', 'featured',
+        ]
+
+    def filter_category(self, queryset, name, value):
+        # Matches the category and every descendant, at any depth
+        category = get_object_or_404(Category.objects.only('path'), slug=value, is_active=True)
+        return queryset.filter(category.subtree_filter('category__'), category__is_active=True)
 
-class ProductListView(generics.ListAPIView):
+    def filter_on_sale(self, queryset, name, value):
+        if value:
+            return queryset.filter(discount_percentage__gt=0)
+        return queryset.filter(discount_percentage=0)
+
+class ProductListView(SparseFieldsetMixin, CachedResponseMixin, CursorPaginationMixin, RowListMixin,
+                      generics.ListAPIView):
     serializer_class = ProductListSerializer
-    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, filters.SearchFilter]
+    row_serializer_class = ProductListRowSerializer
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, ProductSearchFilter]
     filterset_class = ProductFilter
-    ordering_fields = ['price', 'created_at', 'name']
+    ordering_fields = ['price', 'created_at', 'name', 'average_rating', 'discount_percentage']
     ordering = ['-created_at']
-    search_fields = ['name', 'description', 'sku', 'category__name']
+    # The orderings with an (is_active, field, id) index
+    cursor_ordering_fields = ['created_at', 'price', 'name', 'average_rating']
+    cache_namespaces = [cache.PRODUCTS, cache.CATEGORIES]
 
     def get_queryset(self):
-        # REMOVED: .select_related('category', 'vendor')
-        queryset = Product.objects.filter(is_active=True).select_related('category').prefetch_related('images')
-
-        # Additional filtering logic
-        category_slug = self.request.query_params.get('category')
-        if category_slug:
-            category = get_object_or_404(Category, slug=category_slug, is_active=True)
-            # Get all child categories
-            child_categories = category.children.filter(is_active=True)
-            category_ids = [category.id] + list(child_categories.values_list('id', flat=True))
-            queryset = queryset.filter(category_id__in=category_ids)
-
-        # Filter by search query
-        search_query = self.request.query_params.get('search')
-        if search_query:
-            queryset = queryset.filter(
-                Q(name__icontains=search_query) |
-                Q(description__icontains(search_query)) |
-                Q(sku__icontains(search_query)) |
-                Q(category__name__icontains(search_query))
-            )
-
-        return queryset
+        return product_list_queryset(self.get_requested_fields())
 
 class ProductCreateView(generics.CreateAPIView):
     queryset = Product.objects.all()
@@ -82,26 +177,126 @@ class ProductCreateView(generics.CreateAPIView):
     
     # REMOVED: perform_create method (no vendor to set)
 
-class ProductDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Product.objects.filter(is_active=True)
+class ProductDetailView(SparseFieldsetMixin, CachedResponseMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = ProductSerializer
     permission_classes = [IsAuthenticatedOrReadOnly, IsAdminOrReadOnly]
     lookup_field = 'slug'
 
+    def get_cache_namespaces(self):
+        # The embedded category is shared, everything else is this product's own
+        return [
+            cache.CATEGORIES, cache.PRODUCT_DETAILS, cache.product_namespace(self.kwargs['slug'])
+        ]
+
+    def get_queryset(self):
+        return product_detail_queryset(self.get_requested_fields())
+
     def perform_destroy(self, instance):
         instance.is_active = False
         instance.save()
 
-class ProductReviewListCreateView(generics.ListCreateAPIView):
+class BatchRetrieveMixin:
+    """
+    Like DRF's RetrieveModelMixin, for many objects at once: the response
+    keeps the request order and lists the values that matched nothing.
+    """
+
+    def get(self, request, *args, **kwargs):
+        return self.retrieve_batch()
+
+    def post(self, request, *args, **kwargs):
+        return self.retrieve_batch()
+
+    def retrieve_batch(self):
+        queryset, attribute, requested = self.get_batch_lookup()
+        instances, missing = self.match_batch(queryset, attribute, requested)
+        return Response({
+            'results': self.get_serializer(instances, many=True).data,
+            'missing': missing,
+        })
+
+    def get_batch_lookup(self):
+        params = self.batch.validated_data
+        if params['lookup'] == 'slugs':
+            key, attribute, requested = 'slug__in', 'slug', params['slugs']
+        else:
+            key, attribute, requested = 'pk__in', 'pk', params['ids']
+        return self.get_queryset().filter(**{key: requested}), attribute, requested
+
+    def match_batch(self, instances, attribute, requested):
+        # Found instances in request order, and the values that matched nothing
+        found = {getattr(instance, attribute): instance for instance in instances}
+        return (
+            [found[value] for value in requested if value in found],
+            [value for value in requested if value not in found],
+        )
+
+class ProductBatchView(SparseFieldsetMixin, CachedResponseMixin, BatchRetrieveMixin, generics.GenericAPIView):
+    """
+    Resolves many products in one request, either GET ?slugs=a,b or ?ids=1,2
+    or a POST body with ``ids``/``slugs``. ``shape`` picks the list or detail
+    representation. Only GET is cached, since the cache key ignores the body.
+    """
+    permission_classes = [AllowAny]
+    # POST only reads, so it takes ?fields= like GET does
+    sparse_methods = ('GET', 'HEAD', 'POST')
+    shapes = {'list': ProductListSerializer, 'detail': ProductSerializer}
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in ('GET', 'HEAD'):
+            data = {
+                name: parse_field_list(request.query_params.get(name)) or []
+                for name in ('ids', 'slugs')
+            }
+            data['shape'] = request.query_params.get('shape', 'list')
+        elif request.method == 'POST':
+            data = request.data
+        else:
+            return
+        self.batch = ProductBatchSerializer(data=data)
+        self.batch.is_valid(raise_exception=True)
+
+    def get_shape(self):
+        # Schema generation inspects the view without running initial()
+        batch = getattr(self, 'batch', None)
+        return batch.validated_data['shape'] if batch else 'list'
+
+    def get_serializer_class(self):
+        return self.shapes[self.get_shape()]
+
+    def get_cache_namespaces(self):
+        # Every write that changes a product bumps PRODUCTS along with the
+        # product's own namespace, so PRODUCTS covers all requested products
+        # without looking their slugs up on every request
+        return [cache.PRODUCTS, cache.CATEGORIES, cache.PRODUCT_DETAILS]
+
+    def get_queryset(self):
+        fields = self.get_requested_fields()
+        if self.get_shape() == 'detail':
+            return product_detail_queryset(fields)
+        return product_list_queryset(fields)
+
+class ProductReviewListCreateView(SparseFieldsetMixin, CursorPaginationMixin, RowListMixin,
+                                  generics.ListCreateAPIView):
     serializer_class = ProductReviewSerializer
+    row_serializer_class = ProductReviewRowSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    # Served by the (product, is_approved, created_at, id) index
+    cursor_ordering_fields = ['created_at']
 
     def get_queryset(self):
         product_slug = self.kwargs['slug']
-        return ProductReview.objects.filter(
+        fields = self.get_requested_fields()
+        queryset = ProductReview.objects.filter(
             product__slug=product_slug,
             is_approved=True
-        ).select_related('user')
+        )
+        if fields & {'user_email', 'user_name'}:
+            queryset = queryset.select_related('user')
+        if 'product' in fields:
+            queryset = queryset.select_related('product__category').prefetch_related('product__images')
+        return queryset
 
     def perform_create(self, serializer):
         product = get_object_or_404(Product, slug=self.kwargs['slug'])
@@ -129,25 +324,184 @@ class ProductStatisticsView(APIView):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # General statistics for all products
-        total_products = Product.objects.count()
-        active_products = Product.objects.filter(is_active=True).count()
-        out_of_stock = Product.objects.filter(quantity=0).count()
-        low_stock = Product.objects.filter(
-            quantity__gt=0,
-            quantity__lte=models.F('low_stock_threshold')
-        ).count()
-
-        avg_rating_result = ProductReview.objects.filter(
-            is_approved=True
-        ).aggregate(avg_rating=Avg('rating'))
+        try:
+            days = int(request.query_params.get('days', 30))
+        except ValueError:
+            return Response({'days': ['A valid integer is required.']}, status=status.HTTP_400_BAD_REQUEST)
+        days = min(max(days, 1), MAX_SERIES_DAYS)
+
+        # ?source=snapshot reads the last stored snapshot instead of live figures
+        if request.query_params.get('source') == 'snapshot':
+            return Response(get_snapshot_statistics(days))
+        return Response(get_statistics(days))
+
+class InventoryReserveView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        # Reservations are not tied to an order and never expire, so only
+        # staff (and the checkout running as staff) may take stock
+        if not request.user.is_staff:
+            return Response(
+                {'detail': 'You do not have permission to reserve stock.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        serializer = InventoryReservationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        success, results = reserve_stock(
+            serializer.validated_data['lines'],
+            allow_partial=serializer.validated_data['allow_partial'],
+        )
+        # A partial reservation is committed: report what was taken, not a conflict
+        committed = success or any(line['reserved'] for line in results)
+        return Response(
+            {'success': success, 'lines': results},
+            status=status.HTTP_200_OK if committed else status.HTTP_409_CONFLICT
+        )
+
+class InventoryReleaseView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        if not request.user.is_staff:
+            return Response(
+                {'detail': 'You do not have permission to release stock.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        serializer = InventoryLineSerializer(data=request.data.get('lines'), many=True)
+        serializer.is_valid(raise_exception=True)
+        return Response({'lines': release_stock(serializer.validated_data)})
+
+class LowStockView(generics.ListAPIView):
+    serializer_class = LowStockItemSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        if not request.user.is_staff:
+            return Response(
+                {'detail': 'You do not have permission to view stock levels.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        return super().get(request, *args, **kwargs)
+
+    def get_queryset(self):
+        # ?type=product or ?type=variant narrows the list to one kind
+        return low_stock_rows(self.request.query_params.get('type'))
 
-        avg_rating = avg_rating_result['avg_rating'] or 0
+class StockAlertFeedView(APIView):
+    """
+    Stock level crossings after ?after=<id>, oldest first, so a job can
+    poll with the last id it has seen instead of rescanning stock.
+    """
+    permission_classes = [IsAuthenticated]
+    max_limit = 500
 
+    def get(self, request):
+        if not request.user.is_staff:
+            return Response(
+                {'detail': 'You do not have permission to view stock alerts.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        try:
+            after = int(request.query_params.get('after', 0))
+            limit = min(max(int(request.query_params.get('limit', 100)), 1), self.max_limit)
+        except ValueError:
+            return Response(
+                {'detail': 'after and limit must be integers.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        alerts = list(StockAlert.objects.filter(id__gt=after).order_by('id')[:limit])
         return Response({
-            'total_products': total_products,
-            'active_products': active_products,
-            'out_of_stock': out_of_stock,
-            'low_stock': low_stock,
-            'average_rating': round(avg_rating, 2),
-        })
\ No newline at end of file
+            'results': StockAlertSerializer(alerts, many=True).data,
+            'last_id': alerts[-1].id if alerts else after,
+            'has_more': len(alerts) == limit,
+        })
+
+class ProductImportView(APIView):
+    permission_classes = [IsAuthenticated]
+    max_reported_errors = 100
+
+    def post(self, request):
+        if not request.user.is_staff:
+            return Response(
+                {'detail': 'You do not have permission to import products.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'file': ['This field is required.']}, status=status.HTTP_400_BAD_REQUEST)
+        file_format = request.data.get('format') or upload.name.rsplit('.', 1)[-1].lower()
+        if file_format not in READERS:
+            return Response(
+                {'format': [f'Use one of: {", ".join(sorted(READERS))}.']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            chunk_size = int(request.data.get('chunk_size') or 1000)
+        except ValueError:
+            return Response({'chunk_size': ['A valid integer is required.']}, status=status.HTTP_400_BAD_REQUEST)
+
+        importer = ProductImporter(chunk_size=max(chunk_size, 1), max_errors=self.max_reported_errors)
+        summary = importer.run(READERS[file_format](open_text(upload)))
+        return Response(summary)
+
+class ProductBulkUpdateView(APIView):
+    permission_classes = [IsAuthenticated]
+    max_reported = 100
+
+    def post(self, request):
+        if not request.user.is_staff:
+            return Response(
+                {'detail': 'You do not have permission to update products in bulk.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        serializer = ProductBulkUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        result = bulk_update_products(
+            serializer.validated_data['updates'],
+            dry_run=serializer.validated_data['dry_run'],
+            max_reported=self.max_reported,
+        )
+        return Response(
+            result,
+            status=status.HTTP_400_BAD_REQUEST if result['errors'] else status.HTTP_200_OK
+        )
+
+class ProductExportView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if not request.user.is_staff:
+            return Response(
+                {'detail': 'You do not have permission to export products.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        # ?format= is taken by DRF's renderer override, hence ?type=
+        file_format = request.query_params.get('type', 'jsonl')
+        if file_format not in CONTENT_TYPES:
+            return Response(
+                {'type': [f'Use one of: {", ".join(sorted(CONTENT_TYPES))}.']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        compress = request.query_params.get('gzip') in ('1', 'true')
+        filename = f'catalog.{file_format}' + ('.gz' if compress else '')
+        chunks = export_catalog(file_format, compress=compress, build_url=request.build_absolute_uri)
+        if isinstance(request._request, ASGIRequest):
+            # A sync iterator would be buffered whole under ASGI
+            chunks = aiter_chunks(chunks)
+        response = StreamingHttpResponse(
+            chunks, content_type='application/gzip' if compress else CONTENT_TYPES[file_format],
+        )
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+class CacheStatsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if not request.user.is_staff:
+            return Response(
+                {'detail': 'You do not have permission to view cache statistics.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        return Response(cache.get_stats())